@@ -0,0 +1,91 @@
+"""
+Benchmark: lines/sec for log line parsing before and after single-pass timestamp parsing.
+
+"before" reproduces the old path (strptime to validate in parse_log_line, then strptime
+again in analyze_logs); "after" is the current parse_log_line, which returns epoch seconds
+from the fixed-width parser and its per-second cache.
+
+Run from anywhere:
+    python benchmarks/bench_timestamps.py --lines 500000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+TOOL_DIR = Path(__file__).resolve().parent.parent
+
+
+def make_lines(count, seed=1):
+    """Synthetic auth log lines; most consecutive lines share a second, like real bursts."""
+    rng = random.Random(seed)
+    ts = datetime(2025, 12, 31, 0, 0, 0)
+    actions = ["login_success", "login_failed", "unauthorized_access"]
+    lines = []
+    for _ in range(count):
+        ts += timedelta(seconds=rng.choice([0, 0, 0, 1, 2]))
+        lines.append(f"{ts:%Y-%m-%d %H:%M:%S} user=u{rng.randrange(50)} "
+                     f"ip=10.0.0.{rng.randrange(30)} action={rng.choice(actions)}\n")
+    return lines
+
+
+def parse_before(line):
+    """The pre-change parse: validate with strptime, return the string, re-parse later."""
+    line = line.strip()
+    try:
+        parts = line.split()
+        timestamp_str = parts[0] + " " + parts[1]
+        user = parts[2].split("=")[1]
+        ip = parts[3].split("=")[1]
+        action = parts[4].split("=")[1]
+        datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
+        return timestamp_str, user, ip, action
+    except (IndexError, ValueError):
+        return None
+
+
+def run_before(lines):
+    for line in lines:
+        parsed = parse_before(line)
+        if parsed is not None:
+            datetime.strptime(parsed[0], "%Y-%m-%d %H:%M:%S")
+
+
+def run_after(lines, parse_log_line):
+    for line in lines:
+        parse_log_line(line)
+
+
+def best_rate(fn, lines, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(lines)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--lines", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    opts = ap.parse_args()
+
+    sys.path.insert(0, str(TOOL_DIR))
+    from log_analyzer.parsers import parse_log_line
+
+    lines = make_lines(opts.lines)
+    before = best_rate(run_before, lines, opts.repeat)
+    after = best_rate(lambda ls: run_after(ls, parse_log_line), lines, opts.repeat)
+
+    print(f"lines:  {len(lines):,}")
+    print(f"before: {before:,.0f} lines/sec (strptime x2)")
+    print(f"after:  {after:,.0f} lines/sec (fixed-width + memo)")
+    print(f"speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
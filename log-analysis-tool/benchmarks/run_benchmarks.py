@@ -0,0 +1,122 @@
+"""
+Benchmark suite: run log_analyzer over a seeded workload in each mode and record
+wall time, lines/sec and peak RSS as JSON, so results can be compared across commits.
+
+Each case runs the analyzer as its own process in a scratch directory; peak RSS is that
+process's ru_maxrss. The best of --repeat runs is kept.
+
+    python benchmarks/run_benchmarks.py --lines 500000
+    python benchmarks/run_benchmarks.py --lines 500000 --compare benchmarks/results/<older>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from workload import DEFAULT_MIX, parse_mix, write_workload
+
+TOOL_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = TOOL_DIR / "benchmarks" / "results"
+ANALYZER = [sys.executable, "-m", "log_analyzer"]
+
+# name -> (input format, extra CLI flags)
+CASES = {
+    "serial": ("text", []),
+    "serial_no_analyzed_log": ("text", ["--no-analyzed-log"]),
+    "mmap": ("text", ["--mmap", "--no-analyzed-log"]),
+    "workers": ("text", ["--workers", "0", "--no-analyzed-log"]),
+    "approx": ("text", ["--approx", "--no-analyzed-log"]),
+    "audit_jsonl": ("audit-jsonl", ["--no-analyzed-log"]),
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=TOOL_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_case(workdir, log_file, flags):
+    """Run the analyzer once; returns (seconds, peak RSS in MB)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(ANALYZER + ["--logfile", str(log_file)] + flags, cwd=workdir,
+                            env={**os.environ, "PYTHONPATH": str(TOOL_DIR)},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    if status != 0:
+        raise RuntimeError(f"log_analyzer failed ({flags}): {proc.stderr.read().decode()}")
+    proc.stderr.close()
+    rss_kb = usage.ru_maxrss if sys.platform != "darwin" else usage.ru_maxrss / 1024
+    return elapsed, rss_kb / 1024
+
+
+def compare(current, previous):
+    """Print per-case change in lines/sec and peak RSS against an earlier results file."""
+    print(f"\nvs {previous.get('commit')} ({previous.get('timestamp')}):")
+    for name, result in current["results"].items():
+        old = previous["results"].get(name)
+        if old is None:
+            continue
+        speed = (result["lines_per_sec"] / old["lines_per_sec"] - 1) * 100
+        rss = (result["peak_rss_mb"] / old["peak_rss_mb"] - 1) * 100
+        print(f"  {name:24} lines/sec {speed:+6.1f}%   peak RSS {rss:+6.1f}%")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="log_analyzer benchmark suite")
+    ap.add_argument("--lines", type=int, default=200_000)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    ap.add_argument("--malformed-rate", type=float, default=0.01)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--cases", default=",".join(CASES), help="Comma-separated subset of: " + ", ".join(CASES))
+    ap.add_argument("--output", type=Path, default=None, help="Results JSON (default: benchmarks/results/)")
+    ap.add_argument("--compare", type=Path, default=None, help="Earlier results JSON to diff against")
+    opts = ap.parse_args()
+
+    params = {"lines": opts.lines, "seed": opts.seed, "mix": opts.mix, "malformed_rate": opts.malformed_rate,
+              "repeat": opts.repeat}
+    report = {"tool": "log-analysis-tool", "commit": git_commit(),
+              "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+              "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+              "params": params, "results": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        shutil.copy(TOOL_DIR / "config.json", workdir / "config.json")
+        inputs = {}
+        for name in opts.cases.split(","):
+            fmt, flags = CASES[name]
+            if fmt not in inputs:
+                suffix = ".jsonl" if fmt == "audit-jsonl" else ".log"
+                inputs[fmt] = write_workload(workdir / f"workload{suffix}", opts.lines, seed=opts.seed, mix=opts.mix,
+                                             malformed_rate=opts.malformed_rate, fmt=fmt)
+            runs = [run_case(workdir, inputs[fmt], flags) for _ in range(opts.repeat)]
+            seconds = min(r[0] for r in runs)
+            peak = max(r[1] for r in runs)
+            report["results"][name] = {"seconds": round(seconds, 4),
+                                       "lines_per_sec": round(opts.lines / seconds),
+                                       "peak_rss_mb": round(peak, 1)}
+            print(f"{name:24} {seconds:8.2f}s  {opts.lines / seconds:12,.0f} lines/sec  {peak:8.1f} MB peak RSS")
+
+    output = opts.output or RESULTS_DIR / f"{report['timestamp'].replace(':', '')}-{report['commit'] or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved {output}")
+    if opts.compare:
+        compare(report, json.loads(opts.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Seeded synthetic auth-log generator for benchmarks.
+
+The same seed and options always produce the same file, so runs on different commits
+compare like with like. Lines are a mix of background traffic and attack campaigns:
+
+    background   many users and IPs, mostly successful logins
+    brute_force  a few (user, IP) pairs failing over and over
+    spraying     a few IPs failing against many different users
+    distributed  a few users failing from many different IPs
+
+Usage:
+    python benchmarks/workload.py --lines 1000000 --seed 7 --malformed-rate 0.01 \\
+        --mix background=0.9,brute_force=0.05,spraying=0.03,distributed=0.02 > big.log
+    python benchmarks/workload.py --lines 100000 --format audit-jsonl > audit.log.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+
+DEFAULT_MIX = {"background": 0.9, "brute_force": 0.05, "spraying": 0.03, "distributed": 0.02}
+FORMATS = ("text", "audit-jsonl")
+
+
+def parse_mix(text):
+    """"background=0.9,spraying=0.1" -> weights dict."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def generate_lines(count, seed=1, mix=None, malformed_rate=0.0, users=5000, ips=20000, fmt="text",
+                   start=datetime(2025, 12, 31)):
+    """Yield `count` log lines (with trailing newlines)."""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    scenarios, weights = list(mix), list(mix.values())
+    user_names = [f"user{i}" for i in range(users)]
+    ip_names = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(ips)]
+    brute_pairs = [(rng.choice(user_names), rng.choice(ip_names)) for _ in range(5)]
+    spray_ips = [rng.choice(ip_names) for _ in range(3)]
+    targeted_users = [rng.choice(user_names) for _ in range(3)]
+
+    ts = start
+    for _ in range(count):
+        ts += timedelta(seconds=rng.choice((0, 0, 0, 1, 2)))
+        if rng.random() < malformed_rate:
+            yield rng.choice(("garbage line here\n", f"{ts:%Y-%m-%d} user=broken\n", "\n"))
+            continue
+
+        scenario = rng.choices(scenarios, weights)[0]
+        if scenario == "background":
+            user, ip = rng.choice(user_names), rng.choice(ip_names)
+            action = rng.choices(("login_success", "login_failed", "unauthorized_access"), (90, 9, 1))[0]
+        elif scenario == "brute_force":
+            (user, ip), action = rng.choice(brute_pairs), "login_failed"
+        elif scenario == "spraying":
+            user, ip, action = rng.choice(user_names), rng.choice(spray_ips), "login_failed"
+        else:
+            user, ip, action = rng.choice(targeted_users), rng.choice(ip_names), "login_failed"
+
+        if fmt == "audit-jsonl":
+            yield json.dumps({"timestamp": f"{ts:%Y-%m-%dT%H:%M:%S}.{rng.randrange(10 ** 6):06d}+00:00Z",
+                              "event": action, "username": user, "role": "user", "details": None,
+                              "ip": ip}) + "\n"
+        else:
+            yield f"{ts:%Y-%m-%d %H:%M:%S} user={user} ip={ip} action={action}\n"
+
+
+def write_workload(path, count, **options):
+    """Write a generated log to path; returns path."""
+    with open(path, "w") as f:
+        f.writelines(generate_lines(count, **options))
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Seeded synthetic auth-log generator")
+    ap.add_argument("--lines", type=int, default=100_000)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="scenario=weight,...")
+    ap.add_argument("--malformed-rate", type=float, default=0.01)
+    ap.add_argument("--users", type=int, default=5000)
+    ap.add_argument("--ips", type=int, default=20000)
+    ap.add_argument("--format", choices=FORMATS, default="text")
+    opts = ap.parse_args()
+    sys.stdout.writelines(generate_lines(opts.lines, opts.seed, opts.mix, opts.malformed_rate,
+                                         opts.users, opts.ips, opts.format))
+
+
+if __name__ == "__main__":
+    main()
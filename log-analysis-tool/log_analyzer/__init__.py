@@ -0,0 +1,25 @@
+"""
+Log Analysis Tool: detect brute-force and password-spraying activity in auth logs and
+password_manager audit logs.
+
+Importing the package has no side effects (no config read, no directories created, no
+argument parsing); the command line lives in log_analyzer.cli (python -m log_analyzer).
+"""
+from .alerts import check_alerts
+from .analyzer import Analyzer
+from .approx import CountMinSketch, HeavyHitters, SpaceSaving
+from .attempts import FailedAttempts, merge_by_timestamp, merge_failed_attempts
+from .config import DEFAULTS, Config, load_config
+from .inputs import expand_log_inputs, iter_log_lines
+from .metrics import Metrics, run_profiled
+from .parsers import LOG_PARSERS, parse_audit_line, parse_log_line, resolve_log_format
+from .rules import check_rule_alerts
+from .scan import analyze_log_files, analyze_logs, collect_failed_attempts
+
+__all__ = [
+    "Analyzer", "Config", "DEFAULTS", "load_config", "Metrics", "run_profiled",
+    "FailedAttempts", "merge_failed_attempts", "merge_by_timestamp", "analyze_logs", "analyze_log_files",
+    "collect_failed_attempts", "expand_log_inputs", "iter_log_lines",
+    "LOG_PARSERS", "parse_log_line", "parse_audit_line", "resolve_log_format",
+    "check_alerts", "check_rule_alerts", "CountMinSketch", "SpaceSaving", "HeavyHitters",
+]
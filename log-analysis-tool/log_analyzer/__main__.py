@@ -0,0 +1,4 @@
+# python -m log_analyzer
+from .cli import main
+
+main()
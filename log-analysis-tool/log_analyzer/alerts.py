@@ -0,0 +1,209 @@
+# === ALERTING ===
+from datetime import datetime              # alert stamps
+from itertools import islice               # pairwise sortedness check
+from operator import le                    # pairwise sortedness check
+# import smtplib                           # Uncomment if email alerts are needed
+# from email.message import EmailMessage   # Uncomment if email alerts are needed
+
+from .metrics import Metrics
+from .timestamps import TIMESTAMP_FORMAT
+
+_np = None  # numpy once imported, False if it is not installed
+
+
+def _numpy():
+    """Optional NumPy for vectorized window counting, imported on first large column so startup stays fast."""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+
+def format_alert(kind, user, ip, window_count, time_window_minutes, threshold, now_str=None):
+    """
+    Build one alert line for the alert log.
+    kind is "open" (threshold crossed), "update" (open episode grew) or "clear" (dropped back).
+    """
+    now_str = now_str or datetime.now().strftime(TIMESTAMP_FORMAT)
+    if kind == "update":
+        return (f"[{now_str}] ALERT UPDATE: User '{user}' from IP {ip} now has {window_count} "
+                f"failed attempts within {time_window_minutes} minutes.\n")
+    if kind == "clear":
+        return (f"[{now_str}] ALERT CLEARED: User '{user}' from IP {ip} dropped below {threshold} "
+                f"failed attempts within {time_window_minutes} minutes (peak {window_count}).\n")
+    return (f"[{now_str}] ALERT: User '{user}' from IP {ip} had {window_count} failed attempts "
+            f"within {time_window_minutes} minutes.\n")
+
+
+class AlertEpisode:
+    """
+    Alert state for one key. An episode opens when the window count reaches the threshold,
+    optionally reports growth every `update_every` attempts, and closes once the window
+    falls back below the threshold, so a burst yields a few lines instead of one per event.
+    """
+    __slots__ = ("is_open", "reported", "peak")
+
+    def __init__(self):
+        self.is_open = False
+        self.reported = 0
+        self.peak = 0
+
+    def observe(self, count_before, count, threshold, update_every=0):
+        """
+        Feed one event. count_before is the window count just before it (after expiry),
+        count the count including it. Returns a list of (kind, window_count) transitions.
+        """
+        transitions = []
+        if self.is_open and count_before < threshold:
+            transitions.append(("clear", self.peak))
+            self.is_open = False
+        if not self.is_open:
+            if count >= threshold:
+                self.is_open = True
+                self.reported = self.peak = count
+                transitions.append(("open", count))
+            return transitions
+        if count > self.peak:
+            self.peak = count
+        if update_every and count >= self.reported + update_every:
+            self.reported = count
+            transitions.append(("update", count))
+        return transitions
+
+
+VECTORIZE_MIN_EVENTS = 256  # below this, NumPy call overhead outweighs the vectorized loop
+
+
+def is_sorted(values):
+    """True if values are in non-decreasing order (single C-level pass)."""
+    if len(values) >= VECTORIZE_MIN_EVENTS and (np := _numpy()) is not None:
+        return bool((np.diff(np.asarray(values, dtype=np.int64)) >= 0).all())
+    return all(map(le, values, islice(values, 1, None)))
+
+
+def window_counts(timestamps, window_seconds):
+    """
+    For each event in a sorted column, the number of events in the window ending at it
+    (timestamps[end] - timestamps[start] <= window). Vectorized with NumPy when available.
+    """
+    if len(timestamps) >= VECTORIZE_MIN_EVENTS and (np := _numpy()) is not None:
+        ts = np.asarray(timestamps, dtype=np.int64)
+        first = np.searchsorted(ts, ts - window_seconds, side="left")
+        return np.arange(1, len(ts) + 1) - first
+
+    counts = []
+    start = 0
+    for end, timestamp in enumerate(timestamps):
+        while timestamp - timestamps[start] > window_seconds:
+            start += 1
+        counts.append(end - start + 1)
+    return counts
+
+
+def episode_transitions(counts, threshold, update_every=0):
+    """
+    Apply AlertEpisode rules to a key's window counts.
+    Returns ([(event_index, kind, window_count), ...], peak of the episode still open or None).
+    Without updates and with NumPy the transitions are found with array masks: an episode
+    is open after an event exactly when its count >= threshold.
+    """
+    if not update_every and len(counts) >= VECTORIZE_MIN_EVENTS and (np := _numpy()) is not None:
+        c = np.asarray(counts)
+        prev = np.zeros_like(c)
+        prev[1:] = c[:-1]
+        was_open = prev >= threshold
+        dropped = (c - 1) < threshold
+        clears = np.flatnonzero(was_open & dropped)
+        opens = np.flatnonzero((c >= threshold) & (~was_open | dropped))
+        if not len(opens):
+            return [], None
+        peaks = np.maximum.reduceat(c, opens)
+        transitions = [(int(i), "open", int(c[i])) for i in opens]
+        transitions.extend((int(i), "clear", int(peak)) for i, peak in zip(clears, peaks))
+        transitions.sort(key=lambda t: (t[0], t[1] == "open"))  # a clear precedes a re-open
+        open_peak = int(peaks[-1]) if len(opens) > len(clears) else None
+        return transitions, open_peak
+
+    episode = AlertEpisode()
+    transitions = []
+    for index, count in enumerate(counts):
+        if count < threshold and not episode.is_open:
+            continue
+        for kind, window_count in episode.observe(count - 1, count, threshold, update_every):
+            transitions.append((index, kind, window_count))
+    return transitions, episode.peak if episode.is_open else None
+
+
+def restored_latest(failed_attempts, already_alerted):
+    """Newest timestamp restored from a checkpoint (where the previous run stopped), or None."""
+    # Restored timestamps lead each column (see merge_failed_attempts)
+    return max((max(failed_attempts[key][:restored]) for key, restored in (already_alerted or {}).items()
+                if restored), default=None)
+
+
+def check_alerts(failed_attempts, threshold, time_window_minutes, alert_email=None, already_alerted=None,
+                 update_every=0, alert_log_file=None, metrics=None):
+    """
+    Check for alert episodes and log them (appended to alert_log_file when given).
+    Optional email notification is commented out.
+    Timestamps are used in ingestion order when already sorted (the normal case) and are
+    never re-sorted in place. already_alerted maps a key to how many of its leading
+    timestamps were restored from a checkpoint; their transitions were logged by the
+    previous run, so they only rebuild episode state here.
+    """
+    window_seconds = time_window_minutes * 60
+    already_alerted = already_alerted or {}
+    now_str = datetime.now().strftime(TIMESTAMP_FORMAT)
+    alerts = []
+
+    with (metrics or Metrics()).stage("alerts_sort"):
+        ordered = {key: ts if is_sorted(ts) else sorted(ts) for key, ts in failed_attempts.items() if len(ts)}
+    latest = max((ts[-1] for ts in ordered.values()), default=None)
+    previous_latest = restored_latest(failed_attempts, already_alerted)
+
+    for (user, ip), timestamps in ordered.items():
+        if len(timestamps) < threshold:
+            continue  # can never reach the threshold
+        skip = already_alerted.get((user, ip), 0)
+        transitions, open_peak = episode_transitions(window_counts(timestamps, window_seconds),
+                                                     threshold, update_every)
+        for index, kind, window_count in transitions:
+            if index >= skip:
+                alerts.append(format_alert(kind, user, ip, window_count, time_window_minutes,
+                                           threshold, now_str))
+
+        # By the end of the data the window may already have emptied below the threshold; a key
+        # with no new events whose window had emptied by the previous run's end was cleared by it
+        if (open_peak is not None and latest - timestamps[-threshold] > window_seconds
+                and not (len(timestamps) <= skip and previous_latest - timestamps[-threshold] > window_seconds)):
+            alerts.append(format_alert("clear", user, ip, open_peak, time_window_minutes, threshold, now_str))
+
+    if alerts and alert_log_file is not None:
+        with alert_log_file.open("a") as f:
+            f.writelines(alerts)
+
+    # Email notification (uncomment to enable)
+    """
+    if alert_email and alerts:
+        def send_email_alert(to_email, alerts):
+            msg = EmailMessage()
+            msg['Subject'] = 'Suspicious Activity Alert'
+            msg['From'] = '<YOUR_EMAIL>'
+            msg['To'] = to_email
+            msg.set_content("The following alerts were generated:\n\n" + "".join(alerts))
+            try:
+                with smtplib.SMTP('<SMTP_SERVER>', <PORT>) as server:
+                    server.starttls()
+                    server.login('<USERNAME>', '<PASSWORD>')
+                    server.send_message(msg)
+                print(f"Alert email sent to {to_email}")
+            except Exception as e:
+                print(f"Failed to send alert email: {e}")
+        send_email_alert(alert_email, alerts)
+    """
+
+    return alerts
@@ -0,0 +1,223 @@
+# === ANALYZER ===
+from pathlib import Path                   # handle file paths
+
+from .alerts import check_alerts, format_alert
+from .approx import HeavyHitters
+from .attempts import FailedAttempts, merge_failed_attempts
+from .checkpoint import complete_lines_end, load_checkpoint, save_checkpoint
+from .config import Config
+from .inputs import compression_of, expand_log_inputs, iter_decompressed_lines
+from .follow import SlidingWindowDetector, follow_lines
+from .metrics import Metrics
+from .parsers import get_line_parser, resolve_log_format
+from .reports import print_report, write_csv_report
+from .rules import check_rule_alerts, write_rule_report
+from .scan import analyze_log_files, analyze_logs, count_sink_lines, iter_mmap_candidate_lines
+from .sinks import OutputSink
+
+
+class Analyzer:
+    """
+    The analysis pipeline bound to one Config: parse and aggregate each input, then report
+    and alert on the combined events.
+
+    Importing the package and building an Analyzer do no I/O (see load_config for reading
+    config.json); output directories are created on the first write. One Analyzer can
+    process any number of files in one process, sharing the parsers, the timestamp cache
+    and the compiled prefilters, so N rotated files cost one interpreter start instead of N:
+
+        analyzer = Analyzer(load_config())
+        alerts = analyzer.run("logs/auth.log*")  # auth.log.14.gz ... auth.log.1, auth.log
+    """
+
+    def __init__(self, config=None, metrics=None):
+        self.config = config or Config()
+        self.metrics = metrics or Metrics()
+        self._outputs_ready = False
+
+    def _prepare_outputs(self):
+        """Ensure directories exist for all output paths (once)."""
+        if not self._outputs_ready:
+            for path in self.config.output_paths():
+                path.parent.mkdir(parents=True, exist_ok=True)
+            self._outputs_ready = True
+
+    def _inputs(self, log_files):
+        """Files for a path, directory, glob or list of them (default: config.log_file); see expand_log_inputs."""
+        return expand_log_inputs(self.config.log_file if log_files is None else log_files)
+
+    def line_parser(self, log_file):
+        """(resolved format, parse_line) for one input file."""
+        log_format = resolve_log_format(log_file, self.config.log_format)
+        return log_format, get_line_parser(log_format, self.config.audit_event_actions,
+                                           self.config.audit_default_ip)
+
+    # === PARSE / AGGREGATE ===
+    def analyze(self, log_file, start=0, end=None):
+        """Parse one file (or the byte range [start, end) of it) into a FailedAttempts."""
+        cfg = self.config
+        self._prepare_outputs()
+        return analyze_logs(Path(log_file), cfg.suspicious_actions, cfg.write_analyzed_log, cfg.flush_every_lines,
+                            cfg.workers, cfg.use_mmap, start, end, cfg.log_format, cfg.analyzed_log_file,
+                            cfg.malformed_log_file, cfg.audit_event_actions, cfg.audit_default_ip, self.metrics)
+
+    def analyze_files(self, log_files):
+        """Parse several (possibly compressed) files and merge their events by timestamp."""
+        cfg = self.config
+        self._prepare_outputs()
+        return analyze_log_files(self._inputs(log_files), cfg.suspicious_actions, cfg.write_analyzed_log,
+                                 cfg.flush_every_lines, cfg.workers, cfg.use_mmap, cfg.log_format,
+                                 cfg.analyzed_log_file, cfg.malformed_log_file, cfg.audit_event_actions,
+                                 cfg.audit_default_ip, self.metrics)
+
+    # === REPORT / ALERT ===
+    def report(self, failed_attempts, already_alerted=None):
+        """Print the report, write the CSVs and check alerts and rules; returns every alert line."""
+        cfg, metrics = self.config, self.metrics
+        self._prepare_outputs()
+        metrics.count("keys", len(failed_attempts))
+        with metrics.stage("report"):
+            print_report(failed_attempts, cfg.threshold)
+        with metrics.stage("csv_report"):
+            write_csv_report(failed_attempts, cfg.report_file, cfg.threshold)
+        with metrics.stage("alerts"):  # includes alerts_sort
+            alerts = check_alerts(failed_attempts, cfg.threshold, cfg.time_window_minutes,
+                                  already_alerted=already_alerted, update_every=cfg.alert_update_every,
+                                  alert_log_file=cfg.alert_log_file, metrics=metrics)
+        with metrics.stage("rules"):
+            rule_alerts, rule_rows = check_rule_alerts(failed_attempts, cfg.rules, already_alerted,
+                                                       cfg.alert_update_every, cfg.alert_log_file)
+            write_rule_report(rule_rows, cfg.rule_report_file)
+        metrics.count("alerts", len(alerts))
+        metrics.count("rule_alerts", len(rule_alerts))
+        return alerts + rule_alerts
+
+    def run(self, log_files=None, full_rescan=False):
+        """
+        Batch analysis of one or more files (default: config.log_file), then report() on
+        all of their events together. With config.checkpoint_file set, a single input is
+        resumed from (and saved back to) the checkpoint unless full_rescan.
+        """
+        cfg, metrics = self.config, self.metrics
+        inputs = self._inputs(log_files)
+        checkpoint_file = cfg.checkpoint_file
+        if checkpoint_file and len(inputs) > 1:
+            raise ValueError("A checkpoint tracks one log file; analyze several files without one")
+        if checkpoint_file and compression_of(inputs[0]) is not None:
+            raise ValueError(f"A checkpoint needs an uncompressed log: {inputs[0]}")
+
+        start, restored, end = 0, FailedAttempts(), None
+        if checkpoint_file:
+            log_file = inputs[0]
+            with metrics.stage("checkpoint_load"):
+                if not full_rescan:
+                    start, restored = load_checkpoint(checkpoint_file, log_file, cfg.time_window_minutes,
+                                                      cfg.suspicious_actions, cfg.rule_windows())
+                end = complete_lines_end(log_file)
+            if start:
+                print(f"Resuming {log_file} from byte {start} ({end - start} new bytes).")
+
+        already_alerted = {key: len(timestamps) for key, timestamps in restored.items()}
+        with metrics.stage("parse"):  # includes analyzed_log_write
+            if checkpoint_file:
+                new_attempts = self.analyze(inputs[0], start, end)
+            else:
+                new_attempts = self.analyze_files(inputs)
+            failed_attempts = merge_failed_attempts([restored, new_attempts])
+        alerts = self.report(failed_attempts, already_alerted)
+        if checkpoint_file:
+            with metrics.stage("checkpoint_save"):
+                save_checkpoint(checkpoint_file, inputs[0], end, failed_attempts, cfg.time_window_minutes,
+                                cfg.suspicious_actions, cfg.rule_windows())
+        return alerts
+
+    # === FOLLOW MODE ===
+    def follow(self, log_file=None, from_start=False):
+        """Tail log_file forever, alerting as soon as a key's window count reaches the threshold."""
+        cfg, metrics = self.config, self.metrics
+        log_file = self._inputs(log_file)[0]
+        if compression_of(log_file) is not None:
+            raise ValueError(f"Cannot follow a compressed log: {log_file}")
+        _, parse_line = self.line_parser(log_file)
+        suspicious_actions, threshold, time_window_minutes = (cfg.suspicious_actions, cfg.threshold,
+                                                              cfg.time_window_minutes)
+        detector = SlidingWindowDetector(threshold, time_window_minutes, cfg.alert_update_every)
+        self._prepare_outputs()
+
+        print(f"Following {log_file} (threshold = {threshold} failed attempts "
+              f"within {time_window_minutes} minutes). Press Ctrl+C to stop.")
+        with OutputSink(cfg.analyzed_log_file, cfg.flush_every_lines, enabled=cfg.write_analyzed_log,
+                        stage="analyzed_log_write", metrics=metrics) as analyzed_sink, \
+                OutputSink(cfg.malformed_log_file, cfg.flush_every_lines) as malformed_sink, \
+                OutputSink(cfg.alert_log_file, flush_every=1) as alert_sink:
+            lines = follow_lines(log_file, cfg.poll_interval_seconds, from_start)
+            if metrics.enabled:
+                lines = metrics.counted(lines, "lines_parsed")
+            try:
+                for line in lines:
+                    parsed = parse_line(line, analyzed_sink, malformed_sink)
+                    if parsed is None:
+                        continue
+                    timestamp, user, ip, action = parsed
+                    if action not in suspicious_actions:
+                        continue
+                    metrics.count("events")
+                    for kind, (alert_user, alert_ip), window_count in detector.add((user, ip), timestamp):
+                        alert_msg = format_alert(kind, alert_user, alert_ip, window_count, time_window_minutes,
+                                                 threshold)
+                        alert_sink.write(alert_msg)
+                        metrics.count("alerts")
+                        print(alert_msg.strip(), flush=True)
+            finally:
+                lines.close()
+                count_sink_lines(metrics, analyzed_sink, malformed_sink)
+
+    # === APPROXIMATE HEAVY HITTERS ===
+    def approx(self, log_files=None):
+        """
+        Single pass over each file that keeps fixed-size heavy-hitter summaries instead of
+        per-key timestamps. Memory depends only on the approx_* settings, not on how many
+        distinct keys appear. Returns {"ip": HeavyHitters, "user": HeavyHitters, "user_ip": HeavyHitters}.
+        """
+        cfg = self.config
+        summaries = {name: HeavyHitters(cfg.approx_capacity, cfg.approx_cms_width, cfg.approx_cms_depth)
+                     for name in ("ip", "user", "user_ip")}
+        self._prepare_outputs()
+        for log_file in self._inputs(log_files):
+            self._approx_file(log_file, summaries)
+        return summaries
+
+    def _approx_file(self, log_file, summaries):
+        cfg, metrics = self.config, self.metrics
+        suspicious_actions = cfg.suspicious_actions
+        log_format, parse_line = self.line_parser(log_file)
+        by_ip, by_user, by_pair = summaries["ip"], summaries["user"], summaries["user_ip"]
+        with OutputSink(cfg.analyzed_log_file, cfg.flush_every_lines, enabled=cfg.write_analyzed_log,
+                        stage="analyzed_log_write", metrics=metrics) as analyzed_sink, \
+                OutputSink(cfg.malformed_log_file, cfg.flush_every_lines) as malformed_sink:
+            compression = compression_of(log_file)
+            if compression is not None:
+                f = None
+                lines = iter_decompressed_lines(log_file, compression)
+            elif cfg.use_mmap:
+                f = None
+                lines = iter_mmap_candidate_lines(log_file, suspicious_actions, log_format=log_format,
+                                                  event_actions=cfg.audit_event_actions)
+            else:
+                f = lines = log_file.open("r")
+            if metrics.enabled:
+                lines = metrics.counted(lines, "lines_parsed")
+            try:
+                for line in lines:
+                    parsed = parse_line(line, analyzed_sink, malformed_sink)
+                    if parsed is None:
+                        continue
+                    _, user, ip, action = parsed
+                    if action in suspicious_actions:
+                        by_ip.add(ip)
+                        by_user.add(user)
+                        by_pair.add((user, ip))
+            finally:
+                if f is not None:
+                    f.close()
+                count_sink_lines(metrics, analyzed_sink, malformed_sink)
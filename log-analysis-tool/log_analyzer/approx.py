@@ -0,0 +1,127 @@
+# === APPROXIMATE HEAVY HITTERS ===
+import heapq                               # Space-Saving minimum counter
+import math                                # Count-Min error bounds
+from array import array                    # fixed-size sketch rows
+
+
+class CountMinSketch:
+    """
+    Fixed-size frequency sketch. estimate() never undercounts and overcounts by at most
+    epsilon * total with probability at least 1 - delta (epsilon = e / width, delta = e^-depth).
+    """
+
+    def __init__(self, width, depth):
+        self.width = width
+        self.depth = depth
+        self.rows = [array("Q", bytes(8 * width)) for _ in range(depth)]
+        self.total = 0
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def delta(self):
+        return math.exp(-self.depth)
+
+    def _hashes(self, item):
+        # Double hashing: row i uses column (h1 + i * h2) % width
+        h = hash(item) & 0xFFFFFFFFFFFFFFFF
+        return h & 0xFFFFFFFF, (h >> 32) | 1
+
+    def add(self, item, count=1):
+        self.total += count
+        h1, h2 = self._hashes(item)
+        width = self.width
+        for row in self.rows:
+            row[h1 % width] += count
+            h1 += h2
+
+    def estimate(self, item):
+        h1, h2 = self._hashes(item)
+        width = self.width
+        best = None
+        for row in self.rows:
+            value = row[h1 % width]
+            if best is None or value < best:
+                best = value
+            h1 += h2
+        return best
+
+
+class SpaceSaving:
+    """
+    Space-Saving top-k counter (Metwally et al.) holding at most `capacity` items.
+    A new item evicts the current minimum and inherits its count as error, so for
+    every tracked item: count - error <= true count <= count.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counters = {}  # item -> [count, error]
+        self._heap = []     # lazy (count, item) entries; rebuilt before it outgrows the counters
+
+    def add(self, item):
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += 1
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[item] = [1, 0]
+            heapq.heappush(self._heap, (1, item))
+            return
+
+        # Evict the minimum; skip heap entries made stale by later increments
+        while True:
+            count, victim = heapq.heappop(self._heap)
+            current = self.counters.get(victim)
+            if current is not None and current[0] == count:
+                break
+            if current is not None:
+                heapq.heappush(self._heap, (current[0], victim))
+        del self.counters[victim]
+        self.counters[item] = [count + 1, count]
+        heapq.heappush(self._heap, (count + 1, item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, key) for key, (c, _) in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def top(self, k):
+        """[(item, count, error), ...] for the k largest counts."""
+        best = heapq.nlargest(k, self.counters.items(), key=lambda kv: kv[1][0])
+        return [(item, count, error) for item, (count, error) in best]
+
+
+class HeavyHitters:
+    """Space-Saving candidates plus a Count-Min sketch for one grouping (IP, user or pair)."""
+
+    def __init__(self, capacity, width, depth):
+        self.space_saving = SpaceSaving(capacity)
+        self.sketch = CountMinSketch(width, depth)
+
+    def add(self, item):
+        self.space_saving.add(item)
+        self.sketch.add(item)
+
+    def top(self, k):
+        """[(item, lower, upper), ...]: both sketches give upper bounds, Space-Saving a lower one."""
+        rows = []
+        for item, count, error in self.space_saving.top(k):
+            upper = min(count, self.sketch.estimate(item))
+            rows.append((item, count - error, upper))
+        return rows
+
+
+def print_top_report(summaries, top_k):
+    """Print the --approx top-K lists with their error bounds."""
+    sketch = summaries["ip"].sketch
+    print(f"\nTop {top_k} failed-attempt sources (approximate, {sketch.total} events; "
+          f"Count-Min overestimate <= {sketch.epsilon * sketch.total:.0f} "
+          f"with probability {1 - sketch.delta:.3f}):")
+    sections = [("ip", "IP addresses"), ("user", "Users"), ("user_ip", "User/IP pairs")]
+    for name, title in sections:
+        print(f"\n{title}:")
+        for item, low, high in summaries[name].top(top_k):
+            label = f"User '{item[0]}' from IP {item[1]}" if name == "user_ip" else item
+            bounds = "exact" if low == high else f"between {low} and {high}"
+            print(f"  {label}: ~{high} failed attempts ({bounds})")
@@ -0,0 +1,110 @@
+# === COLUMNAR STORAGE ===
+import heapq                               # k-way merge of per-file columns
+from array import array                    # compact per-key timestamp columns
+
+
+class FailedAttempts:
+    """
+    Suspicious events grouped by (user, ip), stored compactly: user and IP strings are
+    interned to integer IDs and each key's timestamps are epoch seconds in an array('I')
+    (4 bytes per event instead of a datetime object plus a list slot).
+    items() yields ((user, ip), timestamps) in first-seen key order, like the old dict.
+    """
+
+    TYPECODE = "I"
+
+    def __init__(self):
+        self.users = []      # user id -> user
+        self.ips = []        # ip id -> ip
+        self.columns = {}    # (user id, ip id) -> array of epoch seconds
+        self._user_ids = {}
+        self._ip_ids = {}
+
+    def column(self, user, ip):
+        """Timestamp column for (user, ip), created empty on first use."""
+        user_id = self._user_ids.get(user)
+        if user_id is None:
+            user_id = self._user_ids[user] = len(self.users)
+            self.users.append(user)
+        ip_id = self._ip_ids.get(ip)
+        if ip_id is None:
+            ip_id = self._ip_ids[ip] = len(self.ips)
+            self.ips.append(ip)
+        key = (user_id, ip_id)
+        col = self.columns.get(key)
+        if col is None:
+            col = self.columns[key] = array(self.TYPECODE)
+        return col
+
+    def add(self, user, ip, timestamp):
+        self.column(user, ip).append(timestamp)
+
+    def update(self, other):
+        """Append another FailedAttempts' events after ours (IDs are remapped)."""
+        for (user, ip), timestamps in other.items():
+            self.column(user, ip).extend(timestamps)
+
+    def items(self):
+        users, ips = self.users, self.ips
+        for (user_id, ip_id), timestamps in self.columns.items():
+            yield (users[user_id], ips[ip_id]), timestamps
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def values(self):
+        return self.columns.values()
+
+    def __getitem__(self, key):
+        user, ip = key
+        return self.columns[(self._user_ids[user], self._ip_ids[ip])]
+
+    def __contains__(self, key):
+        user, ip = key
+        return (self._user_ids.get(user), self._ip_ids.get(ip)) in self.columns
+
+    def __len__(self):
+        return len(self.columns)
+
+    def event_count(self):
+        return sum(len(timestamps) for timestamps in self.columns.values())
+
+
+def merge_failed_attempts(partials):
+    """
+    Merge partial maps in file order. Because ranges are contiguous and merged in order,
+    key order and per-key timestamp order match a serial run.
+    """
+    merged = FailedAttempts()
+    for partial in partials:
+        merged.update(partial)
+    return merged
+
+
+def merge_by_timestamp(partials):
+    """
+    K-way merge of per-file maps (e.g. rotated logs) by timestamp, so a key's sliding window
+    sees its events in time order across file boundaries whatever order the files came in.
+    Keys are ordered by their first event. Partials are taken in order of their earliest
+    event; a key's columns that follow each other in time are concatenated, overlapping
+    ones are merged with heapq.merge.
+    """
+    partials = [p for p in partials if p.event_count()]
+    if len(partials) <= 1:
+        return partials[0] if partials else FailedAttempts()
+    partials.sort(key=lambda p: min(min(ts) for ts in p.values() if ts))
+
+    columns = {}  # (user, ip) -> [column per partial]
+    for partial in partials:
+        for key, timestamps in partial.items():
+            if timestamps:
+                columns.setdefault(key, []).append(timestamps)
+    merged = FailedAttempts()
+    for (user, ip), parts in sorted(columns.items(), key=lambda item: min(part[0] for part in item[1])):
+        column = merged.column(user, ip)
+        if all(prev[-1] <= part[0] for prev, part in zip(parts, parts[1:])):
+            for part in parts:
+                column.extend(part)
+        else:
+            column.extend(heapq.merge(*parts))
+    return merged
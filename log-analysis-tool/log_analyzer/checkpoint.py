@@ -0,0 +1,108 @@
+# === CHECKPOINTS ===
+import hashlib                             # fingerprint of the file head
+import json                                # checkpoint file format
+import os                                  # atomic replace, seek to end
+
+from .attempts import FailedAttempts
+
+HEAD_FINGERPRINT_BYTES = 4096              # leading bytes hashed to recognise the same file contents
+
+
+def complete_lines_end(log_file, block_size=64 * 1024):
+    """Byte offset just past the last newline, so a line still being written is left for next run."""
+    with log_file.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            read_from = max(0, pos - block_size)
+            f.seek(read_from)
+            block = f.read(pos - read_from)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                return read_from + newline + 1
+            pos = read_from
+    return 0
+
+
+def head_fingerprint(log_file, size):
+    """SHA-256 of the first `size` bytes of the file (hex)."""
+    with log_file.open("rb") as f:
+        return hashlib.sha256(f.read(size)).hexdigest()
+
+
+def window_snapshot(failed_attempts, time_window_minutes):
+    """
+    Keep, per key, only the timestamps still inside the alert window of the newest event.
+    That is all a later run needs to evaluate windows that straddle the checkpoint.
+    """
+    latest = max((max(ts) for ts in failed_attempts.values() if ts), default=None)
+    if latest is None:
+        return {}
+    cutoff = latest - time_window_minutes * 60
+    snapshot = {}
+    for key, timestamps in failed_attempts.items():
+        recent = sorted(ts for ts in timestamps if ts >= cutoff)
+        if recent:
+            snapshot[key] = recent
+    return snapshot
+
+
+def save_checkpoint(checkpoint_file, log_file, offset, failed_attempts, time_window_minutes, suspicious_actions,
+                    rule_windows=None):
+    """
+    Atomically write the file identity and head fingerprint, resume offset and windowed per-key
+    state. rule_windows maps each enabled cross-key rule to its time_window_minutes; the state
+    covers the widest of those and the main window.
+    """
+    rule_windows = rule_windows or {}
+    st = log_file.stat()
+    head_size = min(offset, HEAD_FINGERPRINT_BYTES)
+    data = {
+        "log_file": str(log_file.resolve()),
+        "device": st.st_dev,
+        "inode": st.st_ino,
+        "offset": offset,
+        "head_size": head_size,
+        "head_sha256": head_fingerprint(log_file, head_size),
+        "time_window_minutes": time_window_minutes,
+        "rule_windows": rule_windows,
+        "suspicious_actions": sorted(suspicious_actions),
+        "windows": [[user, ip, timestamps]
+                    for (user, ip), timestamps in window_snapshot(
+                        failed_attempts, max([time_window_minutes, *rule_windows.values()])).items()],
+    }
+    checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = checkpoint_file.with_name(checkpoint_file.name + ".tmp")
+    with tmp.open("w") as f:
+        json.dump(data, f)
+    os.replace(tmp, checkpoint_file)
+
+
+def load_checkpoint(checkpoint_file, log_file, time_window_minutes, suspicious_actions, rule_windows=None):
+    """
+    Return (offset, windows) to resume from, or (0, empty FailedAttempts) for a full rescan.
+    A checkpoint is only reused for the same file (path, device and inode), when the file
+    has not shrunk below the saved offset and the windows (main and rule_windows, see
+    save_checkpoint) and actions are unchanged. The hash of
+    the file's first bytes must also match: a copytruncate rotation keeps the inode, and once
+    the new contents grow past the saved offset the size check alone would resume mid-file.
+    """
+    if checkpoint_file is None or not checkpoint_file.exists():
+        return 0, FailedAttempts()
+    try:
+        with checkpoint_file.open("r") as f:
+            data = json.load(f)
+        st = log_file.stat()
+        if (data["log_file"] != str(log_file.resolve()) or data["device"] != st.st_dev
+                or data["inode"] != st.st_ino or data["offset"] > st.st_size
+                or data["time_window_minutes"] != time_window_minutes
+                or data.get("rule_windows", {}) != (rule_windows or {})
+                or data["suspicious_actions"] != sorted(suspicious_actions)
+                or head_fingerprint(log_file, data["head_size"]) != data["head_sha256"]):
+            return 0, FailedAttempts()
+        windows = FailedAttempts()
+        for user, ip, timestamps in data["windows"]:
+            windows.column(user, ip).extend(timestamps)
+        return data["offset"], windows
+    except (KeyError, TypeError, ValueError, OverflowError):
+        print(f"Ignoring unreadable checkpoint {checkpoint_file}; running a full scan.")
+        return 0, FailedAttempts()
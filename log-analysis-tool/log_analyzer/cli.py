@@ -0,0 +1,109 @@
+# === COMMAND LINE ===
+import argparse                            # handle CLI arguments
+import sys                                 # --stats goes to stderr
+from pathlib import Path                   # handle file paths
+
+from .analyzer import Analyzer
+from .approx import print_top_report
+from .config import CONFIG_FILE, load_config
+from .inputs import compression_of, expand_log_inputs
+from .metrics import Metrics, run_profiled
+
+
+def build_parser():
+    """
+    CLI options. Defaults are None so that only options actually given override config.json
+    (see config_overrides).
+    """
+    parser = argparse.ArgumentParser(prog="log_analyzer", description="Log Analysis Tool")
+    parser.add_argument("--config", type=Path, default=CONFIG_FILE, help="Path to config.json")
+    parser.add_argument("--logfile", nargs="+",
+                        help="Log files, directories or glob patterns to analyze; .gz/.bz2/.xz are "
+                             "decompressed on the fly (default: log_file from the config)")
+    parser.add_argument("--reportfile", type=Path, help="Path to the output CSV report")
+    parser.add_argument("--threshold", type=int, help="Failed attempts threshold")
+    parser.add_argument("--no-analyzed-log", action="store_true", help="Skip echoing parsed lines to the analyzed log")
+    parser.add_argument("--flush-every", type=int,
+                        help="Flush output files every N lines (0 = only when the buffer fills)")
+    parser.add_argument("--workers", type=int,
+                        help="Parse the log in N processes (1 = serial, 0 = one per CPU)")
+    parser.add_argument("--mmap", action="store_true",
+                        help="Scan the log via mmap and only decode lines containing a suspicious action")
+    parser.add_argument("--follow", action="store_true",
+                        help="Tail the log (across rotation) and raise alerts as events arrive")
+    parser.add_argument("--from-start", action="store_true",
+                        help="In follow mode, process the existing file contents before tailing")
+    parser.add_argument("--checkpoint", type=Path, nargs="?", const=Path("logs/checkpoint.json"),
+                        help="Resume from (and update) a checkpoint so only new bytes are analyzed")
+    parser.add_argument("--full-rescan", action="store_true",
+                        help="Ignore any existing checkpoint and analyze the whole file")
+    parser.add_argument("--approx", action="store_true",
+                        help="Fixed-memory approximate mode: heavy hitters per IP, user and user/IP pair")
+    parser.add_argument("--top", type=int, default=10, help="Entries per list in the --approx report")
+    parser.add_argument("--format", choices=["auto", "text", "audit-jsonl"],
+                        help="Input format: text auth log or password_manager audit JSONL")
+    parser.add_argument("--stats", action="store_true",
+                        help="Print per-stage timings and line/event/alert counters to stderr")
+    parser.add_argument("--stats-file", type=Path,
+                        help="Write the metrics to this file (.json -> JSON, otherwise Prometheus text)")
+    parser.add_argument("--profile", type=Path, nargs="?", const=Path("logs/profile.pstats"), default=None,
+                        help="Run under cProfile and save the stats (default logs/profile.pstats)")
+    return parser
+
+
+def config_overrides(args):
+    """config.json keys set on the command line."""
+    overrides = {"report_file": args.reportfile, "threshold": args.threshold, "flush_every_lines": args.flush_every,
+                 "workers": args.workers, "checkpoint_file": args.checkpoint, "log_format": args.format,
+                 "stats_file": args.stats_file}
+    overrides = {key: value for key, value in overrides.items() if value is not None}
+    if args.no_analyzed_log:
+        overrides["write_analyzed_log"] = False
+    if args.mmap:
+        overrides["use_mmap"] = True
+    return overrides
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    config = load_config(args.config, **config_overrides(args))
+    try:
+        log_files = expand_log_inputs(args.logfile or config.log_file)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    if len(log_files) > 1 and (config.checkpoint_file or args.follow):
+        parser.error("--checkpoint and --follow take a single uncompressed log file")
+    if (config.checkpoint_file or args.follow) and compression_of(log_files[0]) is not None:
+        parser.error(f"--checkpoint and --follow need an uncompressed log file: {log_files[0]}")
+    metrics = Metrics(enabled=bool(args.stats or config.stats_file))
+    analyzer = Analyzer(config, metrics)
+
+    def workflow():
+        if args.follow:
+            try:
+                analyzer.follow(log_files[0], from_start=args.from_start)
+            except KeyboardInterrupt:
+                print("\nStopped following.")
+        elif args.approx:
+            with metrics.stage("parse"):
+                summaries = analyzer.approx(log_files)
+            with metrics.stage("report"):
+                print_top_report(summaries, args.top)
+        else:
+            alerts = analyzer.run(log_files, full_rescan=args.full_rescan)
+            if alerts:
+                print("\nALERTS GENERATED:")
+                for alert in alerts:
+                    print(alert.strip())
+
+    try:
+        if args.profile:
+            run_profiled(workflow, args.profile)
+        else:
+            workflow()
+    finally:
+        if args.stats:
+            print(metrics.summary(), file=sys.stderr)
+        if config.stats_file:
+            metrics.dump(config.stats_file)
@@ -0,0 +1,99 @@
+# === CONFIGURATION ===
+import json                                # load config file
+from pathlib import Path                   # handle file paths
+
+CONFIG_FILE = Path("config.json")
+
+# Used for any key config.json leaves out
+DEFAULTS = {
+    "threshold": 3,                        # failed login attempt threshold
+    "time_window_minutes": 10,             # time window in minutes
+    "log_file": "logs/auth.log",           # log file to analyze
+    "report_file": "logs/suspicious_report.csv",  # output CSV report
+    "analyzed_log_file": "logs/analyzed_log.txt",  # store parsed log lines
+    "suspicious_actions": ["login_failed", "unauthorized_access"],  # list of suspicious actions
+    "write_analyzed_log": True,            # echo parsed lines to analyzed_log_file
+    "flush_every_lines": 0,                # 0 = flush only when the buffer fills / on close
+    "workers": 1,                          # parser processes; 1 = serial, 0 = one per CPU
+    "use_mmap": False,                     # scan via mmap and only decode suspicious lines
+    "poll_interval_seconds": 0.5,          # follow mode: wait between reads at EOF
+    "alert_update_every": 0,               # re-alert when an episode grows by N (0 = never)
+    "checkpoint_file": None,               # resume state between runs; None = always full scan
+    "approx_capacity": 1000,               # Space-Saving counters per grouping in --approx mode
+    "approx_cms_width": 4096,              # Count-Min columns (error ~ e/width * N)
+    "approx_cms_depth": 4,                 # Count-Min rows (failure probability ~ e^-depth)
+    "rule_report_file": "logs/rule_report.csv",  # cross-key rule CSV
+    "log_format": "auto",                  # "text", "audit-jsonl" or "auto" (by suffix / first line)
+    "audit_default_ip": "-",               # audit records carry no source IP
+    "stats_file": None,                    # dump run metrics here (.json -> JSON, else Prometheus text)
+    "alert_log_file": "logs/alerts.txt",   # alert log file
+    "malformed_log_file": "logs/malformed_lines.txt",  # malformed log lines
+}
+
+# password_manager audit events counted as actions (others keep their event name)
+DEFAULT_AUDIT_EVENT_ACTIONS = {"login_failed": "login_failed", "login_blocked": "login_failed",
+                               "login_failed_unknown": "login_failed"}
+
+
+def build_rules(overrides, time_window_minutes):
+    """Cross-key rules: one IP failing against many users, many IPs failing against one user."""
+    return {
+        "password_spraying": {"group_by": "ip", "threshold": 5, "time_window_minutes": time_window_minutes,
+                              "enabled": True, **overrides.get("password_spraying", {})},
+        "distributed_brute_force": {"group_by": "user", "threshold": 5, "time_window_minutes": time_window_minutes,
+                                    "enabled": True, **overrides.get("distributed_brute_force", {})},
+    }
+
+
+class Config:
+    """
+    Analyzer settings: the given values (normally config.json) over DEFAULTS, with paths as
+    Path objects. Building one does no I/O; Analyzer creates output directories when it
+    first writes.
+    """
+
+    def __init__(self, values=None, **overrides):
+        values = {**DEFAULTS, **(values or {}), **overrides}
+        self.values = values
+        self.threshold = values["threshold"]
+        self.time_window_minutes = values["time_window_minutes"]
+        self.log_file = Path(values["log_file"])
+        self.report_file = Path(values["report_file"])
+        self.analyzed_log_file = Path(values["analyzed_log_file"])
+        self.suspicious_actions = values["suspicious_actions"]
+        self.write_analyzed_log = values["write_analyzed_log"]
+        self.flush_every_lines = values["flush_every_lines"]
+        self.workers = values["workers"]
+        self.use_mmap = values["use_mmap"]
+        self.poll_interval_seconds = values["poll_interval_seconds"]
+        self.alert_update_every = values["alert_update_every"]
+        self.checkpoint_file = Path(values["checkpoint_file"]) if values["checkpoint_file"] else None
+        self.approx_capacity = values["approx_capacity"]
+        self.approx_cms_width = values["approx_cms_width"]
+        self.approx_cms_depth = values["approx_cms_depth"]
+        self.rule_report_file = Path(values["rule_report_file"])
+        self.rules = build_rules(values.get("rules", {}), self.time_window_minutes)
+        self.log_format = values["log_format"]
+        self.audit_event_actions = {**DEFAULT_AUDIT_EVENT_ACTIONS, **values.get("audit_event_actions", {})}
+        self.audit_default_ip = values["audit_default_ip"]
+        self.stats_file = Path(values["stats_file"]) if values["stats_file"] else None
+        self.alert_log_file = Path(values["alert_log_file"])
+        self.malformed_log_file = Path(values["malformed_log_file"])
+
+    def replace(self, **overrides):
+        """Copy with some values changed (same keys as config.json)."""
+        return Config(self.values, **overrides)
+
+    def rule_windows(self):
+        """time_window_minutes of each enabled cross-key rule (what a checkpoint must cover)."""
+        return {name: rule["time_window_minutes"] for name, rule in self.rules.items() if rule.get("enabled", True)}
+
+    def output_paths(self):
+        return [self.report_file, self.analyzed_log_file, self.rule_report_file, self.alert_log_file,
+                self.malformed_log_file]
+
+
+def load_config(path=CONFIG_FILE, **overrides):
+    """Read a config.json (relative paths in it are relative to the working directory)."""
+    with open(path, "r") as f:
+        return Config(json.load(f), **overrides)
@@ -0,0 +1,116 @@
+# === FOLLOW MODE ===
+import os                                  # inode checks across rotation
+import time                                # polling interval in follow mode
+from bisect import bisect_right            # place out-of-order events in follow mode
+from collections import deque              # per-key sliding windows in follow mode
+
+from .alerts import AlertEpisode
+
+
+class SlidingWindowDetector:
+    """
+    Incremental version of the check_alerts window for a stream of events.
+    Each (user, ip) key keeps a deque of timestamps no older than time_window_minutes
+    before its newest event, so every add() is O(1) amortized. Keys that go quiet for a
+    whole window are swept out, which bounds memory by the number of recently active keys.
+    Alerts follow the same episode rules as check_alerts (see AlertEpisode).
+    """
+
+    def __init__(self, threshold, time_window_minutes, update_every=0):
+        self.threshold = threshold
+        self.time_window_minutes = time_window_minutes
+        self.time_window = time_window_minutes * 60
+        self.update_every = update_every
+        self.windows = {}
+        self.episodes = {}  # only keys with an open episode
+        self.latest = None
+        self._next_sweep = None
+
+    def add(self, key, timestamp):
+        """Record one event; return a list of (kind, key, window_count) alert transitions."""
+        window = self.windows.get(key)
+        if window is None:
+            window = self.windows[key] = deque()
+
+        if not window or timestamp >= window[-1]:
+            window.append(timestamp)
+        else:
+            # Late line (e.g. interleaved writers); keep the deque sorted
+            window.insert(bisect_right(window, timestamp), timestamp)
+
+        newest = window[-1]
+        while newest - window[0] > self.time_window:
+            window.popleft()
+
+        count = len(window)
+        episode = self.episodes.get(key)
+        transitions = []
+        if episode is not None or count >= self.threshold:
+            if episode is None:
+                episode = self.episodes[key] = AlertEpisode()
+            transitions = [(kind, key, n) for kind, n in
+                           episode.observe(count - 1, count, self.threshold, self.update_every)]
+            if not episode.is_open:
+                del self.episodes[key]
+
+        if self.latest is None or timestamp > self.latest:
+            self.latest = timestamp
+            transitions.extend(self._maybe_sweep())
+        return transitions
+
+    def _maybe_sweep(self):
+        """
+        Drop keys with no event in the last window, closing their open episodes; runs at
+        most once per window of event time. Returns the resulting "clear" transitions.
+        """
+        if self._next_sweep is None:
+            self._next_sweep = self.latest + self.time_window
+            return []
+        if self.latest < self._next_sweep:
+            return []
+        cutoff = self.latest - self.time_window
+        cleared = []
+        for key in [k for k, w in self.windows.items() if w[-1] < cutoff]:
+            del self.windows[key]
+            episode = self.episodes.pop(key, None)
+            if episode is not None:
+                cleared.append(("clear", key, episode.peak))
+        self._next_sweep = self.latest + self.time_window
+        return cleared
+
+
+def follow_lines(log_file, poll_interval, from_start=False):
+    """
+    Yield complete lines appended to log_file, like `tail -F`.
+    When the path is rotated (new inode) or truncated, the rest of the old file is
+    drained and reading restarts at the beginning of the new file.
+    """
+    f = log_file.open("r")
+    inode = os.fstat(f.fileno()).st_ino
+    if not from_start:
+        f.seek(0, os.SEEK_END)
+    pending = ""
+    try:
+        while True:
+            line = f.readline()
+            if line:
+                if not line.endswith("\n"):
+                    pending += line  # writer hasn't finished this line yet
+                    continue
+                yield pending + line
+                pending = ""
+                continue
+
+            try:
+                st = log_file.stat()
+            except FileNotFoundError:
+                st = None  # between rotation and re-creation
+            if st is not None and (st.st_ino != inode or st.st_size < f.tell()):
+                f.close()
+                f = log_file.open("r")
+                inode = os.fstat(f.fileno()).st_ino
+                pending = ""
+                continue
+            time.sleep(poll_interval)
+    finally:
+        f.close()
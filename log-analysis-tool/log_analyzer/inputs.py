@@ -0,0 +1,168 @@
+# === INPUT FILES ===
+import glob                                # --logfile patterns
+import importlib                           # decompressors are imported on first use
+import io                                  # split decompressed chunks into lines
+import locale                              # text encoding of decompressed data
+import os                                  # CPU count: prefetch only with a spare core
+import queue                               # hand-off between reader thread and parser
+import re                                  # rotated log names
+import threading                           # decompress ahead of the parser
+from pathlib import Path                   # handle file paths
+
+DECOMPRESS_CHUNK_SIZE = 1024 * 1024        # decompressed bytes per hand-off to the parser
+DECOMPRESS_QUEUE_DEPTH = 4                 # chunks the reader may run ahead of the parser
+
+# suffix -> module whose open() decompresses it; magic bytes catch files without the suffix
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "lzma"}
+
+# Log files picked up from a directory: *.log / *.jsonl, optionally rotated (.1, -2, -20260101) and compressed
+LOG_NAME_PATTERN = re.compile(r"\.(?:log|jsonl)(?:[.-]\d+)?(?:\.(?:gz|bz2|xz))?$")
+# logrotate's dateext suffix (-%Y%m%d, optionally more digits such as an hour) vs a rotation count
+_ROTATION_PATTERN = re.compile(r"^(?P<base>.*?)(?:[.-](?:(?P<date>\d{8,})|(?P<index>\d+)))?$")
+
+
+def compression_of(log_file):
+    """"gzip", "bz2" or "lzma" for a compressed log (by suffix, else by magic bytes), None for plain text."""
+    compression = COMPRESSION_SUFFIXES.get(log_file.suffix)
+    if compression is not None:
+        return compression
+    with log_file.open("rb") as f:
+        head = f.read(6)
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def uncompressed_name(log_file):
+    """auth.log.2.gz -> auth.log.2 (used for suffix-based format detection and rotation order)."""
+    return log_file.stem if log_file.suffix in COMPRESSION_SUFFIXES else log_file.name
+
+
+def open_log(log_file, compression=None):
+    """Open a log for reading bytes, decompressing on the fly when compression is given."""
+    if compression is None:
+        return log_file.open("rb")
+    return importlib.import_module(compression).open(log_file, "rb")
+
+
+def rotation_key(log_file):
+    """
+    Sort key listing rotated copies oldest first, then the live log: numbered copies count down
+    (auth.log.14.gz ... auth.log.1), dateext copies count up (auth.log-20260101.gz, auth.log-20260108).
+    """
+    match = _ROTATION_PATTERN.match(uncompressed_name(log_file))
+    if match["date"]:
+        age = (0, int(match["date"]))
+    elif match["index"]:
+        age = (1, -int(match["index"]))
+    else:
+        age = (2, 0)
+    return str(log_file.parent), match["base"], age
+
+
+def expand_log_inputs(specs):
+    """
+    Resolve log inputs: an existing file is kept, a directory stands for the log files in
+    it (LOG_NAME_PATTERN) and anything else is a glob pattern. Returns the files without
+    duplicates, rotated copies oldest first. Raises FileNotFoundError if a spec matches nothing.
+    """
+    if isinstance(specs, (str, Path)):
+        specs = [specs]
+    found = set()
+    for spec in specs:
+        path = Path(spec)
+        if path.is_dir():
+            matches = [p for p in path.iterdir() if p.is_file() and LOG_NAME_PATTERN.search(p.name)]
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = [p for p in map(Path, glob.glob(str(spec))) if p.is_file()]
+        if not matches:
+            raise FileNotFoundError(f"No log files match: {spec}")
+        found.update(matches)
+    return sorted(found, key=rotation_key)
+
+
+def iter_chunks(log_file, compression, chunk_size=DECOMPRESS_CHUNK_SIZE):
+    """Yield decompressed chunks of a log until EOF."""
+    with open_log(log_file, compression) as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def prefetch(chunks, depth=DECOMPRESS_QUEUE_DEPTH):
+    """
+    Run a chunk generator in a reader thread, at most `depth` chunks ahead of the caller.
+    Decompression overlaps with parsing because zlib, bz2 and lzma release the GIL while
+    they work. Errors in the reader are re-raised here.
+    """
+    buffered = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffered.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False  # the caller stopped early
+
+    def read():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+            put(b"")
+        except Exception as exc:
+            put(exc)
+        finally:
+            chunks.close()
+
+    reader = threading.Thread(target=read, name="log-prefetch", daemon=True)
+    reader.start()
+    try:
+        while chunk := buffered.get():
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        stop.set()
+        reader.join()
+
+
+def iter_decompressed_lines(log_file, compression, encoding=None, chunk_size=DECOMPRESS_CHUNK_SIZE,
+                            depth=DECOMPRESS_QUEUE_DEPTH):
+    """
+    Yield the decoded lines of a compressed log, translating newlines like a text-mode open().
+    With a spare CPU the file is decompressed in a reader thread (see prefetch) while the
+    caller parses; on a single CPU the thread only adds switching, so it is read inline.
+    """
+    encoding = encoding or locale.getpreferredencoding(False)
+    chunks = iter_chunks(log_file, compression, chunk_size)
+    if (os.cpu_count() or 1) > 1:
+        chunks = prefetch(chunks, depth)
+    pending = b""
+    try:
+        for chunk in chunks:
+            cut = chunk.rfind(b"\n") + 1
+            if not cut:
+                pending += chunk
+                continue
+            yield from io.StringIO((pending + chunk[:cut]).decode(encoding), newline=None)
+            pending = chunk[cut:]
+        if pending:
+            yield from io.StringIO(pending.decode(encoding), newline=None)
+    finally:
+        chunks.close()
+
+
+def iter_log_lines(log_file, compression=None):
+    """Decoded lines of a whole log, plain or compressed."""
+    if compression is None:
+        with log_file.open("r") as f:
+            yield from f
+    else:
+        yield from iter_decompressed_lines(log_file, compression)
@@ -0,0 +1,95 @@
+# === METRICS ===
+import json                                # --stats-file as JSON
+import sys                                 # --stats goes to stderr
+import time                                # stage timers
+from contextlib import contextmanager      # Metrics.stage
+from pathlib import Path                   # handle file paths
+
+
+class Metrics:
+    """
+    Counters and per-stage wall-clock seconds for one run (--stats / --stats-file).
+    Disabled, stage() and count() do nothing and parsing loops skip per-line counting,
+    so a normal run pays one flag check per stage.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.counters = {}
+        self.stages = {}  # stage name -> seconds
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name, seconds):
+        if self.enabled:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def counted(self, lines, name):
+        """Pass lines through, adding how many there were to counter `name` at the end."""
+        n = 0
+        try:
+            for n, line in enumerate(lines, 1):
+                yield line
+        finally:
+            self.count(name, n)
+
+    def snapshot(self):
+        return {"counters": dict(self.counters), "stages": {k: round(v, 6) for k, v in self.stages.items()}}
+
+    def merge(self, snapshot):
+        """Add a worker's snapshot (stage seconds from several workers add up like CPU time)."""
+        for name, n in snapshot["counters"].items():
+            self.count(name, n)
+        for name, seconds in snapshot["stages"].items():
+            self.add_time(name, seconds)
+
+    def to_prometheus(self, prefix="log_analyzer"):
+        snap = self.snapshot()
+        lines = []
+        for name, value in sorted(snap["counters"].items()):
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+        if snap["stages"]:
+            lines.append(f"# TYPE {prefix}_stage_seconds gauge")
+            lines += [f'{prefix}_stage_seconds{{stage="{name}"}} {seconds}'
+                      for name, seconds in sorted(snap["stages"].items())]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Write the metrics to path: JSON for a .json suffix, Prometheus text otherwise."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.snapshot(), indent=2) if path.suffix == ".json" else self.to_prometheus())
+
+    def summary(self):
+        lines = ["Run statistics:"]
+        lines += [f"  {name:24} {seconds:10.3f}s" for name, seconds in self.stages.items()]
+        lines += [f"  {name:24} {value:10,d}" for name, value in self.counters.items()]
+        return "\n".join(lines)
+
+
+def run_profiled(fn, output, top=25):
+    """Run fn() under cProfile, save the stats to output and print the top entries by cumulative time."""
+    import cProfile                        # --profile only; kept out of the import path
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn)
+    finally:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(output)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(top)
+        print(f"Profile saved to {output} (python -m pstats {output})", file=sys.stderr)
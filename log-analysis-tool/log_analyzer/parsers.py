@@ -0,0 +1,127 @@
+# === LOG PARSERS ===
+import json                                # decode JSONL audit logs
+from datetime import datetime              # malformed-line stamps
+from functools import partial              # parsers bound to config values
+
+from .config import DEFAULTS, DEFAULT_AUDIT_EVENT_ACTIONS
+from .inputs import compression_of, open_log, uncompressed_name
+from .timestamps import format_timestamp, parse_timestamp, to_epoch
+
+try:
+    import orjson                          # optional: faster decoding of JSONL audit logs
+except ImportError:
+    orjson = None
+
+
+def parse_log_line(line, analyzed_sink=None, malformed_sink=None):
+    """
+    Parse a single log line and return (timestamp, user, ip, action) or None for malformed lines.
+    timestamp is epoch seconds, parsed once here so callers don't re-parse it.
+    Valid lines are echoed to analyzed_sink and bad ones to malformed_sink when given.
+    """
+    line = line.strip()
+    try:
+        parts = line.split()
+        timestamp_str = parts[0] + " " + parts[1]
+        user = parts[2].split("=")[1]
+        ip = parts[3].split("=")[1]
+        action = parts[4].split("=")[1]
+
+        # Parse (and validate) timestamp
+        timestamp = parse_timestamp(timestamp_str)
+
+        # Echo analyzed line
+        if analyzed_sink is not None:
+            analyzed_sink.write(f"[{timestamp_str}] User={user} IP={ip} Action={action}\n")
+
+        return timestamp, user, ip, action
+
+    except (IndexError, ValueError):
+        if malformed_sink is not None:
+            now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            malformed_sink.write(f"[{now_str}] {line}\n")
+        return None
+
+
+_json_loads = orjson.loads if orjson is not None else json.JSONDecoder().decode
+_UTC_SUFFIXES = ("", "Z", "+00:00", "+00:00Z")
+
+
+def parse_audit_timestamp(timestamp_str):
+    """
+    password_manager timestamp ("2026-01-05T10:00:00.123456+00:00Z") -> (epoch seconds, "%Y-%m-%d %H:%M:%S").
+    UTC stamps reuse parse_timestamp and its cache; other offsets are converted to UTC.
+    """
+    if timestamp_str[10:11] != "T":
+        raise ValueError(f"not an ISO timestamp: {timestamp_str}")
+    rest = timestamp_str[19:]
+    if rest.startswith("."):
+        rest = rest.lstrip(".0123456789")
+    if rest in _UTC_SUFFIXES:
+        seconds_str = timestamp_str[:10] + " " + timestamp_str[11:19]
+        return parse_timestamp(seconds_str), seconds_str
+    dt = datetime.fromisoformat(timestamp_str.removesuffix("Z"))
+    epoch = to_epoch(dt.replace(tzinfo=None) - dt.utcoffset())
+    return epoch, format_timestamp(epoch)
+
+
+def parse_audit_line(line, analyzed_sink=None, malformed_sink=None, event_actions=DEFAULT_AUDIT_EVENT_ACTIONS,
+                     default_ip=DEFAULTS["audit_default_ip"]):
+    """
+    Parse one password_manager audit JSONL record into (timestamp, user, ip, action), like
+    parse_log_line. Events are mapped through event_actions (login_failed and login_blocked
+    both count as login_failed); the IP is default_ip unless the record has one.
+    """
+    try:
+        record = _json_loads(line)
+        timestamp, timestamp_str = parse_audit_timestamp(record["timestamp"])
+        event = record["event"]
+        action = event_actions.get(event, event)
+        user = record.get("username") or "-"
+        ip = record.get("ip") or default_ip
+        if not isinstance(action, str) or not isinstance(user, str) or not isinstance(ip, str):
+            raise ValueError("non-string field")
+
+        if analyzed_sink is not None:
+            analyzed_sink.write(f"[{timestamp_str}] User={user} IP={ip} Action={action}\n")
+
+        return timestamp, user, ip, action
+
+    except (IndexError, KeyError, TypeError, ValueError):
+        if malformed_sink is not None:
+            now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            malformed_sink.write(f"[{now_str}] {line.strip()}\n")
+        return None
+
+
+LOG_PARSERS = {"text": parse_log_line, "audit-jsonl": parse_audit_line}
+
+
+def get_line_parser(log_format, event_actions=None, default_ip=None):
+    """
+    The parse_line(line, analyzed_sink, malformed_sink) function for a resolved format,
+    bound to the audit mapping/IP when they differ from the defaults (picklable for workers).
+    """
+    parse_line = LOG_PARSERS[log_format]
+    event_actions = DEFAULT_AUDIT_EVENT_ACTIONS if event_actions is None else event_actions
+    default_ip = DEFAULTS["audit_default_ip"] if default_ip is None else default_ip
+    if parse_line is parse_audit_line and (event_actions != DEFAULT_AUDIT_EVENT_ACTIONS
+                                           or default_ip != DEFAULTS["audit_default_ip"]):
+        return partial(parse_audit_line, event_actions=event_actions, default_ip=default_ip)
+    return parse_line
+
+
+def resolve_log_format(log_file, log_format="auto"):
+    """
+    Pick the input format: explicit, else by .jsonl suffix (ignoring .gz/.bz2/.xz), else by
+    whether the first line is a JSON object.
+    """
+    if log_format != "auto":
+        return log_format
+    if uncompressed_name(log_file).endswith(".jsonl"):
+        return "audit-jsonl"
+    with open_log(log_file, compression_of(log_file)) as f:
+        for raw in f:
+            if raw.strip():
+                return "audit-jsonl" if raw.lstrip().startswith(b"{") else "text"
+    return "text"
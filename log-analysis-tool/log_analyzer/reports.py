@@ -0,0 +1,29 @@
+# === REPORTS ===
+import csv                                 # write CSV report
+
+from .timestamps import format_timestamp
+
+
+def write_csv_report(failed_attempts, report_file, threshold):
+    """Write failed attempts to CSV for users/IPs exceeding threshold."""
+    with report_file.open("w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["User", "IP Address", "Failed Attempts", "Timestamps"])
+        for (user, ip), timestamps in failed_attempts.items():
+            count = len(timestamps)
+            if count >= threshold:
+                ts_str = "|".join(format_timestamp(ts) for ts in timestamps)
+                writer.writerow([user, ip, count, ts_str])
+                print(f"CSV report entry: User '{user}', IP {ip}, Attempts {count}")
+
+
+def print_report(failed_attempts, threshold):
+    """Print human-readable report for users/IPs exceeding threshold."""
+    print(f"\nSuspicious Activity Report (threshold = {threshold} failed attempts):")
+    for (user, ip), timestamps in failed_attempts.items():
+        count = len(timestamps)
+        if count >= threshold:
+            print(f"User '{user}' from IP {ip} has {count} failed login attempts")
+            print("  Timestamps:")
+            for ts in timestamps:
+                print(f"    - {format_timestamp(ts)}")
@@ -0,0 +1,141 @@
+# === CROSS-KEY RULES ===
+import csv                                 # rule report
+from datetime import datetime              # alert stamps
+
+from .alerts import AlertEpisode, restored_latest
+from .config import DEFAULTS, build_rules
+from .timestamps import TIMESTAMP_FORMAT, format_timestamp
+
+
+def format_rule_alert(kind, rule_name, group_by, subject, distinct, time_window_minutes, threshold, now_str):
+    """Alert line for a cross-key rule; subject is the IP (spraying) or user (distributed)."""
+    label = rule_name.replace("_", " ")
+    who = f"IP {subject}" if group_by == "ip" else f"User '{subject}'"
+    members = "users" if group_by == "ip" else "IPs"
+    if kind == "update":
+        return (f"[{now_str}] ALERT UPDATE: {who} now has failed attempts against {distinct} distinct "
+                f"{members} within {time_window_minutes} minutes ({label}).\n")
+    if kind == "clear":
+        return (f"[{now_str}] ALERT CLEARED: {who} dropped below {threshold} distinct {members} "
+                f"within {time_window_minutes} minutes ({label}, peak {distinct}).\n")
+    return (f"[{now_str}] ALERT: {who} had failed attempts against {distinct} distinct {members} "
+            f"within {time_window_minutes} minutes ({label}).\n")
+
+
+def regroup_events(failed_attempts, group_by, min_members, already_alerted=None):
+    """
+    Regroup the per-(user, ip) columns collected in the single read by one side of the key.
+    Yields (subject, events) with events sorted as (timestamp, is_new, member); subjects
+    with fewer than min_members distinct counterparts can never fire and are skipped
+    before any per-event work. is_new is False for timestamps restored from a checkpoint.
+    """
+    already_alerted = already_alerted or {}
+    groups = {}
+    for (user, ip), timestamps in failed_attempts.items():
+        subject, member = (ip, user) if group_by == "ip" else (user, ip)
+        if subject not in groups:
+            groups[subject] = []
+        groups[subject].append((member, timestamps, already_alerted.get((user, ip), 0)))
+
+    for subject, columns in groups.items():
+        if len(columns) < min_members:
+            continue
+        events = [(ts, i >= restored, member)
+                  for member, timestamps, restored in columns
+                  for i, ts in enumerate(timestamps)]
+        events.sort()
+        yield subject, events
+
+
+def distinct_window_episodes(events, threshold, window_seconds, latest, update_every=0, previous_latest=None):
+    """
+    Slide a time window over one subject's events, counting distinct members in it, and
+    apply AlertEpisode rules to that count. Returns (transitions, peak, peak_members,
+    peak_start, peak_end, still_open) where transitions are (is_new, kind, distinct).
+    previous_latest is the newest event of the run a checkpoint was saved by (None without
+    one): an episode made only of restored events whose window had already emptied by then
+    had its clear logged by that run.
+    """
+    in_window = {}  # member -> events in the current window
+    episode = AlertEpisode()
+    transitions = []
+    peak, peak_members, peak_start, peak_end = 0, [], None, None
+    start = opened = 0
+    for index, (ts, is_new, member) in enumerate(events):
+        while ts - events[start][0] > window_seconds:
+            old = events[start][2]
+            in_window[old] -= 1
+            if not in_window[old]:
+                del in_window[old]
+            start += 1
+        before = len(in_window)
+        in_window[member] = in_window.get(member, 0) + 1
+        distinct = len(in_window)
+        if distinct > peak:
+            peak, peak_members, peak_start, peak_end = distinct, sorted(in_window), events[start][0], ts
+        if distinct >= threshold or episode.is_open:
+            for kind, count in episode.observe(before, distinct, threshold, update_every):
+                if kind == "open":
+                    opened = index
+                transitions.append((is_new, kind, count))
+
+    # Has the window emptied below the threshold by the end of the data?
+    still_open = episode.is_open
+    if still_open:
+        tail = events[start:]
+        remaining = {member for ts, _, member in tail if latest - ts <= window_seconds}
+        if len(remaining) < threshold:
+            logged = (previous_latest is not None and not any(is_new for _, is_new, _ in events[opened:])
+                      and len({member for ts, _, member in tail if previous_latest - ts <= window_seconds})
+                      < threshold)
+            transitions.append((not logged, "clear", episode.peak))
+            still_open = False
+    return transitions, peak, peak_members, peak_start, peak_end, still_open
+
+
+def check_rule_alerts(failed_attempts, rules=None, already_alerted=None, update_every=0, alert_log_file=None):
+    """
+    Evaluate the cross-key rules (password spraying by IP, distributed brute force by user)
+    over the events already aggregated per (user, ip), so no second pass over the log is needed.
+    Appends alerts to alert_log_file (when given) and returns (alerts, report_rows) for write_rule_report.
+    rules defaults to both rules with their default thresholds (see config.build_rules).
+    """
+    rules = build_rules({}, DEFAULTS["time_window_minutes"]) if rules is None else rules
+    now_str = datetime.now().strftime(TIMESTAMP_FORMAT)
+    latest = max((max(ts) for ts in failed_attempts.values() if len(ts)), default=None)
+    alerts, rows = [], []
+    if latest is None:
+        return alerts, rows
+    previous_latest = restored_latest(failed_attempts, already_alerted)
+
+    for rule_name, rule in rules.items():
+        if not rule.get("enabled", True):
+            continue
+        group_by, threshold = rule["group_by"], rule["threshold"]
+        window_minutes = rule["time_window_minutes"]
+        for subject, events in regroup_events(failed_attempts, group_by, threshold, already_alerted):
+            transitions, peak, members, peak_start, peak_end, still_open = distinct_window_episodes(
+                events, threshold, window_minutes * 60, latest, update_every, previous_latest)
+            for is_new, kind, distinct in transitions:
+                if is_new:
+                    alerts.append(format_rule_alert(kind, rule_name, group_by, subject, distinct,
+                                                    window_minutes, threshold, now_str))
+            if peak >= threshold:
+                rows.append([rule_name, subject, peak, format_timestamp(peak_start), format_timestamp(peak_end),
+                             "active" if still_open else "cleared", "|".join(members)])
+
+    if alerts and alert_log_file is not None:
+        with alert_log_file.open("a") as f:
+            f.writelines(alerts)
+    return alerts, rows
+
+
+def write_rule_report(rows, report_file):
+    """Write cross-key rule detections (one row per IP/user that reached its rule threshold)."""
+    with report_file.open("w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Rule", "Subject", "Peak Distinct", "Peak Window Start", "Peak Window End",
+                         "Status", "Members"])
+        for row in rows:
+            writer.writerow(row)
+            print(f"Rule report entry: {row[0]} {row[1]}, {row[2]} distinct")
@@ -0,0 +1,302 @@
+# === LOG SCANNING ===
+import json                                # audit event names in the mmap prefilter
+import locale                              # text encoding for byte-range workers
+import mmap                                # zero-copy scanning mode
+import os                                  # CPU count for parallel mode
+import re                                  # byte-level prefilter for mmap mode
+import shutil                              # stitch worker output files together
+from pathlib import Path                   # handle file paths
+
+from .attempts import FailedAttempts, merge_by_timestamp, merge_failed_attempts
+from .config import DEFAULTS, DEFAULT_AUDIT_EVENT_ACTIONS
+from .inputs import compression_of, iter_decompressed_lines
+from .metrics import Metrics
+from .parsers import get_line_parser, parse_log_line, resolve_log_format
+from .sinks import OutputSink
+
+ANALYZED_LOG_FILE = Path(DEFAULTS["analyzed_log_file"])
+MALFORMED_LOG_FILE = Path(DEFAULTS["malformed_log_file"])
+
+
+def count_sink_lines(metrics, analyzed_sink, malformed_sink):
+    """Add the lines a run wrote to its analyzed/malformed outputs to the metrics counters."""
+    if analyzed_sink is not None:
+        metrics.count("analyzed_log_lines", analyzed_sink.lines_written)
+    if malformed_sink is not None:
+        metrics.count("lines_malformed", malformed_sink.lines_written)
+
+
+def collect_failed_attempts(lines, suspicious_actions, analyzed_sink=None, malformed_sink=None,
+                            parse_line=parse_log_line, metrics=None):
+    """
+    Parse an iterable of lines and group suspicious events by (user, ip).
+    With enabled metrics, counts lines parsed, malformed lines and events.
+    """
+    if metrics is not None and metrics.enabled:
+        lines = metrics.counted(lines, "lines_parsed")
+    failed_attempts = FailedAttempts()
+    for line in lines:
+        parsed = parse_line(line, analyzed_sink, malformed_sink)
+        if parsed is None:
+            continue
+
+        timestamp, user, ip, action = parsed
+        if action in suspicious_actions:
+            failed_attempts.add(user, ip, timestamp)
+    if metrics is not None and metrics.enabled:
+        metrics.count("events", failed_attempts.event_count())
+        count_sink_lines(metrics, analyzed_sink, malformed_sink)
+    return failed_attempts
+
+
+def analyze_logs(log_file, suspicious_actions, write_analyzed=True, flush_every=0, workers=1, use_mmap=False,
+                 start=0, end=None, log_format="auto", analyzed_log_file=ANALYZED_LOG_FILE,
+                 malformed_log_file=MALFORMED_LOG_FILE, event_actions=None, default_ip=None, metrics=None):
+    """
+    Aggregate failed attempts per user/IP into a FailedAttempts (epoch-second columns).
+    The analyzed/malformed outputs are opened once for the whole run.
+    With workers > 1 the file is parsed in parallel byte ranges (see analyze_logs_parallel).
+    With use_mmap only lines passing the byte prefilter are decoded (see iter_mmap_candidate_lines).
+    start/end restrict the run to a byte range whose bounds fall on line starts.
+    log_format picks the line parser ("auto" detects it); event_actions/default_ip configure
+    the audit JSONL parser.
+    A compressed file (.gz/.bz2/.xz) is decompressed in a reader thread while it is parsed;
+    byte ranges, workers and mmap do not apply to it.
+    """
+    log_format = resolve_log_format(log_file, log_format)
+    parse_line = get_line_parser(log_format, event_actions, default_ip)
+    compression = compression_of(log_file)
+    if compression is not None:
+        if start or end is not None:
+            raise ValueError(f"Byte ranges need an uncompressed log: {log_file}")
+        workers, use_mmap = 1, False
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers > 1:
+        return analyze_logs_parallel(log_file, suspicious_actions, workers, write_analyzed, flush_every,
+                                     use_mmap, start, end, log_format, analyzed_log_file, malformed_log_file,
+                                     event_actions, default_ip, metrics)
+
+    with OutputSink(analyzed_log_file, flush_every, enabled=write_analyzed,
+                    stage="analyzed_log_write", metrics=metrics) as analyzed_sink, \
+            OutputSink(malformed_log_file, flush_every) as malformed_sink:
+        if compression is not None:
+            lines = iter_decompressed_lines(log_file, compression)
+            return collect_failed_attempts(lines, suspicious_actions, analyzed_sink, malformed_sink, parse_line,
+                                           metrics)
+        if use_mmap:
+            lines = iter_mmap_candidate_lines(log_file, suspicious_actions, start, end, log_format=log_format,
+                                              event_actions=event_actions)
+            return collect_failed_attempts(lines, suspicious_actions, analyzed_sink, malformed_sink, parse_line,
+                                           metrics)
+        if start or end is not None:
+            lines = iter_range_lines(log_file, start, log_file.stat().st_size if end is None else end)
+            return collect_failed_attempts(lines, suspicious_actions, analyzed_sink, malformed_sink, parse_line,
+                                           metrics)
+        with log_file.open("r") as f:
+            return collect_failed_attempts(f, suspicious_actions, analyzed_sink, malformed_sink, parse_line,
+                                           metrics)
+
+
+# === MMAP SCANNING ===
+def build_action_prefilter(suspicious_actions, log_format="text", event_actions=None):
+    """
+    Compile a bytes regex matching "=<action>" followed by whitespace, "=" or end of data
+    (or, for audit JSONL, an "event" value that maps to a suspicious action).
+    It accepts every line the parser would treat as suspicious (plus a few it won't),
+    so it is only a prefilter; candidates are still fully parsed.
+    """
+    if log_format == "audit-jsonl":
+        event_actions = DEFAULT_AUDIT_EVENT_ACTIONS if event_actions is None else event_actions
+        events = {event for event, action in event_actions.items() if action in suspicious_actions}
+        events.update(a for a in suspicious_actions if a not in event_actions)
+        alternatives = b"|".join(re.escape(json.dumps(e)[1:-1].encode()) for e in sorted(events, key=len, reverse=True))
+        return re.compile(b'"event"\\s*:\\s*"(?:' + alternatives + b')"')
+    alternatives = b"|".join(re.escape(a.encode()) for a in sorted(suspicious_actions, key=len, reverse=True))
+    return re.compile(b"=(?:" + alternatives + b")(?![^=\\s])")
+
+
+def iter_mmap_candidate_lines(log_file, suspicious_actions, start=0, end=None, encoding=None, log_format="text",
+                              event_actions=None):
+    """
+    Yield decoded lines in [start, end) that contain a suspicious action token.
+    The file is scanned in place through mmap; lines without a match are never copied
+    or decoded, so benign (and malformed) lines are not echoed to the output sinks.
+    """
+    if not suspicious_actions:
+        return
+    encoding = encoding or locale.getpreferredencoding(False)
+    pattern = build_action_prefilter(suspicious_actions, log_format, event_actions)
+    with log_file.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return  # mmap cannot map an empty file
+        end = size if end is None else min(end, size)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            next_line = start
+            for match in pattern.finditer(mm, start, end):
+                pos = match.start()
+                if pos < next_line:
+                    continue  # second match on a line already yielded
+                newline = mm.rfind(b"\n", start, pos)
+                line_start = start if newline == -1 else newline + 1
+                line_end = mm.find(b"\n", pos, end)
+                if line_end == -1:
+                    line_end = end
+                next_line = line_end + 1
+                yield mm[line_start:line_end].decode(encoding)
+
+
+# === PARALLEL ANALYSIS ===
+def split_file_ranges(log_file, parts, start=0, end=None):
+    """Split [start, end) of a file into at most `parts` byte ranges aligned to line starts."""
+    size = log_file.stat().st_size if end is None else end
+    if size <= start:
+        return []
+    step = max(1, (size - start) // parts)
+    bounds = [start]
+    with log_file.open("rb") as f:
+        for i in range(1, parts):
+            pos = max(start + i * step, bounds[-1] + 1)
+            if pos >= size:
+                break
+            # Back up one byte so a range that already starts on a line keeps that line
+            f.seek(pos - 1)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def iter_range_lines(log_file, start, end, encoding=None):
+    """Yield decoded lines whose first byte lies in [start, end)."""
+    encoding = encoding or locale.getpreferredencoding(False)
+    with log_file.open("rb") as f:
+        f.seek(start)
+        pos = start
+        while pos < end:
+            raw = f.readline()
+            if not raw:
+                break
+            pos += len(raw)
+            yield raw.decode(encoding)
+
+
+def _part_path(path, index):
+    """Temporary per-worker output file next to the final output."""
+    return path.with_name(f".{path.name}.part{index}")
+
+
+def _analyze_range(task):
+    """
+    Worker entry point: parse one byte range into a partial failed_attempts map.
+    end=None marks a compressed file, which is streamed whole by this worker.
+    Returns (partial, metrics snapshot) so the parent can add up the workers' counters.
+    """
+    (index, log_file, start, end, suspicious_actions, write_analyzed, flush_every, use_mmap, log_format,
+     analyzed_log_file, malformed_log_file, event_actions, parse_line, collect_metrics) = task
+    metrics = Metrics(enabled=collect_metrics)
+    if end is None:
+        lines = iter_decompressed_lines(log_file, compression_of(log_file))
+    elif use_mmap:
+        lines = iter_mmap_candidate_lines(log_file, suspicious_actions, start, end, log_format=log_format,
+                                          event_actions=event_actions)
+    else:
+        lines = iter_range_lines(log_file, start, end)
+    with OutputSink(_part_path(analyzed_log_file, index), flush_every, enabled=write_analyzed,
+                    stage="analyzed_log_write", metrics=metrics) as analyzed_sink, \
+            OutputSink(_part_path(malformed_log_file, index), flush_every) as malformed_sink:
+        partial = collect_failed_attempts(lines, suspicious_actions, analyzed_sink, malformed_sink,
+                                          parse_line, metrics)
+    return partial, metrics.snapshot()
+
+
+def _append_parts(path, count):
+    """Append worker part files to the real output in range order, then remove them."""
+    parts = [_part_path(path, i) for i in range(count)]
+    existing = [p for p in parts if p.exists()]
+    if not existing:
+        return
+    with path.open("ab") as out:
+        for part in existing:
+            with part.open("rb") as f:
+                shutil.copyfileobj(f, out, 1024 * 1024)
+            part.unlink()
+
+
+def _run_segments(segments, suspicious_actions, workers, write_analyzed, flush_every, use_mmap, analyzed_log_file,
+                  malformed_log_file, event_actions, default_ip, metrics):
+    """
+    Parse (log_file, start, end, log_format) segments in a process pool; returns the partial
+    maps in segment order. Worker outputs are appended to the real files in the same order.
+    """
+    # Imported here: the process pool machinery is only needed (and only paid for) in this mode
+    from concurrent.futures import ProcessPoolExecutor
+
+    collect_metrics = metrics is not None and metrics.enabled
+    tasks = [(i, log_file, start, end, suspicious_actions, write_analyzed, flush_every, use_mmap, log_format,
+              analyzed_log_file, malformed_log_file, event_actions,
+              get_line_parser(log_format, event_actions, default_ip), collect_metrics)
+             for i, (log_file, start, end, log_format) in enumerate(segments)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_analyze_range, tasks))
+    finally:
+        _append_parts(analyzed_log_file, len(tasks))
+        _append_parts(malformed_log_file, len(tasks))
+    if collect_metrics:
+        for _, snapshot in results:
+            metrics.merge(snapshot)
+    return [partial for partial, _ in results]
+
+
+def analyze_logs_parallel(log_file, suspicious_actions, workers, write_analyzed=True, flush_every=0,
+                          use_mmap=False, start=0, end=None, log_format="text", analyzed_log_file=ANALYZED_LOG_FILE,
+                          malformed_log_file=MALFORMED_LOG_FILE, event_actions=None, default_ip=None, metrics=None):
+    """Parse newline-aligned byte ranges of log_file in separate processes and merge the results."""
+    segments = [(log_file, start, end, log_format)
+                for start, end in split_file_ranges(log_file, workers, start, end)]
+    return merge_failed_attempts(_run_segments(segments, suspicious_actions, workers, write_analyzed, flush_every,
+                                               use_mmap, analyzed_log_file, malformed_log_file, event_actions,
+                                               default_ip, metrics))
+
+
+# === MULTIPLE FILES ===
+def analyze_log_files(log_files, suspicious_actions, write_analyzed=True, flush_every=0, workers=1, use_mmap=False,
+                      log_format="auto", analyzed_log_file=ANALYZED_LOG_FILE, malformed_log_file=MALFORMED_LOG_FILE,
+                      event_actions=None, default_ip=None, metrics=None):
+    """
+    analyze_logs over several files (e.g. auth.log.14.gz ... auth.log), k-way merged by
+    timestamp (merge_by_timestamp) so alert windows span file boundaries correctly.
+    With workers > 1 one pool parses them all: plain files in byte ranges, each compressed
+    file whole in its own worker, so several archives are decompressed at once.
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(log_files) == 1:
+        return merge_by_timestamp(
+            analyze_logs(log_file, suspicious_actions, write_analyzed, flush_every, workers, use_mmap,
+                         log_format=log_format, analyzed_log_file=analyzed_log_file,
+                         malformed_log_file=malformed_log_file, event_actions=event_actions,
+                         default_ip=default_ip, metrics=metrics)
+            for log_file in log_files)
+
+    segments, owners = [], []
+    for index, log_file in enumerate(log_files):
+        file_format = resolve_log_format(log_file, log_format)
+        if compression_of(log_file) is not None:
+            ranges = [(0, None)]
+        else:
+            ranges = split_file_ranges(log_file, workers)
+        segments.extend((log_file, start, end, file_format) for start, end in ranges)
+        owners.extend([index] * len(ranges))
+    partials = _run_segments(segments, suspicious_actions, workers, write_analyzed, flush_every, use_mmap,
+                             analyzed_log_file, malformed_log_file, event_actions, default_ip, metrics)
+    per_file = [[] for _ in log_files]
+    for index, partial in zip(owners, partials):
+        per_file[index].append(partial)
+    return merge_by_timestamp(merge_failed_attempts(parts) for parts in per_file)
@@ -0,0 +1,71 @@
+# === OUTPUT SINKS ===
+import io                                  # timed raw writer behind output sinks
+import time                                # write timers
+from pathlib import Path                   # handle file paths
+
+
+class _TimedFileIO(io.FileIO):
+    """Raw append-mode file whose write() calls (the syscalls behind the buffer) add to a Metrics stage."""
+
+    def __init__(self, path, metrics, stage):
+        super().__init__(path, "a")
+        self._metrics = metrics
+        self._stage = stage
+
+    def write(self, data):
+        start = time.perf_counter()
+        try:
+            return super().write(data)
+        finally:
+            self._metrics.add_time(self._stage, time.perf_counter() - start)
+
+
+class OutputSink:
+    """
+    Append-mode output file kept open for a whole analysis run.
+    flush_every=0 leaves flushing to the io buffer (and close), N flushes every N lines.
+    The file is opened lazily on the first write; a disabled sink discards writes.
+    With a stage name and enabled metrics, time spent in the underlying writes is recorded
+    under that stage.
+    """
+
+    def __init__(self, path, flush_every=0, enabled=True, buffer_size=1024 * 1024, stage=None, metrics=None):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.enabled = enabled
+        self.buffer_size = buffer_size
+        self.stage = stage
+        self.metrics = metrics
+        self.lines_written = 0
+        self._file = None
+
+    def _open(self):
+        if self.stage is None or self.metrics is None or not self.metrics.enabled:
+            return self.path.open("a", buffering=self.buffer_size)
+        raw = _TimedFileIO(self.path, self.metrics, self.stage)
+        return io.TextIOWrapper(io.BufferedWriter(raw, self.buffer_size))
+
+    def write(self, text):
+        if self._file is None:
+            if not self.enabled:
+                return
+            self._file = self._open()
+        self._file.write(text)
+        self.lines_written += 1
+        if self.flush_every and self.lines_written % self.flush_every == 0:
+            self._file.flush()
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
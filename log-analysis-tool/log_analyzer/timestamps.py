@@ -0,0 +1,54 @@
+# === TIMESTAMP PARSING ===
+import time                                # format epoch seconds
+from datetime import datetime, timedelta   # handle timestamps
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+TIMESTAMP_CACHE_SIZE = 4096  # distinct seconds memoized before the cache is reset
+MAX_EPOCH = 2 ** 32 - 1  # array('I') columns hold 1970-01-01 .. 2106-02-07
+_EPOCH = datetime(1970, 1, 1)
+_ONE_SECOND = timedelta(seconds=1)
+_timestamp_cache = {}
+
+
+def to_epoch(dt):
+    """Naive (as-logged) datetime -> epoch seconds; ValueError outside the column range."""
+    seconds = (dt - _EPOCH) // _ONE_SECOND
+    if not 0 <= seconds <= MAX_EPOCH:
+        raise ValueError(f"timestamp out of supported range: {dt}")
+    return seconds
+
+
+def format_timestamp(epoch):
+    """Epoch seconds -> "%Y-%m-%d %H:%M:%S" (inverse of parse_timestamp)."""
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(epoch))
+
+
+def parse_timestamp(timestamp_str):
+    """
+    Parse a "%Y-%m-%d %H:%M:%S" timestamp into epoch seconds, raising ValueError if invalid.
+    Fixed-width strings are sliced directly; anything else falls back to strptime.
+    Results are memoized per second since consecutive lines often share a timestamp.
+    """
+    cached = _timestamp_cache.get(timestamp_str)
+    if cached is not None:
+        return cached
+
+    s = timestamp_str
+    if (len(s) == 19 and s[4] == "-" and s[7] == "-" and s[10] == " "
+            and s[13] == ":" and s[16] == ":"):
+        digits = s[0:4] + s[5:7] + s[8:10] + s[11:13] + s[14:16] + s[17:19]
+        if digits.isascii() and digits.isdigit():
+            # datetime() rejects out-of-range fields with ValueError, like strptime
+            parsed = datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                              int(s[11:13]), int(s[14:16]), int(s[17:19]))
+        else:
+            parsed = datetime.strptime(s, TIMESTAMP_FORMAT)
+    else:
+        parsed = datetime.strptime(s, TIMESTAMP_FORMAT)
+
+    parsed = to_epoch(parsed)
+    if len(_timestamp_cache) >= TIMESTAMP_CACHE_SIZE:
+        _timestamp_cache.clear()
+    _timestamp_cache[timestamp_str] = parsed
+    return parsed
@@ -0,0 +1,30 @@
+"""Event generators and FailedAttempts helpers shared by the tests."""
+import random
+from log_analyzer import FailedAttempts
+
+def generate_events(seed, count=2000, users=40, ips=25, steps=(0, 1, 7)):
+    """Seeded (user, ip, timestamp) events in time order, advancing by one of `steps` seconds each."""
+    rng = random.Random(seed)
+    users = [f"user{i}" for i in range(users)]
+    ips = [f"10.0.0.{i}" for i in range(ips)]
+    ts = 1767607200
+    for _ in range(count):
+        ts += rng.choice(steps)
+        yield rng.choice(users), rng.choice(ips), ts
+
+def collect(events):
+    failed_attempts = FailedAttempts()
+    for user, ip, ts in events:
+        failed_attempts.add(user, ip, ts)
+    return failed_attempts
+
+def as_dict(failed_attempts):
+    return {key: list(timestamps) for key, timestamps in failed_attempts.items()}
+
+def unstamped(path):
+    """Lines of an analyzed/malformed log without the wall-clock stamp each was written at."""
+    return [line.split("] ", 1)[1] for line in path.read_text().splitlines(keepends=True)]
+
+def alert_texts(alerts):
+    """Alert lines without the wall-clock stamp they were raised at."""
+    return [alert.split("] ", 1)[1] for alert in alerts]
@@ -0,0 +1,46 @@
+import random
+import pytest
+from log_analyzer import alerts
+from log_analyzer.alerts import VECTORIZE_MIN_EVENTS, episode_transitions, window_counts
+
+pytest.importorskip("numpy")  # the vectorized paths need it
+
+def _pure_python(monkeypatch, func, *args):
+    with monkeypatch.context() as m:
+        m.setattr(alerts, "_np", False)  # as if NumPy were not installed
+        return func(*args)
+
+def _timestamps(rng, count):
+    ts, column = 1767607200, []
+    for _ in range(count):
+        ts += rng.choice((0, 1, 5, 30, 60, 120, 600, 1800))
+        column.append(ts)
+    return column
+
+def _check_paths_agree(monkeypatch, timestamps, threshold, window_seconds=600):
+    counts = window_counts(timestamps, window_seconds)
+    python_counts = _pure_python(monkeypatch, window_counts, timestamps, window_seconds)
+    assert list(counts) == python_counts
+    assert episode_transitions(counts, threshold) == _pure_python(monkeypatch, episode_transitions,
+                                                                  python_counts, threshold)
+
+@pytest.mark.parametrize("seed", range(25))
+def test_numpy_and_python_paths_agree_on_random_columns(monkeypatch, seed):
+    rng = random.Random(seed)
+    timestamps = _timestamps(rng, rng.randrange(VECTORIZE_MIN_EVENTS, 3000))
+    _check_paths_agree(monkeypatch, timestamps, rng.randrange(1, 12), rng.choice((60, 600, 3600)))
+
+@pytest.mark.parametrize("count", [VECTORIZE_MIN_EVENTS - 1, VECTORIZE_MIN_EVENTS, VECTORIZE_MIN_EVENTS + 1])
+def test_paths_agree_at_the_vectorize_cutoff(monkeypatch, count):
+    rng = random.Random(count)
+    for threshold in (1, 3, 8):
+        _check_paths_agree(monkeypatch, _timestamps(rng, count), threshold)
+
+def test_episode_open_at_end_and_clear_before_reopen(monkeypatch):
+    # A burst, a quiet gap that empties the window, then a burst that is still open at the end
+    timestamps = [1767607200 + i for i in range(150)] + [1767607200 + 7200 + i for i in range(150)]
+    counts = window_counts(timestamps, 600)
+    transitions, open_peak = episode_transitions(counts, 3)
+    assert transitions == [(2, "open", 3), (150, "clear", 150), (152, "open", 3)]
+    assert open_peak == 150
+    assert _pure_python(monkeypatch, episode_transitions, list(counts), 3) == (transitions, open_peak)
@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from log_analyzer import Analyzer, Config
+
+PROJECT = Path(__file__).resolve().parent.parent
+
+def test_import_and_construction_do_no_io(tmp_path):
+    # A fresh interpreter, so the import itself is measured; no config.json or logs/ exist here
+    code = "import log_analyzer; log_analyzer.Analyzer(); log_analyzer.Analyzer(log_analyzer.Config())"
+    env = {**os.environ, "PYTHONPATH": str(PROJECT)}
+    subprocess.run([sys.executable, "-B", "-c", code], cwd=tmp_path, env=env, check=True)
+    assert list(tmp_path.iterdir()) == []
+
+def test_output_directories_are_created_on_first_write(tmp_path):
+    log = tmp_path / "auth.log"
+    log.write_text("2026-01-05 10:00:00 user=alice ip=10.0.0.1 action=login_failed\n")
+    out = tmp_path / "out"
+    analyzer = Analyzer(Config({"analyzed_log_file": out / "analyzed.txt", "report_file": out / "report.csv",
+                                "rule_report_file": out / "rules" / "rules.csv",
+                                "alert_log_file": out / "alerts.txt", "malformed_log_file": out / "malformed.txt"}))
+    assert not out.exists()
+    assert analyzer.analyze(log).event_count() == 1
+    assert (out / "analyzed.txt").exists() and (out / "rules").is_dir()
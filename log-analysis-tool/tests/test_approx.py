@@ -0,0 +1,70 @@
+import random
+from collections import Counter
+import pytest
+from log_analyzer import CountMinSketch, HeavyHitters, SpaceSaving
+
+def _zipf_stream(seed, count=20000, items=2000):
+    """Skewed item stream: a few heavy hitters and a long tail."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(items)]
+    return rng.choices([f"10.0.{i // 256}.{i % 256}" for i in range(items)], weights, k=count)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_space_saving_bounds_hold(seed):
+    stream = _zipf_stream(seed)
+    truth = Counter(stream)
+    summary = SpaceSaving(capacity=50)
+    for item in stream:
+        summary.add(item)
+
+    assert len(summary.counters) == 50
+    assert sum(count for count, _ in summary.counters.values()) == len(stream)  # counts are conserved
+    for item, (count, error) in summary.counters.items():
+        assert count - error <= truth[item] <= count
+    # Any item more frequent than n / capacity is guaranteed to be tracked
+    assert {item for item, n in truth.items() if n > len(stream) / 50} <= set(summary.counters)
+    assert [item for item, _, _ in summary.top(3)] == [item for item, _ in truth.most_common(3)]
+
+def test_space_saving_evicts_the_minimum():
+    summary = SpaceSaving(capacity=2)
+    for item in "aaab":
+        summary.add(item)
+    summary.add("c")  # evicts b (count 1); c inherits it as error
+    assert summary.counters == {"a": [3, 0], "c": [2, 1]}
+    summary.add("c")
+    summary.add("d")  # a and c both have 3; either may go, with error 3
+    assert len(summary.counters) == 2 and summary.counters["d"] == [4, 3]
+    assert summary.top(1)[0][1] == 4
+
+def test_space_saving_heap_stays_bounded():
+    summary = SpaceSaving(capacity=10)
+    for item in _zipf_stream(7, count=5000, items=100):
+        summary.add(item)
+        assert len(summary._heap) <= 4 * summary.capacity + 1
+
+@pytest.mark.parametrize("seed", range(3))
+def test_count_min_never_undercounts(seed):
+    stream = _zipf_stream(seed)
+    truth = Counter(stream)
+    sketch = CountMinSketch(width=200, depth=4)
+    for item in stream:
+        sketch.add(item)
+    assert sketch.total == len(stream)
+    overcounts = [sketch.estimate(item) - n for item, n in truth.items()]
+    assert min(overcounts) >= 0
+    # Each item exceeds epsilon * total with probability at most delta (slack: hash() is salted per process)
+    assert sum(over > sketch.epsilon * sketch.total for over in overcounts) <= 3 * sketch.delta * len(truth)
+
+def test_heavy_hitters_top_reports_true_count_bounds():
+    stream = _zipf_stream(11)
+    truth = Counter(stream)
+    hitters = HeavyHitters(capacity=40, width=500, depth=4)
+    for item in stream:
+        hitters.add(item)
+    rows = hitters.top(10)
+    assert len(rows) == 10
+    for item, lower, upper in rows:
+        assert lower <= truth[item] <= upper
+        count, error = hitters.space_saving.counters[item]
+        assert (lower, upper) == (count - error, min(count, hitters.sketch.estimate(item)))
+    assert rows[0][0] == truth.most_common(1)[0][0]
@@ -0,0 +1,48 @@
+from log_analyzer import FailedAttempts, merge_failed_attempts
+from .helpers import as_dict, collect, generate_events
+
+def _reference(events):
+    """The dict-of-lists the columns replaced: {(user, ip): [timestamps]} in first-seen key order."""
+    attempts = {}
+    for user, ip, ts in events:
+        attempts.setdefault((user, ip), []).append(ts)
+    return attempts
+
+def test_columns_match_dict_of_lists():
+    events = list(generate_events(1))
+    reference = _reference(events)
+    failed_attempts = collect(events)
+
+    assert as_dict(failed_attempts) == reference
+    assert list(as_dict(failed_attempts)) == list(reference)  # same key order
+    assert failed_attempts.keys() == list(reference)
+    assert len(failed_attempts) == len(reference)
+    assert failed_attempts.event_count() == len(events)
+    for key, timestamps in reference.items():
+        assert key in failed_attempts
+        assert list(failed_attempts[key]) == timestamps
+    assert ("user0", "10.9.9.9") not in failed_attempts and ("nobody", "10.0.0.1") not in failed_attempts
+    # Each user/IP string is stored once however many keys use it
+    assert len(failed_attempts.users) == len({user for user, _ in reference})
+    assert len(failed_attempts.ips) == len({ip for _, ip in reference})
+
+def test_merge_matches_concatenated_dicts():
+    events = list(generate_events(2))
+    cuts = [0, 300, 301, 1200, len(events)]
+    partials = [collect(events[a:b]) for a, b in zip(cuts, cuts[1:])]
+    partials.insert(2, FailedAttempts())  # an empty range
+    merged = merge_failed_attempts(partials)
+
+    reference = _reference(events)
+    assert as_dict(merged) == reference
+    assert list(as_dict(merged)) == list(reference)
+    # The partials are not modified (their IDs differ and are remapped on merge)
+    assert as_dict(partials[0]) == _reference(events[:300])
+
+def test_update_remaps_ids():
+    first, second = FailedAttempts(), FailedAttempts()
+    first.add("alice", "10.0.0.1", 10)
+    second.add("bob", "10.0.0.2", 20)
+    second.add("alice", "10.0.0.1", 30)
+    first.update(second)
+    assert as_dict(first) == {("alice", "10.0.0.1"): [10, 30], ("bob", "10.0.0.2"): [20]}
@@ -0,0 +1,121 @@
+import os
+from log_analyzer import Analyzer, Config, FailedAttempts
+from log_analyzer.checkpoint import load_checkpoint, save_checkpoint
+from .helpers import alert_texts
+
+ACTIONS = ["login_failed"]
+
+def _lines(start_minute, count, user="alice", ip="10.0.0.1"):
+    return "".join(f"2026-01-05 10:{start_minute + i:02d}:00 user={user} ip={ip} action=login_failed\n"
+                   for i in range(count))
+
+def _config(tmp_path, log_file, **overrides):
+    return Config({"log_file": str(log_file), "checkpoint_file": str(tmp_path / "checkpoint.json"),
+                   "report_file": str(tmp_path / "report.csv"), "rule_report_file": str(tmp_path / "rules.csv"),
+                   "analyzed_log_file": str(tmp_path / "analyzed.txt"), "alert_log_file": str(tmp_path / "alerts.txt"),
+                   "malformed_log_file": str(tmp_path / "malformed.txt")}, **overrides)
+
+def _saved(tmp_path, log_file):
+    attempts = FailedAttempts()
+    attempts.add("alice", "10.0.0.1", 1767607200)
+    save_checkpoint(tmp_path / "checkpoint.json", log_file, log_file.stat().st_size, attempts, 10, ACTIONS)
+    return log_file.stat().st_size
+
+def test_save_and_load_round_trip(tmp_path):
+    log_file = tmp_path / "auth.log"
+    log_file.write_text(_lines(0, 3))
+    offset = _saved(tmp_path, log_file)
+    start, windows = load_checkpoint(tmp_path / "checkpoint.json", log_file, 10, ACTIONS)
+    assert start == offset
+    assert list(windows.items()) == [(("alice", "10.0.0.1"), windows["alice", "10.0.0.1"])]
+    assert list(windows["alice", "10.0.0.1"]) == [1767607200]
+    # A changed window or action list invalidates the snapshot
+    assert load_checkpoint(tmp_path / "checkpoint.json", log_file, 5, ACTIONS)[0] == 0
+    assert load_checkpoint(tmp_path / "checkpoint.json", log_file, 10, ACTIONS + ["x"])[0] == 0
+
+def test_new_inode_forces_full_rescan(tmp_path):
+    log_file = tmp_path / "auth.log"
+    log_file.write_text(_lines(0, 3))
+    _saved(tmp_path, log_file)
+    rotated = tmp_path / "auth.log.new"
+    rotated.write_text(_lines(0, 3) + _lines(3, 3))  # same head, different file
+    os.replace(rotated, log_file)
+    assert load_checkpoint(tmp_path / "checkpoint.json", log_file, 10, ACTIONS)[0] == 0
+
+def test_truncate_forces_full_rescan(tmp_path):
+    log_file = tmp_path / "auth.log"
+    log_file.write_text(_lines(0, 3))
+    _saved(tmp_path, log_file)
+    with log_file.open("r+") as f:
+        f.truncate(0)
+    assert load_checkpoint(tmp_path / "checkpoint.json", log_file, 10, ACTIONS)[0] == 0
+
+def test_copytruncate_regrown_past_offset_forces_full_rescan(tmp_path):
+    log_file = tmp_path / "auth.log"
+    log_file.write_text(_lines(0, 3))
+    offset = _saved(tmp_path, log_file)
+    inode = log_file.stat().st_ino
+    with log_file.open("r+") as f:  # copytruncate keeps the inode
+        f.truncate(0)
+        f.write(_lines(30, 5, user="bob"))
+    assert log_file.stat().st_ino == inode and log_file.stat().st_size > offset
+    assert load_checkpoint(tmp_path / "checkpoint.json", log_file, 10, ACTIONS)[0] == 0
+
+def test_resumed_run_only_parses_new_bytes_and_keeps_windows(tmp_path, capsys):
+    log_file = tmp_path / "auth.log"
+    log_file.write_text(_lines(0, 2))
+    config = _config(tmp_path, log_file)
+    assert Analyzer(config).run() == []  # 2 < threshold 3
+
+    size = log_file.stat().st_size
+    with log_file.open("a") as f:
+        f.write(_lines(2, 1) + "2026-01-05 10:03:00 user=alice")  # the partial line is left for later
+    alerts = Analyzer(config).run()
+    assert "Resuming" in capsys.readouterr().out
+    # The window straddling the checkpoint reaches the threshold
+    assert alert_texts(alerts) == [
+        "ALERT: User 'alice' from IP 10.0.0.1 had 3 failed attempts within 10 minutes.\n"]
+    assert (load_checkpoint(config.checkpoint_file, log_file, 10, config.suspicious_actions, config.rule_windows())[0]
+            == size + len(_lines(2, 1)))
+
+    assert Analyzer(config).run() == []  # nothing new: no repeated alert
+    assert Analyzer(config).run(full_rescan=True)  # a full rescan alerts again
+
+def _spray(minute, users, ip="1.1.1.1"):
+    return "".join(f"2026-01-05 10:{minute:02d}:00 user={user} ip={ip} action=login_failed\n" for user in users)
+
+def test_resumed_run_does_not_repeat_a_rule_clear(tmp_path, capsys):
+    log_file = tmp_path / "auth.log"
+    log_file.write_text(_spray(0, [f"u{i}" for i in range(5)]) + _lines(8, 1, user="bob", ip="2.2.2.2"))
+    config = _config(tmp_path, log_file, rules={"password_spraying": {"time_window_minutes": 5}})
+    first = alert_texts(Analyzer(config).run())
+    assert [alert.split(":")[0] for alert in first] == ["ALERT", "ALERT CLEARED"]
+
+    with log_file.open("a") as f:
+        f.write(_lines(9, 1, user="bob", ip="2.2.2.2"))
+    assert Analyzer(config).run() == []
+    assert Analyzer(config).run() == []
+
+def test_rule_window_wider_than_main_window_spans_the_checkpoint(tmp_path, capsys):
+    log_file = tmp_path / "auth.log"
+    log_file.write_text(_spray(0, ["u0", "u1", "u2"]) + _lines(15, 1, user="bob", ip="2.2.2.2"))
+    config = _config(tmp_path, log_file, rules={"password_spraying": {"time_window_minutes": 30}})
+    assert Analyzer(config).run() == []
+
+    with log_file.open("a") as f:
+        f.write(_spray(20, ["u3", "u4"]))
+    expected = ["ALERT: IP 1.1.1.1 had failed attempts against 5 distinct users within 30 minutes "
+                "(password spraying).\n"]
+    assert alert_texts(Analyzer(config).run()) == expected
+    assert alert_texts(Analyzer(config.replace(checkpoint_file=None)).run()) == expected
+
+def test_changed_rule_window_forces_full_rescan(tmp_path):
+    log_file = tmp_path / "auth.log"
+    log_file.write_text(_lines(0, 3))
+    attempts = FailedAttempts()
+    attempts.add("alice", "10.0.0.1", 1767607200)
+    save_checkpoint(tmp_path / "checkpoint.json", log_file, log_file.stat().st_size, attempts, 10, ACTIONS,
+                    {"password_spraying": 30})
+    assert load_checkpoint(tmp_path / "checkpoint.json", log_file, 10, ACTIONS, {"password_spraying": 30})[0]
+    assert load_checkpoint(tmp_path / "checkpoint.json", log_file, 10, ACTIONS, {"password_spraying": 20})[0] == 0
+    assert load_checkpoint(tmp_path / "checkpoint.json", log_file, 10, ACTIONS)[0] == 0
@@ -0,0 +1,102 @@
+import os
+import threading
+from log_analyzer.follow import SlidingWindowDetector, follow_lines
+
+T = 1767607200
+KEY = ("alice", "10.0.0.1")
+
+def test_window_evicts_old_events():
+    detector = SlidingWindowDetector(threshold=100, time_window_minutes=10)
+    for i in range(60):
+        detector.add(KEY, T + i * 60)
+        assert len(detector.windows[KEY]) <= 11  # one event per minute, 10-minute window
+    assert list(detector.windows[KEY]) == [T + i * 60 for i in range(49, 60)]
+
+def test_alerts_open_update_and_clear_in_window():
+    detector = SlidingWindowDetector(threshold=3, time_window_minutes=10, update_every=2)
+    transitions = [t for i in range(5) for t in detector.add(KEY, T + i * 60)]
+    assert transitions == [("open", KEY, 3), ("update", KEY, 5)]
+    # The next event comes after the window emptied: the episode closes, and stays closed
+    assert detector.add(KEY, T + 60 * 60) == [("clear", KEY, 5)]
+    assert KEY not in detector.episodes
+
+def test_sweep_clears_quiet_keys_and_bounds_memory():
+    detector = SlidingWindowDetector(threshold=3, time_window_minutes=10)
+    for i in range(3):
+        detector.add(KEY, T + i)
+    for n in range(500):
+        detector.add((f"user{n}", "10.0.0.2"), T + 10)
+    assert len(detector.windows) == 501
+
+    # Another key's events move time on; quiet keys are swept once per window
+    other = ("bob", "10.0.0.3")
+    transitions = []
+    for minute in (12, 24, 36):
+        transitions += detector.add(other, T + minute * 60)
+    assert transitions == [("clear", KEY, 3)]
+    assert list(detector.windows) == [other] and not detector.episodes
+
+def test_out_of_order_events_keep_the_window_sorted():
+    detector = SlidingWindowDetector(threshold=3, time_window_minutes=10)
+    assert detector.add(KEY, T + 300) == []
+    assert detector.add(KEY, T + 100) == []
+    assert detector.add(KEY, T + 200) == [("open", KEY, 3)]
+    assert list(detector.windows[KEY]) == [T + 100, T + 200, T + 300]
+    # A late event older than the window of the newest one is evicted straight away
+    detector.add(KEY, T + 300 - 700)
+    assert list(detector.windows[KEY]) == [T + 100, T + 200, T + 300]
+    assert detector.latest == T + 300
+
+def _append(path, text):
+    with path.open("a") as f:
+        f.write(text)
+
+def _next_after(lines, action, *args):
+    """next(lines) while action(*args) runs shortly after it starts polling."""
+    timer = threading.Timer(0.05, action, args)
+    timer.start()
+    try:
+        return next(lines)
+    finally:
+        timer.join()
+
+def test_follow_lines_tails_and_waits_for_complete_lines(tmp_path):
+    log = tmp_path / "auth.log"
+    log.write_text("old\n")
+    lines = follow_lines(log, poll_interval=0.01)
+    assert _next_after(lines, _append, log, "first\n") == "first\n"  # starts at the end
+
+    _append(log, "par")
+    assert _next_after(lines, _append, log, "tial\n") == "partial\n"  # the half-written line is joined
+    lines.close()
+
+    lines = follow_lines(log, poll_interval=0.01, from_start=True)
+    assert next(lines) == "old\n"
+    lines.close()
+
+def test_follow_lines_reopens_after_rotation(tmp_path):
+    log = tmp_path / "auth.log"
+    log.write_text("")
+    lines = follow_lines(log, poll_interval=0.01)
+    assert _next_after(lines, _append, log, "one\n") == "one\n"
+
+    _append(log, "last in old file\n")
+    os.rename(log, tmp_path / "auth.log.1")
+    log.write_text("first in new file\n")
+    assert next(lines) == "last in old file\n"  # the old file is drained first
+    assert next(lines) == "first in new file\n"
+    lines.close()
+
+def test_follow_lines_restarts_after_truncation(tmp_path):
+    log = tmp_path / "auth.log"
+    log.write_text("a fairly long line that was there before\n")
+    lines = follow_lines(log, poll_interval=0.01)
+    assert _next_after(lines, _append, log, "appended\n") == "appended\n"
+
+    inode = log.stat().st_ino
+    with log.open("r+") as f:  # copytruncate
+        f.truncate(0)
+        f.write("new\n")
+    assert log.stat().st_ino == inode
+    assert next(lines) == "new\n"
+    lines.close()
@@ -0,0 +1,97 @@
+import bz2
+import gzip
+import lzma
+import random
+import pytest
+from benchmarks.workload import write_workload
+from log_analyzer import DEFAULTS, FailedAttempts, analyze_log_files, expand_log_inputs, merge_by_timestamp
+from .helpers import as_dict, collect, generate_events, unstamped
+
+ACTIONS = DEFAULTS["suspicious_actions"]
+COMPRESSORS = {".gz": gzip.compress, ".bz2": bz2.compress, ".xz": lzma.compress}
+
+def _touch(directory, *names):
+    for name in names:
+        (directory / name).write_bytes(b"")
+
+def _names(paths):
+    return [path.name for path in paths]
+
+def test_numbered_rotations_oldest_first(tmp_path):
+    _touch(tmp_path, "auth.log", "auth.log.1", "auth.log.2.gz", "auth.log.10.gz", "notes.txt")
+    assert _names(expand_log_inputs(tmp_path)) == ["auth.log.10.gz", "auth.log.2.gz", "auth.log.1", "auth.log"]
+    assert _names(expand_log_inputs(str(tmp_path / "auth.log*"))) == _names(expand_log_inputs(tmp_path))
+
+def test_dateext_rotations_oldest_first(tmp_path):
+    _touch(tmp_path, "auth.log", "auth.log-20260108", "auth.log-20260101.gz", "auth.log-20251225.bz2",
+           "audit.log.jsonl", "audit.log.jsonl-20260101.xz")
+    assert _names(expand_log_inputs(tmp_path)) == [
+        "audit.log.jsonl-20260101.xz", "audit.log.jsonl",
+        "auth.log-20251225.bz2", "auth.log-20260101.gz", "auth.log-20260108", "auth.log",
+    ]
+
+def test_missing_input_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        expand_log_inputs(str(tmp_path / "auth.log*"))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merge_by_timestamp_matches_one_log(seed):
+    events = list(generate_events(seed, 3000, users=30, ips=20, steps=range(1, 6)))  # no ties in first events
+    expected = as_dict(collect(events))
+
+    # Consecutive files listed newest first: columns are concatenated in time order
+    chunks = [events[i:i + 700] for i in range(0, len(events), 700)]
+    merged = as_dict(merge_by_timestamp([collect(chunk) for chunk in reversed(chunks)]))
+    assert merged == expected and list(merged) == list(expected)
+
+    # Overlapping files: columns are interleaved with heapq.merge
+    partials = [collect(events[i::3]) for i in range(3)]
+    random.Random(seed).shuffle(partials)
+    merged = as_dict(merge_by_timestamp(partials + [FailedAttempts()]))
+    assert merged == expected and list(merged) == list(expected)
+
+def test_merge_by_timestamp_trivial_inputs():
+    assert merge_by_timestamp([]).event_count() == 0
+    single = collect(generate_events(9, 50))
+    assert merge_by_timestamp([FailedAttempts(), single]) is single
+
+@pytest.fixture(scope="module")
+def plain_log(tmp_path_factory):
+    path = tmp_path_factory.mktemp("logs") / "auth.log"
+    return write_workload(path, 5000, seed=4, malformed_rate=0.01, users=100, ips=200)
+
+def _analyze(log_files, out_dir):
+    out_dir.mkdir()
+    return as_dict(analyze_log_files(log_files, ACTIONS, analyzed_log_file=out_dir / "analyzed.txt",
+                                      malformed_log_file=out_dir / "malformed.txt"))
+
+@pytest.mark.parametrize("suffix", sorted(COMPRESSORS))
+@pytest.mark.parametrize("workers", [1, 2])
+def test_compressed_input_matches_plain(plain_log, tmp_path, suffix, workers):
+    expected = _analyze([plain_log], tmp_path / "plain")
+    assert expected
+
+    data = COMPRESSORS[suffix](plain_log.read_bytes())
+    named = tmp_path / f"auth.log.1{suffix}"
+    named.write_bytes(data)
+    sniffed = tmp_path / "auth.log.archived"  # no suffix: detected by its magic bytes
+    sniffed.write_bytes(data)
+    for log_file in (named, sniffed):
+        out_dir = tmp_path / log_file.name.replace(".", "-")
+        out_dir.mkdir()
+        assert as_dict(analyze_log_files([log_file], ACTIONS, workers=workers,
+                                          analyzed_log_file=out_dir / "analyzed.txt",
+                                          malformed_log_file=out_dir / "malformed.txt")) == expected
+        assert unstamped(out_dir / "analyzed.txt") == unstamped(tmp_path / "plain" / "analyzed.txt")
+
+def test_rotated_set_matches_concatenated_log(plain_log, tmp_path):
+    lines = plain_log.read_bytes().splitlines(keepends=True)
+    third = len(lines) // 3
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    (logs / "auth.log-20260101.gz").write_bytes(gzip.compress(b"".join(lines[:third])))
+    (logs / "auth.log-20260102.xz").write_bytes(lzma.compress(b"".join(lines[third:2 * third])))
+    (logs / "auth.log").write_bytes(b"".join(lines[2 * third:]))
+
+    expected = _analyze([plain_log], tmp_path / "plain")
+    assert _analyze(expand_log_inputs(logs), tmp_path / "rotated") == expected
@@ -0,0 +1,109 @@
+import json
+from log_analyzer import Metrics
+from log_analyzer.cli import main
+
+LOG = """\
+2026-01-05 10:00:00 user=alice ip=10.0.0.1 action=login_failed
+2026-01-05 10:01:00 user=alice ip=10.0.0.1 action=login_failed
+2026-01-05 10:02:00 user=alice ip=10.0.0.1 action=login_failed
+2026-01-05 10:03:00 user=bob ip=10.0.0.2 action=login_success
+not a log line
+"""
+
+def test_count_and_stage_accumulate():
+    metrics = Metrics(enabled=True)
+    metrics.count("events")
+    metrics.count("events", 4)
+    metrics.add_time("parse", 0.25)
+    with metrics.stage("parse"):
+        pass
+    with metrics.stage("report"):
+        pass
+    assert metrics.counters == {"events": 5}
+    assert list(metrics.stages) == ["parse", "report"]
+    assert metrics.stages["parse"] >= 0.25 and metrics.stages["report"] >= 0
+
+def test_stage_records_time_when_the_body_raises():
+    metrics = Metrics(enabled=True)
+    try:
+        with metrics.stage("parse"):
+            raise ValueError
+    except ValueError:
+        pass
+    assert "parse" in metrics.stages
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics()
+    metrics.count("events", 3)
+    metrics.add_time("parse", 1.0)
+    with metrics.stage("report"):
+        pass
+    assert list(metrics.counted(iter("abc"), "lines")) == ["a", "b", "c"]
+    assert metrics.counters == {} and metrics.stages == {}
+
+def test_counted_passes_lines_through_and_counts_them():
+    metrics = Metrics(enabled=True)
+    assert list(metrics.counted(iter(["a\n", "b\n", "c\n"]), "lines_parsed")) == ["a\n", "b\n", "c\n"]
+    lines = metrics.counted(iter(["d\n", "e\n", "f\n"]), "lines_parsed")
+    next(lines)
+    lines.close()  # a consumer that stops early still has its lines counted
+    assert metrics.counters == {"lines_parsed": 4}
+
+def test_snapshot_merge_and_dump(tmp_path):
+    worker = Metrics(enabled=True)
+    worker.count("events", 2)
+    worker.add_time("parse", 0.1234567)
+    snapshot = worker.snapshot()
+    assert snapshot == {"counters": {"events": 2}, "stages": {"parse": 0.123457}}
+
+    metrics = Metrics(enabled=True)
+    metrics.count("events", 1)
+    metrics.merge(snapshot)
+    metrics.merge(snapshot)
+    assert metrics.counters == {"events": 5}
+    assert abs(metrics.stages["parse"] - 0.246914) < 1e-9
+
+    metrics.dump(tmp_path / "stats" / "run.json")
+    assert json.loads((tmp_path / "stats" / "run.json").read_text()) == metrics.snapshot()
+    metrics.dump(tmp_path / "run.prom")
+    assert (tmp_path / "run.prom").read_text() == (
+        "# TYPE log_analyzer_events_total counter\n"
+        "log_analyzer_events_total 5\n"
+        "# TYPE log_analyzer_stage_seconds gauge\n"
+        'log_analyzer_stage_seconds{stage="parse"} 0.246914\n'
+    )
+
+def test_summary_lists_stages_then_counters():
+    metrics = Metrics(enabled=True)
+    metrics.add_time("parse", 1.5)
+    metrics.count("lines_parsed", 12345)
+    assert metrics.summary().splitlines() == [
+        "Run statistics:",
+        "  parse                         1.500s",
+        "  lines_parsed                 12,345",
+    ]
+
+def _run_cli(tmp_path, monkeypatch, *args):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.json").write_text("{}")
+    (tmp_path / "auth.log").write_text(LOG)
+    main(["--logfile", "auth.log", *args])
+
+def test_stats_flag_prints_the_summary_to_stderr(tmp_path, monkeypatch, capsys):
+    _run_cli(tmp_path, monkeypatch, "--stats")
+    out, err = capsys.readouterr()
+    assert "ALERTS GENERATED" in out and "Run statistics" not in out
+    rows = {line.split()[0]: line.split()[1] for line in err.splitlines()[1:]}
+    assert err.startswith("Run statistics:\n")
+    assert {"parse", "report", "csv_report", "alerts", "rules"} <= set(rows)
+    assert (rows["lines_parsed"], rows["events"], rows["lines_malformed"], rows["alerts"]) == ("5", "3", "1", "1")
+
+def test_stats_file_without_stats_flag(tmp_path, monkeypatch, capsys):
+    _run_cli(tmp_path, monkeypatch, "--stats-file", "out/stats.json")
+    assert capsys.readouterr().err == ""
+    snapshot = json.loads((tmp_path / "out" / "stats.json").read_text())
+    assert snapshot["counters"]["events"] == 3 and "parse" in snapshot["stages"]
+
+def test_no_stats_options_print_nothing(tmp_path, monkeypatch, capsys):
+    _run_cli(tmp_path, monkeypatch)
+    assert capsys.readouterr().err == ""
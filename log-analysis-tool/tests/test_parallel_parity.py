@@ -0,0 +1,38 @@
+import pytest
+from benchmarks.workload import write_workload
+from log_analyzer import Analyzer, Config
+from .helpers import alert_texts, unstamped
+
+@pytest.fixture(scope="module")
+def log_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("logs") / "auth.log"
+    return write_workload(path, 20000, seed=3, malformed_rate=0.01, users=300, ips=600)
+
+def _run(log_file, out_dir, **overrides):
+    out_dir.mkdir()
+    config = Config({"log_file": str(log_file), "report_file": str(out_dir / "report.csv"),
+                     "rule_report_file": str(out_dir / "rules.csv"),
+                     "analyzed_log_file": str(out_dir / "analyzed.txt"),
+                     "alert_log_file": str(out_dir / "alerts.txt"),
+                     "malformed_log_file": str(out_dir / "malformed.txt")}, **overrides)
+    alerts = Analyzer(config).run()
+    # Alert lines start with the wall-clock time they were raised
+    return ((out_dir / "report.csv").read_text(), (out_dir / "rules.csv").read_text(),
+            alert_texts(alerts))
+
+@pytest.mark.parametrize("overrides", [
+    {"workers": 2},
+    {"workers": 3},
+    {"use_mmap": True},
+    {"workers": 2, "use_mmap": True},
+], ids=["workers2", "workers3", "mmap", "mmap-workers2"])
+def test_parallel_and_mmap_match_serial(log_file, tmp_path, overrides, capsys):
+    report, rule_report, alerts = _run(log_file, tmp_path / "serial", workers=1)
+    assert report.count("\n") > 1 and rule_report.count("\n") > 1 and alerts
+    assert _run(log_file, tmp_path / "other", **overrides) == (report, rule_report, alerts)
+
+def test_parallel_analyzed_log_matches_serial(log_file, tmp_path, capsys):
+    _run(log_file, tmp_path / "serial", workers=1)
+    _run(log_file, tmp_path / "parallel", workers=3)
+    for name in ("analyzed.txt", "malformed.txt"):
+        assert unstamped(tmp_path / "parallel" / name) == unstamped(tmp_path / "serial" / name)
@@ -0,0 +1,83 @@
+import gzip
+import json
+import pytest
+from log_analyzer import parse_audit_line, parse_log_line, resolve_log_format
+from log_analyzer.parsers import get_line_parser, parse_audit_timestamp
+from log_analyzer.timestamps import parse_timestamp
+
+class _Sink(list):
+    """Collects what a parser writes to its analyzed/malformed sink."""
+    write = list.append
+
+def _record(event="login_failed", timestamp="2026-01-05T10:00:00.123456+00:00Z", **fields):
+    return json.dumps({"timestamp": timestamp, "event": event, "username": "alice", "role": "user",
+                       "details": None, **fields}) + "\n"
+
+@pytest.mark.parametrize("event, action", [
+    ("login_failed", "login_failed"),
+    ("login_blocked", "login_failed"),
+    ("login_failed_unknown", "login_failed"),
+    ("login_success", "login_success"),  # unmapped events keep their name
+])
+def test_audit_events_map_to_actions(event, action):
+    assert parse_audit_line(_record(event)) == (parse_timestamp("2026-01-05 10:00:00"), "alice", "-", action)
+
+def test_audit_ip_and_custom_mapping():
+    assert parse_audit_line(_record(ip="10.0.0.9"))[2] == "10.0.0.9"
+    parse_line = get_line_parser("audit-jsonl", {"password_rehashed": "unauthorized_access"}, "0.0.0.0")
+    assert parse_line(_record("password_rehashed"))[2:] == ("0.0.0.0", "unauthorized_access")
+    assert parse_line(_record("login_blocked"))[3] == "login_blocked"  # the mapping replaces the defaults
+    assert get_line_parser("audit-jsonl") is parse_audit_line
+
+@pytest.mark.parametrize("stamp, expected", [
+    ("2026-01-05T10:00:00+00:00Z", "2026-01-05 10:00:00"),
+    ("2026-01-05T10:00:00Z", "2026-01-05 10:00:00"),
+    ("2026-01-05T10:00:00.5", "2026-01-05 10:00:00"),
+    ("2026-01-05T12:30:00+02:30", "2026-01-05 10:00:00"),
+    ("2026-01-05T05:00:00.250-05:00", "2026-01-05 10:00:00"),
+    ("2026-01-01T01:00:00+05:00", "2025-12-31 20:00:00"),  # crosses midnight and the year
+])
+def test_audit_timestamps_convert_offsets_to_utc(stamp, expected):
+    assert parse_audit_timestamp(stamp) == (parse_timestamp(expected), expected)
+
+@pytest.mark.parametrize("line", [
+    "not json\n",
+    json.dumps(["a", "list"]) + "\n",
+    json.dumps({"event": "login_failed", "username": "alice"}) + "\n",        # no timestamp
+    _record(timestamp="2026-01-05 10:00:00"),                                  # not ISO
+    _record(timestamp="2026-13-05T10:00:00+00:00"),                            # invalid month
+    json.dumps({"timestamp": "2026-01-05T10:00:00Z", "username": "alice"}) + "\n",  # no event
+    _record(username=42),
+])
+def test_malformed_audit_records_go_to_the_malformed_sink(line):
+    analyzed, malformed = _Sink(), _Sink()
+    assert parse_audit_line(line, analyzed, malformed) is None
+    assert analyzed == [] and len(malformed) == 1
+    assert malformed[0].endswith("] " + line.strip() + "\n")
+
+def test_valid_lines_are_echoed_to_the_analyzed_sink():
+    analyzed, malformed = _Sink(), _Sink()
+    parse_audit_line(_record(timestamp="2026-01-05T12:00:00+02:00"), analyzed, malformed)
+    parse_log_line("2026-01-05 10:00:00 user=bob ip=10.0.0.2 action=login_failed\n", analyzed, malformed)
+    assert analyzed == ["[2026-01-05 10:00:00] User=alice IP=- Action=login_failed\n",
+                        "[2026-01-05 10:00:00] User=bob IP=10.0.0.2 Action=login_failed\n"]
+    assert malformed == []
+
+def test_format_detection(tmp_path):
+    audit = tmp_path / "events.log"
+    audit.write_text("\n" + _record())
+    text = tmp_path / "auth.log"
+    text.write_text("2026-01-05 10:00:00 user=bob ip=10.0.0.2 action=login_failed\n")
+    jsonl = tmp_path / "audit.log.jsonl.gz"
+    jsonl.write_bytes(gzip.compress(b"not even json\n"))  # the suffix decides, not the contents
+    sniffed = tmp_path / "events.log.1.gz"
+    sniffed.write_bytes(gzip.compress(_record().encode()))
+    empty = tmp_path / "empty.log"
+    empty.write_text("")
+
+    assert resolve_log_format(audit) == "audit-jsonl"  # first non-blank line is a JSON object
+    assert resolve_log_format(text) == "text"
+    assert resolve_log_format(jsonl) == "audit-jsonl"
+    assert resolve_log_format(sniffed) == "audit-jsonl"  # read through the decompressor
+    assert resolve_log_format(empty) == "text"
+    assert resolve_log_format(audit, "text") == "text"  # an explicit format wins
@@ -0,0 +1,86 @@
+import csv
+from log_analyzer import check_rule_alerts
+from log_analyzer.config import build_rules
+from log_analyzer.rules import distinct_window_episodes, regroup_events, write_rule_report
+from .helpers import alert_texts, collect
+
+T = 1767607200  # 2026-01-05 10:00:00 UTC
+
+def _spray(ip="1.1.1.1", users=6, start=T, step=60):
+    return [(f"u{i}", ip, start + i * step) for i in range(users)]
+
+def _rules(**overrides):
+    return build_rules(overrides, 10)
+
+def test_spraying_opens_updates_and_clears():
+    events = _spray() + [("u0", "1.1.1.1", T + 40 * 60)]
+    rules = _rules(password_spraying={"threshold": 3}, distributed_brute_force={"enabled": False})
+    alerts, rows = check_rule_alerts(collect(events), rules, update_every=2)
+    assert alert_texts(alerts) == [
+        "ALERT: IP 1.1.1.1 had failed attempts against 3 distinct users within 10 minutes (password spraying).\n",
+        "ALERT UPDATE: IP 1.1.1.1 now has failed attempts against 5 distinct users within 10 minutes "
+        "(password spraying).\n",
+        "ALERT CLEARED: IP 1.1.1.1 dropped below 3 distinct users within 10 minutes (password spraying, peak 6).\n",
+    ]
+    assert rows == [["password_spraying", "1.1.1.1", 6, "2026-01-05 10:00:00", "2026-01-05 10:05:00", "cleared",
+                     "u0|u1|u2|u3|u4|u5"]]
+
+def test_distributed_brute_force_clears_at_end_of_data():
+    events = [("alice", f"10.0.0.{i}", T + i * 60) for i in range(5)] + [("bob", "9.9.9.9", T + 30 * 60)]
+    alerts, rows = check_rule_alerts(collect(events), _rules(password_spraying={"enabled": False}))
+    assert alert_texts(alerts) == [
+        "ALERT: User 'alice' had failed attempts against 5 distinct IPs within 10 minutes "
+        "(distributed brute force).\n",
+        "ALERT CLEARED: User 'alice' dropped below 5 distinct IPs within 10 minutes "
+        "(distributed brute force, peak 5).\n",
+    ]
+    assert [row[:3] + row[5:] for row in rows] == [
+        ["distributed_brute_force", "alice", 5, "cleared", "10.0.0.0|10.0.0.1|10.0.0.2|10.0.0.3|10.0.0.4"]]
+
+def test_episode_still_open_at_end_of_data():
+    alerts, rows = check_rule_alerts(collect(_spray(users=5)), _rules())
+    assert len(alerts) == 1 and rows[0][5] == "active"
+
+def test_per_rule_threshold_window_and_enabled():
+    attempts = collect(_spray(users=6, step=180))  # 6 users over 15 minutes
+    assert check_rule_alerts(attempts, _rules(password_spraying={"threshold": 7})) == ([], [])
+    assert check_rule_alerts(attempts, _rules(password_spraying={"enabled": False})) == ([], [])
+
+    # 10-minute window: at most 4 users fit (0, 3, 6, 9 minutes); 15 minutes holds all 6
+    alerts, rows = check_rule_alerts(attempts, _rules(password_spraying={"threshold": 4}))
+    assert "against 4 distinct users within 10 minutes" in alerts[0] and rows[0][2] == 4
+    alerts, rows = check_rule_alerts(attempts, _rules(password_spraying={"threshold": 6, "time_window_minutes": 15}))
+    assert "within 15 minutes" in alerts[0] and rows[0][2] == 6
+
+def test_regroup_skips_small_subjects_and_marks_restored_events():
+    attempts = collect(_spray(users=3) + [("u0", "2.2.2.2", T)])
+    assert list(regroup_events(attempts, "ip", 3, already_alerted={("u0", "1.1.1.1"): 1})) == [
+        ("1.1.1.1", [(T, False, "u0"), (T + 60, True, "u1"), (T + 120, True, "u2")])]
+    assert list(regroup_events(attempts, "ip", 4)) == []
+
+def test_distinct_window_counts_members_not_events():
+    events = [(T + i, True, member) for i, member in enumerate(["a", "a", "b", "a", "c"])]
+    transitions, peak, members, start, end, still_open = distinct_window_episodes(events, 3, 600, T + 4)
+    assert transitions == [(True, "open", 3)]
+    assert (peak, members, start, end, still_open) == (3, ["a", "b", "c"], T, T + 4, True)
+
+def test_restored_clear_is_not_repeated():
+    events = [(T + i * 60, False, f"u{i}") for i in range(5)]
+    latest = T + 30 * 60
+    # The previous run already ended after the window emptied: its clear was logged then
+    transitions = distinct_window_episodes(events, 5, 600, latest, previous_latest=latest)[0]
+    assert transitions == [(False, "open", 5), (False, "clear", 5)]
+    # It ended while the episode was open: the clear is new
+    transitions = distinct_window_episodes(events, 5, 600, latest, previous_latest=T + 4 * 60)[0]
+    assert transitions[-1] == (True, "clear", 5)
+
+def test_write_rule_report_csv(tmp_path, capsys):
+    _, rows = check_rule_alerts(collect(_spray(users=5)), _rules())
+    write_rule_report(rows, tmp_path / "rules.csv")
+    with open(tmp_path / "rules.csv", newline="") as f:
+        assert list(csv.reader(f)) == [
+            ["Rule", "Subject", "Peak Distinct", "Peak Window Start", "Peak Window End", "Status", "Members"],
+            ["password_spraying", "1.1.1.1", "5", "2026-01-05 10:00:00", "2026-01-05 10:04:00", "active",
+             "u0|u1|u2|u3|u4"],
+        ]
+    assert "password_spraying 1.1.1.1, 5 distinct" in capsys.readouterr().out
@@ -0,0 +1,57 @@
+import pytest
+from log_analyzer import DEFAULTS, parse_log_line
+from log_analyzer.scan import iter_mmap_candidate_lines
+
+ACTIONS = DEFAULTS["suspicious_actions"]
+LINES = [
+    "2026-01-05 10:00:00 user=alice ip=10.0.0.1 action=login_failed",
+    "2026-01-05 10:00:01 user=bob ip=10.0.0.2 action=login_success",
+    "2026-01-05 10:00:02 user=carol ip=10.0.0.3 action=login_failed_twice",  # token prefix only
+    "garbage user=dave action=login_failed",                                  # matches, but malformed
+    "2026-01-05 10:00:03 user=erin ip=10.0.0.4 action=unauthorized_access",
+    "",
+    "2026-01-05 10:00:04 user=action=login_failed ip=10.0.0.5 action=login_failed",  # two matches
+    "2026-01-05 10:00:05 user=frank ip=10.0.0.6 action=login_failed",
+]
+
+def _matching(lines):
+    """Lines the parser itself would count as suspicious."""
+    return {line for line in lines if (event := parse_log_line(line + "\n")) and event[3] in ACTIONS}
+
+def _write(path, newline, final_newline):
+    path.write_bytes((newline.join(LINES) + (newline if final_newline else "")).encode())
+    return path
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("final_newline", [True, False])
+def test_candidates_are_a_superset_of_matching_lines(tmp_path, newline, final_newline):
+    log = _write(tmp_path / "auth.log", newline, final_newline)
+    candidates = list(iter_mmap_candidate_lines(log, ACTIONS, encoding="utf-8"))
+
+    # CRLF lines keep their "\r"; the parser strips it like any other trailing whitespace
+    terminated = candidates if final_newline else candidates[:-1]
+    assert all(line.endswith("\r") == (newline == "\r\n") for line in terminated)
+    assert {line.rstrip("\r") for line in candidates if parse_log_line(line)} >= _matching(LINES)
+    stripped = [line.rstrip("\r") for line in candidates]
+    assert len(stripped) == len(set(stripped))  # each line is yielded once, however many matches
+    assert set(stripped) <= set(LINES)
+    assert _matching(LINES) <= set(stripped)
+    assert LINES[-1] in stripped  # the unterminated last line is not lost
+    assert LINES[1] not in stripped and LINES[2] not in stripped
+
+def test_byte_ranges_split_on_line_boundaries(tmp_path):
+    log = _write(tmp_path / "auth.log", "\r\n", final_newline=False)
+    data = log.read_bytes()
+    middle = data.index(b"\n", len(data) // 2) + 1
+    whole = list(iter_mmap_candidate_lines(log, ACTIONS, encoding="utf-8"))
+    halves = (list(iter_mmap_candidate_lines(log, ACTIONS, 0, middle, encoding="utf-8"))
+              + list(iter_mmap_candidate_lines(log, ACTIONS, middle, encoding="utf-8")))
+    assert halves == whole
+    assert list(iter_mmap_candidate_lines(log, ACTIONS, middle, middle, encoding="utf-8")) == []
+
+def test_empty_file_or_no_actions_yield_nothing(tmp_path):
+    empty = tmp_path / "empty.log"
+    empty.write_bytes(b"")
+    assert list(iter_mmap_candidate_lines(empty, ACTIONS)) == []
+    log = _write(tmp_path / "auth.log", "\n", final_newline=True)
+    assert list(iter_mmap_candidate_lines(log, [])) == []
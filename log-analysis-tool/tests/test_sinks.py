@@ -0,0 +1,51 @@
+from log_analyzer import Metrics
+from log_analyzer.sinks import OutputSink
+
+def test_flush_every_n_lines(tmp_path):
+    path = tmp_path / "out.txt"
+    with OutputSink(path, flush_every=3) as sink:
+        sink.write("1\n")
+        sink.write("2\n")
+        assert path.read_text() == ""  # still buffered
+        sink.write("3\n")
+        assert path.read_text() == "1\n2\n3\n"
+        sink.write("4\n")
+        assert path.read_text() == "1\n2\n3\n"
+        assert sink.lines_written == 4
+    assert path.read_text() == "1\n2\n3\n4\n"  # close flushes the rest
+
+def test_buffered_until_close(tmp_path):
+    path = tmp_path / "out.txt"
+    sink = OutputSink(path)
+    for i in range(100):
+        sink.write(f"{i}\n")
+    assert path.read_text() == ""
+    sink.flush()
+    assert len(path.read_text().splitlines()) == 100
+    sink.close()
+    sink.close()  # idempotent
+
+def test_opened_lazily_and_appends(tmp_path):
+    path = tmp_path / "out.txt"
+    with OutputSink(path):
+        pass
+    assert not path.exists()  # nothing written, nothing created
+    path.write_text("earlier\n")
+    with OutputSink(path) as sink:
+        sink.write("later\n")
+    assert path.read_text() == "earlier\nlater\n"
+
+def test_disabled_sink_discards_writes(tmp_path):
+    path = tmp_path / "out.txt"
+    with OutputSink(path, flush_every=1, enabled=False) as sink:
+        sink.write("ignored\n")
+        sink.flush()
+        assert sink.lines_written == 0
+    assert not path.exists()
+
+def test_write_time_is_recorded_under_the_stage(tmp_path):
+    metrics = Metrics(enabled=True)
+    with OutputSink(tmp_path / "out.txt", flush_every=1, stage="analyzed_log_write", metrics=metrics) as sink:
+        sink.write("line\n")
+    assert (tmp_path / "out.txt").read_text() == "line\n"
+    assert metrics.stages["analyzed_log_write"] >= 0
@@ -0,0 +1,62 @@
+import calendar
+import time
+from datetime import datetime
+import pytest
+from log_analyzer import timestamps
+from log_analyzer.timestamps import TIMESTAMP_FORMAT, format_timestamp, parse_timestamp
+
+def _strptime_epoch(timestamp_str):
+    return calendar.timegm(time.strptime(timestamp_str, TIMESTAMP_FORMAT))
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    timestamps._timestamp_cache.clear()
+    yield
+    timestamps._timestamp_cache.clear()
+
+@pytest.mark.parametrize("stamp", [
+    "2026-01-05 10:00:00", "1970-01-01 00:00:00", "2024-02-29 23:59:59", "2106-02-07 06:28:15",
+    "2026-1-5 10:00:00",   # not fixed-width: strptime fallback
+    "2026-01-05 9:05:00",
+    "２０２６-01-05 10:00:00",  # non-ASCII digits: strptime accepts them, so the fallback does too
+])
+def test_matches_strptime(stamp):
+    assert parse_timestamp(stamp) == _strptime_epoch(stamp)
+    assert format_timestamp(parse_timestamp(stamp)) == datetime.strptime(stamp, TIMESTAMP_FORMAT).strftime(
+        TIMESTAMP_FORMAT)
+
+@pytest.mark.parametrize("stamp", [
+    "2026-02-30 10:00:00",  # no such day
+    "2025-02-29 10:00:00",  # not a leap year
+    "2026-13-01 10:00:00",
+    "2026-01-05 24:00:00",
+    "2026-01-05 10:60:00",
+    "2026-01-05 10:00:61",
+    "2026-01-05T10:00:00",
+    "2026-01-05 10:00:0x",
+    "1969-12-31 23:59:59",  # before the epoch columns can hold
+    "2106-02-07 06:28:16",
+    "",
+])
+def test_invalid_dates_raise_like_strptime(stamp):
+    with pytest.raises(ValueError):
+        parse_timestamp(stamp)
+    assert stamp not in timestamps._timestamp_cache
+
+def test_cache_hits_and_reset(monkeypatch):
+    assert parse_timestamp("2026-01-05 10:00:00") == _strptime_epoch("2026-01-05 10:00:00")
+    assert timestamps._timestamp_cache == {"2026-01-05 10:00:00": _strptime_epoch("2026-01-05 10:00:00")}
+
+    def no_parsing(*args):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(timestamps, "datetime", type("NoDatetime", (), {"__new__": no_parsing,
+                                                                         "strptime": no_parsing}))
+    assert parse_timestamp("2026-01-05 10:00:00") == _strptime_epoch("2026-01-05 10:00:00")  # served from cache
+    monkeypatch.undo()
+
+    monkeypatch.setattr(timestamps, "TIMESTAMP_CACHE_SIZE", 3)
+    for second in range(5):
+        parse_timestamp(f"2026-01-05 10:00:0{second}")
+    assert len(timestamps._timestamp_cache) <= 3
+    assert "2026-01-05 10:00:04" in timestamps._timestamp_cache
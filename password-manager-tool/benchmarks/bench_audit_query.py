@@ -0,0 +1,99 @@
+"""
+Benchmark: "all login_failed for user X in one week" over a large audit log, as a
+json.loads-every-line scan versus password_manager.audit_query with its block index.
+
+Generates a synthetic log (10M events by default, roughly 1.3 GB) in a temp directory,
+then times the full scan, the one-off index build, and indexed queries.
+
+Run from anywhere:
+    python benchmarks/bench_audit_query.py --events 10000000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+TOOL_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(TOOL_DIR))
+
+from password_manager.audit_query import AuditIndex, query_audit  # noqa: E402
+
+EVENTS = ["login_success", "login_failed", "login_failed", "login_blocked", "login_failed_unknown"]
+
+
+def write_log(path, count, users, seed=1):
+    """Synthetic audit log spread evenly over 90 days, written like log_audit writes it."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    step = timedelta(days=90) / count
+    with path.open("w") as f:
+        for i in range(count):
+            record = {
+                "timestamp": (start + step * i).isoformat() + "Z",
+                "event": rng.choice(EVENTS),
+                "username": f"user{rng.randrange(users)}",
+                "role": "admin" if rng.random() < 0.05 else "user",
+                "details": None,
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+def full_scan(path, event, username, start, end):
+    matches = 0
+    with path.open("r") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["event"] != event or record["username"] != username:
+                continue
+            ts = datetime.fromisoformat(record["timestamp"].removesuffix("Z"))
+            if start <= ts <= end:
+                matches += 1
+    return matches
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "audit.log.jsonl"
+        _, gen_s = timed(lambda: write_log(log, args.events, args.users))
+        print(f"generated {args.events:,} events ({log.stat().st_size / 1e6:,.0f} MB) in {gen_s:.1f}s")
+
+        start = datetime(2026, 2, 1, tzinfo=timezone.utc)
+        end = start + timedelta(days=7)
+        query = dict(event="login_failed", username="user42", start=start, end=end)
+
+        expected, scan_s = timed(lambda: full_scan(log, query["event"], query["username"], start, end))
+        print(f"full scan:          {scan_s:8.2f}s  ({expected} matches)")
+
+        def build():
+            index = AuditIndex(log)
+            index.update()
+            index.save()
+            return index
+
+        index, build_s = timed(build)
+        print(f"index build (once): {build_s:8.2f}s  ({len(index.blocks)} blocks)")
+
+        for label in ("indexed query", "indexed query (2)"):
+            found, query_s = timed(lambda: sum(1 for _ in query_audit(log_file=log, **query)))
+            assert found == expected, (found, expected)
+            print(f"{label + ':':19} {query_s:8.3f}s  ({scan_s / query_s:,.0f}x vs full scan)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Benchmark suite for password_manager: logins/sec and strength-checks/sec on seeded
+datasets, with each case's peak RSS, saved as JSON for comparison across commits.
+
+Every case runs in a fresh process inside a scratch data directory, so peak RSS
+(ru_maxrss) belongs to that case alone.
+
+    python benchmarks/run_benchmarks.py --users 10000 --breach 100000
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<older>.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+TOOL_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = TOOL_DIR / "benchmarks" / "results"
+
+
+# -----------------------
+# Cases (run inside the child process, cwd = scratch dir)
+# -----------------------
+def _login_ops(opts):
+    """Login mix: 80% correct password, 15% wrong, 5% unknown user; known in advance from the seed."""
+    import random
+    from workload import password_for
+    rng = random.Random(opts["seed"])
+    ops = []
+    for _ in range(opts["logins"]):
+        i = rng.randrange(opts["users"])
+        roll = rng.random()
+        if roll < 0.8:
+            ops.append((f"user{i}", password_for(opts["seed"], i)))
+        elif roll < 0.95:
+            ops.append((f"user{i}", "wrong-password"))
+        else:
+            ops.append((f"ghost{i}", "whatever"))
+    return ops
+
+
+def _setup_storage(opts, backend_kind, hasher=None):
+    from password_manager import storage
+    from workload import make_users, make_attempts
+    users = make_users(opts["users"], opts["seed"], hasher)
+    attempts = make_attempts(users, opts["seed"])
+    if backend_kind == "sqlite":
+        backend = storage.SQLiteStorage(Path("data") / "bench.db")
+        for username, record in users.items():
+            backend.put_user(username, record)
+        backend.put_login_attempts(attempts)
+    else:
+        backend = storage.JsonStorage()
+        backend._write(backend.users_file, users)
+        backend._write(backend.attempts_file, attempts)
+    storage.set_backend(backend)
+    return backend
+
+
+def _stateless_login(username, password):
+    """core.login's storage traffic and checks, minus the prompts."""
+    from password_manager.core import is_locked_out, record_login_attempt
+    from password_manager.hashing import verify_password
+    from password_manager.storage import get_user, get_login_attempt
+    user = get_user(username)
+    if user is None or is_locked_out(get_login_attempt(username)):
+        return False
+    success = verify_password(user, password)
+    blocked, _ = record_login_attempt(username, success)
+    return success and not blocked
+
+
+def case_login_json(opts):
+    _setup_storage(opts, "json")
+    ops = _login_ops(opts)
+    start = time.perf_counter()
+    for username, password in ops:
+        _stateless_login(username, password)
+    return {"logins_per_sec": len(ops) / (time.perf_counter() - start)}
+
+
+def case_login_sqlite(opts):
+    _setup_storage(opts, "sqlite")
+    ops = _login_ops(opts)
+    start = time.perf_counter()
+    for username, password in ops:
+        _stateless_login(username, password)
+    return {"logins_per_sec": len(ops) / (time.perf_counter() - start)}
+
+
+def case_login_auth_service(opts):
+    from password_manager import hashing
+    from password_manager.service import AuthService
+    # measure the cache, not a one-off re-hash of every legacy record (login_scrypt covers KDF cost)
+    hashing.DEFAULT_HASHER = hashing.Sha256Hasher()
+    backend = _setup_storage(opts, "json")
+    ops = _login_ops(opts)
+    with AuthService(backend, flush_interval=0) as service:
+        start = time.perf_counter()
+        for username, password in ops:
+            service.authenticate(username, password)
+        elapsed = time.perf_counter() - start
+    return {"logins_per_sec": len(ops) / elapsed}
+
+
+def case_login_scrypt(opts):
+    """Same as login_sqlite but with users hashed by the default KDF (hash cost dominates)."""
+    from password_manager.hashing import DEFAULT_HASHER
+    count = max(1, opts["logins"] // 50)
+    _setup_storage({**opts, "users": min(opts["users"], count)}, "sqlite", DEFAULT_HASHER)
+    ops = _login_ops({**opts, "users": min(opts["users"], count), "logins": count})
+    start = time.perf_counter()
+    for username, password in ops:
+        _stateless_login(username, password)
+    return {"logins_per_sec": len(ops) / (time.perf_counter() - start)}
+
+
+def _strength_checks(common, opts):
+    from password_manager.core import check_password_strength
+    from workload import make_candidate_passwords
+    candidates = make_candidate_passwords(opts["checks"], opts["seed"])
+    start = time.perf_counter()
+    for password in candidates:
+        check_password_strength(password, common)
+    return {"checks_per_sec": len(candidates) / (time.perf_counter() - start)}
+
+
+def case_strength_matcher(opts):
+    from password_manager.utils import CommonPasswords
+    from workload import make_breach_list
+    start = time.perf_counter()
+    common = CommonPasswords(make_breach_list(opts["breach"], opts["seed"]))
+    result = _strength_checks(common, opts)
+    result["load_seconds"] = time.perf_counter() - start
+    return result
+
+
+def case_strength_index(opts):
+    from password_manager.password_index import build_common_password_index, CommonPasswordIndex
+    from workload import make_breach_list
+    source = Path("data") / "breach.txt"
+    source.write_text("\n".join(make_breach_list(opts["breach"], opts["seed"])) + "\n")
+    build_common_password_index(source, Path("data") / "breach.idx")
+    start = time.perf_counter()
+    index = CommonPasswordIndex(Path("data") / "breach.idx")
+    result = _strength_checks(index, opts)
+    result["load_seconds"] = time.perf_counter() - start
+    index.close()
+    return result
+
+
+CASES = {name[len("case_"):]: fn for name, fn in globals().items() if name.startswith("case_")}
+
+
+def _child(name, opts, workdir, queue):
+    os.chdir(workdir)
+    sys.path[:0] = [str(TOOL_DIR), str(TOOL_DIR / "benchmarks")]
+    try:
+        from password_manager import audit
+        audit.AUDIT_LOG_FILE = Path("data") / "audit.log.jsonl"
+        result = CASES[name](opts)
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+        raise
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mb"] = (rss_kb / 1024 / 1024 if sys.platform == "darwin" else rss_kb / 1024)
+    queue.put(result)
+
+
+def run_case(name, opts):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    with tempfile.TemporaryDirectory() as workdir:
+        (Path(workdir) / "data").mkdir()
+        proc = ctx.Process(target=_child, args=(name, opts, workdir, queue))
+        proc.start()
+        result = queue.get()
+        proc.join()
+    if "error" in result:
+        raise RuntimeError(f"benchmark case {name} failed: {result['error']}")
+    return {key: round(value, 3) for key, value in result.items()}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=TOOL_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous):
+    print(f"\nvs {previous.get('commit')} ({previous.get('timestamp')}):")
+    for name, result in current["results"].items():
+        old = previous["results"].get(name, {})
+        changes = [f"{key} {(value / old[key] - 1) * 100:+6.1f}%"
+                   for key, value in result.items() if old.get(key)]
+        print(f"  {name:22} " + "   ".join(changes))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="password_manager benchmark suite")
+    ap.add_argument("--users", type=int, default=10_000)
+    ap.add_argument("--logins", type=int, default=2_000)
+    ap.add_argument("--breach", type=int, default=100_000, help="Breach-list entries")
+    ap.add_argument("--checks", type=int, default=20_000, help="Strength checks per case")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--cases", default=",".join(CASES), help="Comma-separated subset of: " + ", ".join(CASES))
+    ap.add_argument("--output", type=Path, default=None, help="Results JSON (default: benchmarks/results/)")
+    ap.add_argument("--compare", type=Path, default=None, help="Earlier results JSON to diff against")
+    args = ap.parse_args()
+
+    opts = {"users": args.users, "logins": args.logins, "breach": args.breach, "checks": args.checks,
+            "seed": args.seed}
+    report = {"tool": "password-manager-tool", "commit": git_commit(),
+              "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+              "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+              "params": opts, "results": {}}
+    for name in args.cases.split(","):
+        result = run_case(name, opts)
+        report["results"][name] = result
+        print(f"{name:22} " + "  ".join(f"{key}={value:,}" for key, value in result.items()))
+
+    output = args.output or RESULTS_DIR / f"{report['timestamp'].replace(':', '')}-{report['commit'] or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved {output}")
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
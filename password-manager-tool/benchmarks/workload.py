@@ -0,0 +1,69 @@
+"""
+Seeded synthetic datasets for password_manager benchmarks: users (with known passwords),
+login-attempt records, and breach (common-password) lists.
+
+Same seed and sizes -> same data, so results from different commits are comparable.
+"""
+
+import random
+import string
+from datetime import datetime, timedelta, timezone
+
+
+def password_for(seed, i):
+    """The plaintext password of synthetic user i (for login benchmarks)."""
+    return f"Pw#{seed}-{i:07d}x"
+
+
+def make_users(count, seed=1, hasher=None, admin_rate=0.01):
+    """
+    {username: record} with salts and hashes for password_for(seed, i).
+    hasher=None produces legacy SHA-256 records (cheap to build); pass a hashing.* hasher
+    for scrypt/PBKDF2 records.
+    """
+    from password_manager.core import hash_password
+    from password_manager.hashing import make_password_hash
+
+    rng = random.Random(seed)
+    created = datetime(2026, 1, 1, tzinfo=timezone.utc).isoformat()
+    users = {}
+    for i in range(count):
+        salt = f"{rng.getrandbits(128):032x}"
+        record = {"role": "admin" if rng.random() < admin_rate else "user", "salt": salt, "created_at": created}
+        if hasher is None:
+            record["hash"] = hash_password(password_for(seed, i), salt)
+        else:
+            record.update(make_password_hash(password_for(seed, i), salt, hasher))
+        users[f"user{i}"] = record
+    return users
+
+
+def make_attempts(usernames, seed=1, failing_rate=0.1, locked_rate=0.02):
+    """Login-attempt records: some users with recent failures, a few currently locked out."""
+    from password_manager.core import MAX_FAILED_ATTEMPTS
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    attempts = {}
+    for username in usernames:
+        roll = rng.random()
+        if roll < locked_rate:
+            attempts[username] = {"failed": MAX_FAILED_ATTEMPTS, "last": now.isoformat()}
+        elif roll < failing_rate:
+            last = now - timedelta(minutes=rng.randrange(60))
+            attempts[username] = {"failed": rng.randrange(1, MAX_FAILED_ATTEMPTS), "last": last.isoformat()}
+    return attempts
+
+
+def make_breach_list(count, seed=1, min_len=4, max_len=10):
+    """Lowercase breach-list entries, like rockyou-style lists after normalization."""
+    rng = random.Random(seed)
+    alphabet = string.ascii_lowercase + string.digits
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(min_len, max_len))) for _ in range(count)]
+
+
+def make_candidate_passwords(count, seed=1):
+    """Passwords to strength-check: a mix of strong, weak and breach-like ones."""
+    rng = random.Random(seed + 1)
+    alphabet = string.ascii_letters + string.digits + "!#$%&*"
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(8, 16))) for _ in range(count)]
@@ -1,16 +1,26 @@
 # password_manager/main.py
 
-from password_manager.core import prompt_password, hash_password, generate_salt, load_common_passwords, login
-from password_manager.storage import save_user, load_users
-from password_manager.audit import log_audit
+import argparse
+import os
+from pathlib import Path
+from password_manager.core import prompt_password, generate_salt, login
+from password_manager.hashing import make_password_hash
+from password_manager.utils import load_common_password_checker
+from password_manager.storage import save_user, get_user
+from password_manager.audit import log_audit, start_async_audit, AUDIT_ASYNC_ENV
 from password_manager.admin import admin_menu
+from password_manager.metrics import enable_metrics, enable_metrics_from_env, run_profiled
 
 # -----------------------
 # Main interactive menu
 # -----------------------
 def main():
-    # Load common passwords for strength checking
-    common_passwords = load_common_passwords()
+    # Optionally move audit writes off the login path (drained on exit)
+    if os.environ.get(AUDIT_ASYNC_ENV) == "1":
+        start_async_audit()
+
+    # Load common passwords for strength checking (compiled index if one was built)
+    common_passwords = load_common_password_checker()
 
     while True:
         print("\n=== Password Manager ===")
@@ -30,15 +40,14 @@ def main():
                 continue
 
             # Check if username already exists
-            existing_users = load_users()
-            if username in existing_users:
+            if get_user(username) is not None:
                 print(f"Username '{username}' already exists. Choose a different username.")
                 continue
 
             pwd = prompt_password(common_passwords)
             salt = generate_salt()
-            hashed = hash_password(pwd, salt)
-            save_user(username, role, salt, hashed)
+            hashed = make_password_hash(pwd, salt)
+            save_user(username, role, salt, hashed["hash"], hashed["kdf"], hashed["kdf_params"])
             print(f"User '{username}' created successfully.")
 
         # -----------------------
@@ -70,4 +79,19 @@ def main():
 # Entry point
 # -----------------------
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Password manager")
+    parser.add_argument("--stats", action="store_true", help="Print storage/hashing/audit timings on exit")
+    parser.add_argument("--stats-file", type=Path, default=None,
+                        help="Also dump metrics on exit (.json -> JSON, otherwise Prometheus text)")
+    parser.add_argument("--profile", type=Path, nargs="?", const=Path("data/profile.pstats"), default=None,
+                        help="Run under cProfile and save the stats (default data/profile.pstats)")
+    args = parser.parse_args()
+
+    if args.stats or args.stats_file:
+        enable_metrics(stats=args.stats, stats_file=args.stats_file)
+    else:
+        enable_metrics_from_env()
+    if args.profile:
+        run_profiled(main, args.profile)
+    else:
+        main()
@@ -1,6 +1,6 @@
 # password_manager/admin.py
 
-from password_manager.storage import load_login_attempts, save_login_attempts, load_users
+from password_manager.storage import update_login_attempt, get_user
 from password_manager.audit import log_audit
 from datetime import datetime, timezone
 
@@ -12,20 +12,17 @@ def unlock_account(admin_username, target_username):
     Unlock a user account. Only admin users should call this.
     Returns True if successful, False otherwise.
     """
-    users = load_users()
-    if admin_username not in users or users[admin_username]["role"] != "admin":
+    admin = get_user(admin_username)
+    if admin is None or admin["role"] != "admin":
         return False  # non-admin cannot unlock
 
-    attempts = load_login_attempts()
+    # Reset failed attempts and last attempt atomically; if no record, nothing to unlock
+    def reset(record):
+        return None if record is None else {"failed": 0, "last": None}
 
-    if target_username not in attempts:
-        # If no record, nothing to unlock
+    if update_login_attempt(target_username, reset) is None:
         return False
 
-    # Reset failed attempts and last attempt
-    attempts[target_username] = {"failed": 0, "last": None}
-    save_login_attempts(attempts)
-
     # Log audit event
     log_audit(
         event="account_unlocked",
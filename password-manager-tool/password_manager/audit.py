@@ -1,27 +1,570 @@
 # password_manager/audit.py
 
+import atexit
+import gzip
 import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
+from .metrics import METRICS, timed
+
+try:
+    import zstandard  # optional: smaller, faster segments than gzip
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl  # POSIX advisory locks; without it rotation is not coordinated across processes
+except ImportError:
+    fcntl = None
 
 # -----------------------
 # Log file path
 # -----------------------
 AUDIT_LOG_FILE = Path("./data/audit.log.jsonl")
 
+# Rotate the active log into a compressed segment once it reaches this size / age
+# (None disables that trigger)
+ROTATE_MAX_BYTES = 10 * 1024 * 1024
+ROTATE_MAX_AGE_SECONDS = None
 
-def log_audit(event, username=None, role=None, details=None):
-    """
-    Append an audit event to a JSONL log file.
-    Each line is a separate JSON object.
-    """
-    AUDIT_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    record = {
+# Set to "1" to route log_audit through a background AuditWriter (see main.py)
+AUDIT_ASYNC_ENV = "PASSWORD_MANAGER_AUDIT_ASYNC"
+
+
+def _make_record(event, username, role, details):
+    return {
         "timestamp": datetime.now(timezone.utc).isoformat() + "Z",
         "event": event,
         "username": username,
         "role": role,
         "details": details,
     }
-    with AUDIT_LOG_FILE.open("a") as f:
+
+
+def parse_audit_timestamp(value):
+    """Parse a record timestamp ("...+00:00Z") or a query bound (datetime or ISO string) to an aware datetime."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    dt = datetime.fromisoformat(value.removesuffix("Z"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+# -----------------------
+# Rotation and segments
+# -----------------------
+# Rotated segments sit next to the active log: audit.log.000001.jsonl.gz (or .zst), each with
+# a sidecar audit.log.000001.jsonl.gz.idx.json holding its time range and event counts.
+SEGMENT_SUFFIXES = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+_active_started = {}  # log path -> (inode, first record time), for age-based rotation
+
+
+def _log_stem(log_file):
+    return log_file.name.removesuffix(".jsonl")
+
+
+def rotating_path(log_file):
+    """Where rotation moves the active log while it is compressed (audit.log.jsonl.rotating)."""
+    return log_file.with_name(log_file.name + ".rotating")
+
+
+_shared_locks = {}  # lock file path -> [pid, open lock file, holders in this process]
+_shared_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _log_lock(log_file, exclusive=False):
+    """
+    Advisory lock on "<log>.lock" (across processes). Appends hold it shared, rotation
+    holds it exclusively, so no record is appended to a file while it is being rotated.
+    The shared lock's file stays open for the life of the process (reopened after a fork)
+    and is flocked once by the first of this process's holders and released by the last,
+    so an append costs no open/close of the lock file.
+    """
+    if fcntl is None:
+        yield
+        return
+    path = log_file.with_name(log_file.name + ".lock")
+    if exclusive:
+        with open(path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return
+
+    with _shared_locks_guard:
+        entry = _shared_locks.get(path)
+        if entry is None or entry[0] != os.getpid():
+            # a forked child must not share (and so unlock) its parent's open file
+            entry = _shared_locks[path] = [os.getpid(), open(path, "a"), 0]
+        if not entry[2]:
+            fcntl.flock(entry[1], fcntl.LOCK_SH)
+        entry[2] += 1
+    try:
+        yield
+    finally:
+        with _shared_locks_guard:
+            entry[2] -= 1
+            if not entry[2]:
+                fcntl.flock(entry[1], fcntl.LOCK_UN)
+
+
+def _is_current(f, log_file):
+    """True if the open file f is still the file at log_file (not rotated away)."""
+    try:
+        return os.fstat(f.fileno()).st_ino == log_file.stat().st_ino
+    except FileNotFoundError:
+        return False
+
+
+def list_segments(log_file=None):
+    """Rotated segment paths for a log, oldest first."""
+    log_file = Path(log_file or AUDIT_LOG_FILE)
+    prefix = _log_stem(log_file) + "."
+    segments = [p for p in log_file.parent.glob(prefix + "*")
+                if any(p.name.endswith(suffix) for suffix in SEGMENT_SUFFIXES.values())
+                and p.name[len(prefix):].split(".")[0].isdigit()]
+    return sorted(segments)
+
+
+def open_segment(path, mode="rt"):
+    """Open a rotated segment, decompressing gzip or zstd by its suffix."""
+    encoding = "utf-8" if "t" in mode else None
+    if path.name.endswith(SEGMENT_SUFFIXES["zstd"]):
+        if zstandard is None:
+            raise RuntimeError(f"{path.name} is zstd-compressed; install zstandard to read it")
+        return zstandard.open(path, mode, encoding=encoding)
+    return gzip.open(path, mode, encoding=encoding)
+
+
+def _compress(source, target, compression):
+    with source.open("rb") as src:
+        if compression == "zstd":
+            with zstandard.open(target, "wb") as dst:
+                while chunk := src.read(1 << 20):
+                    dst.write(chunk)
+        else:
+            with gzip.open(target, "wb") as dst:
+                while chunk := src.read(1 << 20):
+                    dst.write(chunk)
+
+
+def _summarize(lines):
+    """
+    Sidecar index fields (time range, per-event counts, users and roles) for an iterable of JSONL lines.
+    The range is the min/max timestamp, not the first/last line: writers in several processes
+    can append slightly out of order.
+    """
+    first = last = None
+    counts = Counter()
+    usernames = set()
+    roles = set()
+    for line in lines:
+        try:
+            record = json.loads(line)
+            ts = record["timestamp"]
+        except (ValueError, KeyError, TypeError):
+            continue  # blank or foreign lines are kept in the segment but not indexed
+        if isinstance(ts, str):
+            # log_audit writes UTC ISO timestamps, which sort correctly as strings
+            first = ts if first is None else min(first, ts)
+            last = ts if last is None else max(last, ts)
+        counts[record.get("event")] += 1
+        usernames.add(record.get("username"))
+        roles.add(record.get("role"))
+    return {
+        "first_timestamp": first,
+        "last_timestamp": last,
+        "events": sum(counts.values()),
+        "event_counts": {str(k): v for k, v in counts.items()},
+        "usernames": sorted(u for u in usernames if isinstance(u, str)),
+        "roles": sorted(r for r in roles if isinstance(r, str)),
+    }
+
+
+def load_segment_index(segment):
+    """Read a segment's sidecar index (rebuilt from the segment itself if it is missing)."""
+    sidecar = Path(str(segment) + ".idx.json")
+    try:
+        with sidecar.open("r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        with open_segment(segment) as f:
+            return _summarize(f)
+
+
+@timed("audit_rotate")
+def rotate_audit_log(log_file=None, compression=None, if_due=False):
+    """
+    Move the active log into the next compressed segment and write its sidecar index.
+    The active file is renamed first (atomic), so writers simply start a new file; a
+    rotation interrupted by a crash is finished by the next call. Returns the segment path,
+    or None if there was nothing to rotate.
+    The rename and compression run under the exclusive log lock, so concurrent rotations
+    (from several processes) take turns, and writers in other processes, which append
+    under the shared lock and reopen the log once it is renamed, never write into a file
+    being compressed. With if_due the log is only rotated if should_rotate still holds
+    once the lock is taken (another process may have just rotated it).
+    """
+    log_file = Path(log_file or AUDIT_LOG_FILE)
+    compression = compression or ("zstd" if zstandard is not None else "gzip")
+    if compression not in SEGMENT_SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression}")
+    if compression == "zstd" and zstandard is None:
+        raise RuntimeError("zstd compression requires the zstandard package")
+    if not log_file.parent.exists():
+        return None
+    with _log_lock(log_file, exclusive=True):
+        return _rotate_locked(log_file, compression, if_due)
+
+
+def _rotate_locked(log_file, compression, if_due):
+    pending = rotating_path(log_file)
+    if not pending.exists():
+        if if_due and not should_rotate(log_file):
+            return None
+        try:
+            if log_file.stat().st_size == 0:
+                return None
+            log_file.rename(pending)
+        except FileNotFoundError:
+            return None  # nothing logged yet, or another process rotated it first
+    _active_started.pop(log_file, None)
+
+    existing = list_segments(log_file)
+    seq = int(existing[-1].name[len(_log_stem(log_file)) + 1:].split(".")[0]) + 1 if existing else 1
+    segment = log_file.with_name(f"{_log_stem(log_file)}.{seq:06d}{SEGMENT_SUFFIXES[compression]}")
+
+    with pending.open("r") as f:
+        index = _summarize(f)
+    index["bytes"] = pending.stat().st_size
+    index["segment"] = segment.name
+    index["compression"] = compression
+
+    tmp = segment.with_name(segment.name + ".tmp")
+    _compress(pending, tmp, compression)
+    tmp.replace(segment)
+    sidecar = Path(str(segment) + ".idx.json")
+    sidecar_tmp = sidecar.with_name(sidecar.name + ".tmp")
+    with sidecar_tmp.open("w") as f:
+        json.dump(index, f, indent=4)
+    sidecar_tmp.replace(sidecar)
+    pending.unlink()
+    return segment
+
+
+def _first_record_time(log_file, inode):
+    cached = _active_started.get(log_file)
+    if cached and cached[0] == inode:
+        return cached[1]
+    started = None
+    with log_file.open("r") as f:
+        for line in f:
+            try:
+                started = parse_audit_timestamp(json.loads(line)["timestamp"])
+                break
+            except (ValueError, KeyError, TypeError):
+                continue
+    if started is not None:
+        _active_started[log_file] = (inode, started)
+    return started
+
+
+def should_rotate(log_file=None, size=None):
+    """
+    True if the active log has passed ROTATE_MAX_BYTES or ROTATE_MAX_AGE_SECONDS. size is the
+    writer's file position after its append; given it, the file is only stat'ed for the age check.
+    """
+    log_file = Path(log_file or AUDIT_LOG_FILE)
+    if ROTATE_MAX_BYTES is None and ROTATE_MAX_AGE_SECONDS is None:
+        return False
+    if size is None or ROTATE_MAX_AGE_SECONDS is not None:  # a writer's tell() is enough for the size check
+        try:
+            st = log_file.stat()
+        except FileNotFoundError:
+            return False
+        size = st.st_size if size is None else size
+    if ROTATE_MAX_BYTES is not None and size >= ROTATE_MAX_BYTES:
+        return True
+    if ROTATE_MAX_AGE_SECONDS is not None and size:
+        started = _first_record_time(log_file, st.st_ino)
+        if started and (datetime.now(timezone.utc) - started).total_seconds() >= ROTATE_MAX_AGE_SECONDS:
+            return True
+    return False
+
+
+def iter_audit_records(start=None, end=None, log_file=None):
+    """
+    Yield audit records with start <= timestamp <= end, oldest first, across rotated
+    segments and the active log. Segments whose sidecar range misses the window are
+    skipped without being decompressed.
+    """
+    log_file = Path(log_file or AUDIT_LOG_FILE)
+    start = parse_audit_timestamp(start) if start is not None else None
+    end = parse_audit_timestamp(end) if end is not None else None
+
+    sources = []
+    for segment in list_segments(log_file):
+        index = load_segment_index(segment)
+        if index["first_timestamp"] is None:
+            continue
+        if start and parse_audit_timestamp(index["last_timestamp"]) < start:
+            continue
+        if end and parse_audit_timestamp(index["first_timestamp"]) > end:
+            continue
+        sources.append((open_segment, segment))
+    for plain in (rotating_path(log_file), log_file):
+        if plain.exists():
+            sources.append((lambda p: p.open("r"), plain))
+
+    for opener, path in sources:
+        with opener(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    ts = parse_audit_timestamp(record["timestamp"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if start and ts < start:
+                    continue
+                if end and ts > end:
+                    continue
+                yield record
+
+
+# -----------------------
+# Background writer
+# -----------------------
+_FLUSH = object()  # queue marker: write the current batch now
+_STOP = None  # queue marker: write the current batch and exit
+
+
+class AuditWriter:
+    """
+    Writes audit records from a bounded queue on a dedicated thread, in batches.
+
+    Ordering: one queue and one writer thread, so records reach the file in the order
+    submit() accepted them (per thread this is call order).
+    Durability: a batch is written and flushed to the OS once batch_size records are
+    queued or flush_interval seconds after its first record, whichever comes first.
+    flush() blocks until everything submitted before it is written; close() drains the
+    queue and stops the thread. With fsync=True each batch is also fsync'd. Records
+    still queued when the process is killed (not a normal exit) are lost.
+
+    Back-pressure when the queue is full: policy "block" waits for space (no loss),
+    policy "drop" discards the record and counts it in .dropped.
+    Rotation: batches are appended under the shared log lock and the file is reopened
+    when the log has been rotated, by this writer or by another process.
+    Errors never stop the writer thread: a record that cannot be serialized, or a batch
+    whose write fails, is counted in .dropped and the error kept in .last_error.
+    """
+
+    def __init__(self, path=None, max_queue=10000, batch_size=256, flush_interval=0.5,
+                 policy="block", fsync=False):
+        if policy not in ("block", "drop"):
+            raise ValueError(f"Unknown back-pressure policy: {policy}")
+        self.path = Path(path or AUDIT_LOG_FILE)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.fsync = fsync
+        self.dropped = 0
+        self.last_error = None
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._submitted = 0
+        self._handled = 0  # records written or dropped by the writer thread
+        self._progress = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        """Queue one record. Returns False if it was dropped."""
+        if self._closed:
+            raise RuntimeError("AuditWriter is closed")
+        try:
+            self._queue.put(record, block=self.policy == "block")
+        except queue.Full:
+            with self._progress:
+                self.dropped += 1
+            return False
+        with self._progress:
+            # counted once queued, so flush() never waits for a record that was dropped
+            self._submitted += 1
+        return True
+
+    def flush(self, timeout=None):
+        """Wait until every record submitted so far is written. Returns False on timeout."""
+        with self._progress:
+            target = self._submitted
+        self._queue.put(_FLUSH)
+        with self._progress:
+            return self._progress.wait_for(lambda: self._handled >= target, timeout)
+
+    def close(self, timeout=None):
+        """Write everything still queued and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _next_batch(self):
+        """Block for the first record, then gather more until the batch is full or the interval ends."""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        if first is _FLUSH:
+            return [], False
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                record = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is _STOP:
+                return batch, True
+            if record is _FLUSH:
+                break
+            batch.append(record)
+        return batch, False
+
+    def _encode(self, batch):
+        """JSON lines for a batch; records json.dumps rejects are dropped."""
+        lines = []
+        for record in batch:
+            try:
+                lines.append(json.dumps(record) + "\n")
+            except (TypeError, ValueError) as e:
+                self.last_error = e
+                with self._progress:
+                    self.dropped += 1
+        return "".join(lines)
+
+    @timed("audit_batch_write")
+    def _write_batch(self, f, batch):
+        METRICS.incr("audit_batched_records", len(batch))
+        f.write(self._encode(batch))
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+    def _run(self):
+        f = None
+        try:
+            done = False
+            while not done:
+                batch, done = self._next_batch()
+                if not batch:
+                    continue
+                try:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    with _log_lock(self.path):
+                        if f is not None and not _is_current(f, self.path):
+                            f = self._close_quietly(f)  # rotated (possibly by another process)
+                        if f is None:
+                            f = self.path.open("a")
+                        self._write_batch(f, batch)
+                except Exception as e:
+                    self.last_error = e
+                    with self._progress:
+                        self.dropped += len(batch)
+                    f = self._close_quietly(f)  # reopened for the next batch
+                else:
+                    try:
+                        if should_rotate(self.path, f.tell()):
+                            f = self._close_quietly(f)
+                            rotate_audit_log(self.path, if_due=True)
+                    except Exception as e:
+                        self.last_error = e  # the batch itself was written
+                        f = self._close_quietly(f)
+                with self._progress:
+                    self._handled += len(batch)
+                    self._progress.notify_all()
+        finally:
+            self._close_quietly(f)
+
+    @staticmethod
+    def _close_quietly(f):
+        if f is not None:
+            try:
+                f.close()
+            except OSError:
+                pass
+        return None
+
+
+_writer = None
+
+
+def start_async_audit(**kwargs):
+    """Route log_audit through a background AuditWriter (kwargs as for AuditWriter)."""
+    global _writer
+    if _writer is None:
+        _writer = AuditWriter(**kwargs)
+        atexit.register(stop_async_audit)
+    return _writer
+
+
+def stop_async_audit():
+    """Drain and stop the background writer; log_audit goes back to synchronous writes."""
+    global _writer
+    writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+
+def flush_audit(timeout=None):
+    """Block until queued audit events are written (no-op in synchronous mode)."""
+    return _writer.flush(timeout) if _writer is not None else True
+
+
+@timed("audit_write")
+def log_audit(event, username=None, role=None, details=None):
+    """
+    Append an audit event to a JSONL log file.
+    Each line is a separate JSON object.
+    Written immediately unless start_async_audit() is active, in which case it is queued.
+    """
+    record = _make_record(event, username, role, details)
+    if _writer is not None:
+        _writer.submit(record)
+        return
+    AUDIT_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with _log_lock(AUDIT_LOG_FILE), AUDIT_LOG_FILE.open("a") as f:
         f.write(json.dumps(record) + "\n")
+        size = f.tell()
+    if should_rotate(AUDIT_LOG_FILE, size):
+        rotate_audit_log(AUDIT_LOG_FILE, if_due=True)
+
+
+@timed("audit_write")
+def log_audit_batch(events):
+    """
+    Append several audit events, given as (event, username, role, details) tuples, with a
+    single open and write. The records are the same as calling log_audit for each event.
+    """
+    records = [_make_record(*event) for event in events]
+    if not records:
+        return
+    if _writer is not None:
+        for record in records:
+            _writer.submit(record)
+        return
+    METRICS.incr("audit_batched_records", len(records))
+    AUDIT_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with _log_lock(AUDIT_LOG_FILE), AUDIT_LOG_FILE.open("a") as f:
+        f.write("".join(json.dumps(record) + "\n" for record in records))
+        size = f.tell()
+    if should_rotate(AUDIT_LOG_FILE, size):
+        rotate_audit_log(AUDIT_LOG_FILE, if_due=True)
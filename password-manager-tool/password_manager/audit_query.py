@@ -0,0 +1,294 @@
+# password_manager/audit_query.py
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from . import audit
+from .audit import parse_audit_timestamp, list_segments, load_segment_index, open_segment, rotating_path
+
+# -----------------------
+# Index layout
+# -----------------------
+# The active log is cut into blocks of BLOCK_RECORDS lines. Each block records its byte
+# range and time range, and every event / username / role value maps to a bitmap (an int,
+# bit i = block i) of the blocks that contain it. A query ANDs the bitmaps, drops blocks
+# outside the time range, then seeks to each remaining block and parses only the lines
+# that contain the requested values. Rotated segments are skipped via their sidecars.
+BLOCK_RECORDS = 4096
+INDEX_VERSION = 1
+FIELDS = ("event", "username", "role")
+
+_decode = json.JSONDecoder().decode  # skips json.loads' per-call bytes/encoding checks
+
+
+def index_path(log_file):
+    return log_file.with_name(log_file.name + ".qidx")
+
+
+class AuditIndex:
+    """Incrementally maintained block index over the active audit log."""
+
+    def __init__(self, log_file=None):
+        self.log_file = Path(log_file or audit.AUDIT_LOG_FILE)
+        self._reset()
+
+    def _reset(self):
+        self.identity = None     # (st_dev, st_ino) of the indexed file; changes on rotation
+        self.blocks = []         # [start offset, end offset, first timestamp, last timestamp, lines]
+        self.postings = {field: {} for field in FIELDS}
+
+    @property
+    def indexed_offset(self):
+        return self.blocks[-1][1] if self.blocks else 0
+
+    # -----------------------
+    # Persistence
+    # -----------------------
+    @classmethod
+    def load(cls, log_file=None):
+        index = cls(log_file)
+        try:
+            with index_path(index.log_file).open("r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if data.get("version") != INDEX_VERSION:
+            return index
+        index.identity = tuple(data["identity"]) if data["identity"] else None
+        index.blocks = data["blocks"]
+        index.postings = {field: {value: int(bits, 16) for value, bits in data["postings"][field].items()}
+                          for field in FIELDS}
+        return index
+
+    def save(self):
+        path = index_path(self.log_file)
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("w") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "identity": self.identity,
+                "blocks": self.blocks,
+                "postings": {field: {value: format(bits, "x") for value, bits in values.items()}
+                             for field, values in self.postings.items()},
+            }, f)
+        tmp.replace(path)
+
+    # -----------------------
+    # Incremental update
+    # -----------------------
+    def _drop_last_block(self):
+        bit = len(self.blocks) - 1
+        self.blocks.pop()
+        for values in self.postings.values():
+            for value in list(values):
+                values[value] &= ~(1 << bit)
+                if not values[value]:
+                    del values[value]
+
+    def _close_block(self, block, stamps, *values_by_field):
+        stamps = [ts for ts in stamps if isinstance(ts, str)]
+        if stamps:
+            # log_audit writes UTC ISO timestamps, which sort correctly as strings
+            block[2], block[3] = min(stamps), max(stamps)
+        bit = 1 << (len(self.blocks) - 1)
+        for field, values in zip(FIELDS, values_by_field):
+            postings = self.postings[field]
+            for value in values:
+                if isinstance(value, str):
+                    postings[value] = postings.get(value, 0) | bit
+
+    def update(self):
+        """Index lines appended since the last update. Returns the number of lines read."""
+        try:
+            st = self.log_file.stat()
+        except FileNotFoundError:
+            self._reset()
+            return 0
+        identity = (st.st_dev, st.st_ino)
+        if identity != self.identity or st.st_size < self.indexed_offset:
+            self._reset()  # rotated or truncated: start over on the new file
+            self.identity = identity
+        if st.st_size == self.indexed_offset:
+            return 0
+        if self.blocks and self.blocks[-1][4] < BLOCK_RECORDS:
+            self._drop_last_block()  # re-read the partial block so it can fill up
+
+        lines_read = 0
+        with self.log_file.open("rb") as f:
+            f.seek(self.indexed_offset)
+            block = None
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a write in progress; picked up next time
+                if block is not None and block[4] == BLOCK_RECORDS:
+                    self._close_block(block, stamps, events, usernames, roles)
+                    block = None
+                if block is None:
+                    block = [self.indexed_offset, self.indexed_offset, None, None, 0]
+                    self.blocks.append(block)
+                    events, usernames, roles, stamps = set(), set(), set(), []
+                block[1] += len(line)
+                block[4] += 1
+                lines_read += 1
+                try:
+                    record = _decode(line.decode("utf-8"))
+                    stamps.append(record["timestamp"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                events.add(record.get("event"))
+                usernames.add(record.get("username"))
+                roles.add(record.get("role"))
+            if block is not None:
+                self._close_block(block, stamps, events, usernames, roles)
+        return lines_read
+
+    # -----------------------
+    # Lookup
+    # -----------------------
+    def candidate_blocks(self, start=None, end=None, **filters):
+        """Blocks (start, end offsets) that may hold records matching the filters, in file order."""
+        bits = (1 << len(self.blocks)) - 1
+        for field, value in filters.items():
+            if value is not None:
+                bits &= self.postings[field].get(value, 0)
+        candidates = []
+        while bits:
+            low = bits & -bits
+            i = low.bit_length() - 1
+            bits ^= low
+            block_start, block_end, first, last, _ = self.blocks[i]
+            if first is None:
+                continue
+            if start and parse_audit_timestamp(last) < start:
+                continue
+            if end and parse_audit_timestamp(first) > end:
+                continue
+            candidates.append((block_start, block_end))
+        return candidates
+
+
+# -----------------------
+# Queries
+# -----------------------
+def _line_filter(start, end, filters):
+    """Return a function bytes line -> record or None; cheap substring checks run before decoding."""
+    needles = [json.dumps(value).encode() for value in filters.values() if value is not None]
+
+    def match(line):
+        for needle in needles:
+            if needle not in line:
+                return None
+        try:
+            record = _decode(line.decode("utf-8"))
+            ts = parse_audit_timestamp(record["timestamp"])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+        for field, value in filters.items():
+            if value is not None and record.get(field) != value:
+                return None
+        if start and ts < start:
+            return None
+        if end and ts > end:
+            return None
+        return record
+
+    return match
+
+
+def _segment_may_match(index, start, end, filters):
+    if index["first_timestamp"] is None:
+        return False
+    if start and parse_audit_timestamp(index["last_timestamp"]) < start:
+        return False
+    if end and parse_audit_timestamp(index["first_timestamp"]) > end:
+        return False
+    if filters["event"] is not None and filters["event"] not in index["event_counts"]:
+        return False
+    # sidecars written before usernames/roles were recorded can't rule anything out
+    for field, key in (("username", "usernames"), ("role", "roles")):
+        if filters[field] is not None and key in index and filters[field] not in index[key]:
+            return False
+    return True
+
+
+def query_audit(start=None, end=None, event=None, username=None, role=None, log_file=None, update_index=True):
+    """
+    Yield audit records matching every given filter, oldest first, across rotated segments
+    and the active log. start/end are datetimes or ISO strings (inclusive). The active log's
+    index is brought up to date (and saved) first unless update_index is False.
+    """
+    log_file = Path(log_file or audit.AUDIT_LOG_FILE)
+    start = parse_audit_timestamp(start) if start is not None else None
+    end = parse_audit_timestamp(end) if end is not None else None
+    filters = {"event": event, "username": username, "role": role}
+    match = _line_filter(start, end, filters)
+
+    for segment in list_segments(log_file):
+        if not _segment_may_match(load_segment_index(segment), start, end, filters):
+            continue
+        with open_segment(segment, "rb") as f:
+            for line in f:
+                record = match(line)
+                if record is not None:
+                    yield record
+
+    pending = rotating_path(log_file)
+    if pending.exists():
+        with pending.open("rb") as f:
+            for line in f:
+                record = match(line)
+                if record is not None:
+                    yield record
+
+    index = AuditIndex.load(log_file)
+    if update_index and index.update():
+        index.save()
+    if not log_file.exists():
+        return
+    with log_file.open("rb") as f:
+        st = os.fstat(f.fileno())
+        if index.identity != (st.st_dev, st.st_ino):
+            blocks = [(0, None)]  # file rotated under a stale index: scan it all
+        else:
+            # plus anything appended since the index was updated
+            blocks = index.candidate_blocks(start, end, **filters) + [(index.indexed_offset, None)]
+        for block_start, block_end in blocks:
+            f.seek(block_start)
+            data = f.read() if block_end is None else f.read(block_end - block_start)
+            for line in data.splitlines():
+                record = match(line)
+                if record is not None:
+                    yield record
+
+
+# -----------------------
+# CLI: python -m password_manager.audit_query --event login_failed --username alice --since 2026-01-01
+# -----------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the audit log (rotated segments + active file)")
+    parser.add_argument("--since", help="ISO timestamp, inclusive (UTC if no offset)")
+    parser.add_argument("--until", help="ISO timestamp, inclusive (UTC if no offset)")
+    parser.add_argument("--event", help="e.g. login_failed")
+    parser.add_argument("--username")
+    parser.add_argument("--role")
+    parser.add_argument("--log", type=Path, default=None, help="Active audit log (default: data/audit.log.jsonl)")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many records")
+    parser.add_argument("--count", action="store_true", help="Print only the number of matches")
+    args = parser.parse_args(argv)
+
+    records = query_audit(args.since, args.until, args.event, args.username, args.role, args.log)
+    count = 0
+    for record in records:
+        count += 1
+        if not args.count:
+            sys.stdout.write(json.dumps(record) + "\n")
+        if args.limit is not None and count >= args.limit:
+            break
+    if args.count:
+        print(count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# password_manager/bulk.py
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .core import check_password_strength
+from .hashing import DEFAULT_HASHER, make_password_hash
+from .storage import add_users, get_user, load_users, make_user_record, update_login_attempt_batch
+from .audit import log_audit_batch
+from .utils import generate_salt, load_common_password_checker
+from .metrics import enable_metrics_from_env, timed
+
+# -----------------------
+# Constants
+# -----------------------
+ROLES = {"user", "admin"}
+
+
+# -----------------------
+# Validation
+# -----------------------
+def _entry_fields(entry):
+    """(username, role, password) from a mapping or a 3-tuple; ValueError/TypeError for anything else."""
+    if isinstance(entry, dict):
+        return entry.get("username"), entry.get("role"), entry.get("password")
+    username, role, password = entry
+    return username, role, password
+
+
+def _reject(rejected, username, position, reason):
+    """
+    Record a rejected entry under its username, or under "#<position>" (1-based place in the
+    input) when the username is not a usable key or already holds another entry's reason.
+    """
+    key = username if isinstance(username, str) and username and username not in rejected else f"#{position}"
+    rejected[key] = reason
+
+
+def _validate(users, common_passwords, existing):
+    """validate_new_users, with each accepted entry's position kept for later rejections."""
+    accepted, rejected, seen = [], {}, set()
+    for position, entry in enumerate(users, 1):
+        try:
+            username, role, password = _entry_fields(entry)
+        except (TypeError, ValueError):
+            _reject(rejected, None, position, "malformed entry")
+            continue
+        if not isinstance(username, str) or not username or username != username.strip():
+            reason = "invalid username"
+        elif username in seen:
+            reason = "duplicate username in batch"
+        elif username in existing:
+            reason = "already exists"
+        elif role not in ROLES:
+            reason = f"invalid role {role!r}"
+        elif not isinstance(password, str):
+            reason = "missing password"
+        else:
+            strong, rules = check_password_strength(password, common_passwords)
+            if strong:
+                accepted.append((position, username, role, password))
+                seen.add(username)  # only accepted entries make later ones duplicates
+                continue
+            reason = "weak password: " + ", ".join(rule for rule, ok in rules.items() if not ok)
+        _reject(rejected, username, position, reason)
+    return accepted, rejected
+
+
+def validate_new_users(users, common_passwords, existing=()):
+    """
+    Check every entry before anything is hashed or written.
+    Returns ([(username, role, password), ...] accepted, {key: reason} rejected). Rejections
+    are keyed by username; an entry whose username is invalid or already used as a key
+    (e.g. a second rejected "alice") is keyed by its 1-based position, "#3", so none is lost.
+    """
+    accepted, rejected = _validate(users, common_passwords, existing)
+    return [(username, role, password) for _, username, role, password in accepted], rejected
+
+
+# -----------------------
+# Parallel hashing
+# -----------------------
+def _hash_job(job):
+    password, salt, hasher = job
+    return make_password_hash(password, salt, hasher)
+
+
+def hash_passwords(passwords, hasher=None, workers=None):
+    """
+    Hash passwords with fresh salts; returns [(salt, make_password_hash fields), ...] in order.
+    With more than one worker the hashes are computed in a process pool (one KDF call per job,
+    sent in chunks so the pool overhead stays small next to the hashing).
+    """
+    hasher = hasher or DEFAULT_HASHER
+    workers = workers or os.cpu_count() or 1
+    salts = [generate_salt() for _ in passwords]
+    jobs = [(password, salt, hasher) for password, salt in zip(passwords, salts)]
+    if workers == 1 or len(jobs) < 2:
+        hashed = [_hash_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hashed = list(pool.map(_hash_job, jobs, chunksize=max(1, len(jobs) // (workers * 8))))
+    return list(zip(salts, hashed))
+
+
+# -----------------------
+# Bulk provisioning
+# -----------------------
+@timed("bulk_create_users")
+def bulk_create_users(users, common_passwords=None, hasher=None, workers=None):
+    """
+    Create many users at once. users yields {"username", "role", "password"} mappings or
+    (username, role, password) tuples. All entries are validated first, passwords are hashed
+    across a process pool, every new record is stored in one write (JSON) or transaction
+    (SQLite) and the user_created audit events are appended as one batch.
+    Returns (created usernames, {username or "#position": reason} for rejected entries; see
+    validate_new_users).
+    """
+    if common_passwords is None:
+        common_passwords = load_common_password_checker()
+    accepted, rejected = _validate(users, common_passwords, existing=load_users())
+    if not accepted:
+        return [], rejected
+
+    hashed = hash_passwords([password for _, _, _, password in accepted], hasher, workers)
+    records = {username: make_user_record(role, salt, fields["hash"], fields["kdf"], fields["kdf_params"])
+               for (_, username, role, _), (salt, fields) in zip(accepted, hashed)}
+
+    # Created by another process since validation: not overwritten
+    positions = {username: position for position, username, _, _ in accepted}
+    for username in add_users(records):
+        del records[username]
+        _reject(rejected, username, positions[username], "already exists")
+    log_audit_batch(("user_created", username, record["role"], None) for username, record in records.items())
+    return list(records), rejected
+
+
+@timed("bulk_unlock")
+def bulk_unlock(admin_username, usernames):
+    """
+    unlock_account for many users: the admin is checked once, the users' attempt records are
+    reset in one locked write or transaction and the account_unlocked events are appended as
+    one batch. Users without a record are skipped. Returns the unlocked usernames ([] if
+    admin_username is not an admin).
+    """
+    admin = get_user(admin_username)
+    if admin is None or admin["role"] != "admin":
+        return []
+
+    def reset(username, record):
+        return None if record is None else {"failed": 0, "last": None}
+
+    unlocked = list(update_login_attempt_batch(list(dict.fromkeys(usernames)), reset))
+    log_audit_batch(("account_unlocked", username, "admin", f"unlocked_by={admin_username}")
+                    for username in unlocked)
+    return unlocked
+
+
+# -----------------------
+# CLI: python -m password_manager.bulk create-users|unlock
+# -----------------------
+def _open_input(path):
+    return sys.stdin if path == "-" else open(path, "r", newline="")
+
+
+def _print_rejected(rejected, limit=20):
+    for username, reason in list(rejected.items())[:limit]:
+        print(f"  {username}: {reason}")
+    if len(rejected) > limit:
+        print(f"  ... and {len(rejected) - limit} more")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk user provisioning and unlocks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    create = sub.add_parser("create-users", help="Create users from a CSV with username,role,password columns")
+    create.add_argument("csv", help="CSV file ('-' for stdin); it holds plaintext passwords, delete it afterwards")
+    create.add_argument("--workers", type=int, default=None, help="Hashing processes (default: one per CPU)")
+    unlock = sub.add_parser("unlock", help="Unlock many accounts as an admin")
+    unlock.add_argument("--admin", required=True, help="Admin username performing the unlock")
+    unlock.add_argument("usernames", nargs="*", help="Accounts to unlock")
+    unlock.add_argument("--file", help="File with one username per line ('-' for stdin)")
+    args = parser.parse_args(argv)
+    enable_metrics_from_env()
+
+    start = time.perf_counter()
+    if args.command == "create-users":
+        with _open_input(args.csv) as f:
+            created, rejected = bulk_create_users(csv.DictReader(f), workers=args.workers)
+        print(f"Created {len(created)} users in {time.perf_counter() - start:.1f}s; {len(rejected)} rejected.")
+        _print_rejected(rejected)
+    else:
+        usernames = list(args.usernames)
+        if args.file:
+            with _open_input(args.file) as f:
+                usernames += [line.strip() for line in f if line.strip()]
+        admin = get_user(args.admin)
+        if admin is None or admin["role"] != "admin":
+            parser.error(f"'{args.admin}' is not an admin")
+        unlocked = bulk_unlock(args.admin, usernames)
+        print(f"Unlocked {len(unlocked)} of {len(set(usernames))} accounts in {time.perf_counter() - start:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
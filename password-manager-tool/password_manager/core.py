@@ -1,9 +1,9 @@
 # password_manager/core.py
 
 from datetime import datetime, timezone
-from hashlib import sha256
 from .utils import generate_salt, load_common_passwords
-from .storage import load_users, save_user, load_login_attempts, save_login_attempts
+from .storage import get_user, save_user, get_login_attempt, update_login_attempt, update_user
+from .hashing import Sha256Hasher, UnsupportedHashError, make_password_hash, verify_password, needs_rehash
 from .audit import log_audit
 import pwinput
 
@@ -18,17 +18,35 @@ LOCKOUT_DURATION = 5 * 60  # in seconds
 # Password utilities
 # -----------------------
 def hash_password(password, salt):
-    """Return SHA-256 hash of password + salt."""
-    return sha256((password + salt).encode()).hexdigest()
+    """Return SHA-256 hash of password + salt (legacy scheme; new passwords use make_password_hash)."""
+    return Sha256Hasher().hash(password, salt)
+
+
+def upgrade_password_hash(username, user, password):
+    """
+    Re-hash a just-verified password with the current default scheme if the stored record
+    uses an older one. Returns the updated record (or the unchanged one).
+    """
+    if not needs_rehash(user):
+        return user
+    upgraded = update_user(username, make_password_hash(password, user["salt"]))
+    log_audit("password_rehashed", username=username, role=user["role"],
+              details=f"kdf={upgraded['kdf'] if upgraded else None}")
+    return upgraded or user
 
 
 def check_password_strength(password, common):
     """
     Returns a tuple: (is_strong: bool, rules: dict)
-    - common: list of common passwords loaded from file
+    - common: list of common passwords loaded from file. Lists from load_common_passwords
+      carry a prebuilt matcher; plain lists fall back to scanning every entry.
     """
     p = password.lower()
-    common_set = set(common)  # convert to set for fast lookup
+    matcher = getattr(common, "matcher", None)
+    if matcher is not None:
+        is_common = matcher.contains_any(p)
+    else:
+        is_common = any(c in p for c in common)
 
     rules = {
         "length": len(password) >= 8,
@@ -36,7 +54,7 @@ def check_password_strength(password, common):
         "lowercase": any(c.islower() for c in password),
         "digit": any(c.isdigit() for c in password),
         "symbol": any(not c.isalnum() for c in password),
-        "uncommon": not any(c in p for c in common_set),
+        "uncommon": not is_common,
     }
     return all(rules.values()), rules
 
@@ -62,43 +80,89 @@ def prompt_password(common_passwords):
 # -----------------------
 # Login system
 # -----------------------
+def is_locked_out(record, now=None):
+    """True if the record has hit MAX_FAILED_ATTEMPTS within the last LOCKOUT_DURATION seconds."""
+    if record is None or record["failed"] < MAX_FAILED_ATTEMPTS or not record["last"]:
+        return False
+    now = now or datetime.now(timezone.utc)
+    return (now - datetime.fromisoformat(record["last"])).total_seconds() < LOCKOUT_DURATION
+
+
+def register_failed_attempt(username):
+    """
+    Atomically count one failed login (restarting from zero after an expired lockout)
+    and return the updated record; safe with concurrent processes.
+    """
+    def increment(record):
+        now = datetime.now(timezone.utc)
+        if record is None or (record["failed"] >= MAX_FAILED_ATTEMPTS and not is_locked_out(record, now)):
+            record = {"failed": 0, "last": None}
+        return {"failed": record["failed"] + 1, "last": now.isoformat()}
+
+    return update_login_attempt(username, increment)
+
+
+def record_login_attempt(username, success):
+    """
+    Atomically re-check the lockout and record one password attempt: a success resets the
+    count, a failure is counted as in register_failed_attempt. The check runs inside the
+    update, so concurrent logins cannot all pass it before any failure is counted.
+    Returns (blocked, record); a blocked attempt changes nothing.
+    """
+    blocked = False
+
+    def apply(record):
+        nonlocal blocked
+        now = datetime.now(timezone.utc)
+        if is_locked_out(record, now):
+            blocked = True
+            return None
+        if success:
+            return {"failed": 0, "last": None}
+        if record is None or record["failed"] >= MAX_FAILED_ATTEMPTS:
+            record = {"failed": 0, "last": None}  # first failure, or the lockout has expired
+        return {"failed": record["failed"] + 1, "last": now.isoformat()}
+
+    record = update_login_attempt(username, apply)
+    return blocked, record
+
+
 def login():
     """Prompt user to login, enforce lockout, and log events."""
-    users = load_users()
-    attempts = load_login_attempts()
-
     username = input("Username: ").strip()
-    if username not in users:
+    user = get_user(username)
+    if user is None:
         print("User not found.")
         log_audit("login_failed_unknown", username=username)
         return None
 
-    record = attempts.get(username, {"failed": 0, "last": None})
-    if record["failed"] >= MAX_FAILED_ATTEMPTS and record["last"]:
-        elapsed = (datetime.now(timezone.utc) - datetime.fromisoformat(record["last"])).total_seconds()
-        if elapsed < LOCKOUT_DURATION:
-            print("Account temporarily locked.")
-            log_audit("login_blocked", username=username, role=users[username]["role"])
-            return None
-        else:
-            record = {"failed": 0, "last": None}
+    if is_locked_out(get_login_attempt(username)):
+        print("Account temporarily locked.")
+        log_audit("login_blocked", username=username, role=user["role"])
+        return None
 
     pwd = pwinput.pwinput(prompt="Password: ", mask="●")
-    hashed = hash_password(pwd, users[username]["salt"])
+    try:
+        success = verify_password(user, pwd)
+    except UnsupportedHashError as e:
+        # Not the user's fault, so not counted as a failed attempt
+        print("This account's password cannot be checked; contact an administrator.")
+        log_audit("login_error", username=username, role=user["role"], details=str(e))
+        return None
+    # The check above only saves a prompt; this one decides, atomically with the update
+    blocked, record = record_login_attempt(username, success)
+    if blocked:
+        print("Account temporarily locked.")
+        log_audit("login_blocked", username=username, role=user["role"])
+        return None
 
-    if hashed == users[username]["hash"]:
-        # Successful login
-        attempts[username] = {"failed": 0, "last": None}
-        save_login_attempts(attempts)
+    if success:
+        upgrade_password_hash(username, user, pwd)
         print(f"Login successful. Welcome {username}!")
-        log_audit("login_success", username=username, role=users[username]["role"])
-        return username, users[username]["role"]
+        log_audit("login_success", username=username, role=user["role"])
+        return username, user["role"]
 
     # Failed login
-    record["failed"] += 1
-    record["last"] = datetime.now(timezone.utc).isoformat()
-    attempts[username] = record
-    save_login_attempts(attempts)
-    log_audit("login_failed", username=username, role=users[username]["role"], details=f"count={record['failed']}")
+    log_audit("login_failed", username=username, role=user["role"], details=f"count={record['failed']}")
     print("Incorrect password.")
     return None
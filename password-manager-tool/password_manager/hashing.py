@@ -0,0 +1,177 @@
+# password_manager/hashing.py
+
+import argparse
+import hashlib
+import hmac
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .metrics import timed
+
+# -----------------------
+# Hashers
+# -----------------------
+# A user record stores the hasher's name and parameters next to its salt and hash:
+#   {"salt": ..., "hash": ..., "kdf": "scrypt", "kdf_params": {"n": 16384, "r": 8, "p": 1}}
+# Records without "kdf" predate this module and use the legacy single SHA-256.
+
+
+class Sha256Hasher:
+    """Legacy scheme: one SHA-256 over password + salt. Kept only to verify old records."""
+
+    name = "sha256"
+
+    def __init__(self):
+        self.params = {}
+
+    def hash(self, password, salt):
+        return hashlib.sha256((password + salt).encode()).hexdigest()
+
+
+class Pbkdf2Hasher:
+    """PBKDF2-HMAC-SHA256; cost grows linearly with iterations."""
+
+    name = "pbkdf2_sha256"
+
+    def __init__(self, iterations=600_000):
+        self.params = {"iterations": iterations}
+
+    def hash(self, password, salt):
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(),
+                                   self.params["iterations"]).hex()
+
+
+class ScryptHasher:
+    """scrypt: memory-hard (about 128 * n * r bytes per hash), so GPUs/ASICs gain little."""
+
+    name = "scrypt"
+
+    def __init__(self, n=2 ** 14, r=8, p=1):
+        self.params = {"n": n, "r": r, "p": p}
+
+    def hash(self, password, salt):
+        n, r, p = self.params["n"], self.params["r"], self.params["p"]
+        return hashlib.scrypt(password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+                              maxmem=256 * n * r * p, dklen=32).hex()
+
+
+HASHERS = {cls.name: cls for cls in (Sha256Hasher, Pbkdf2Hasher, ScryptHasher)}
+
+
+class UnsupportedHashError(ValueError):
+    """A user record names a hashing scheme (or parameters) this version cannot verify."""
+
+# Used for new passwords and for upgrading older records on login
+DEFAULT_HASHER = ScryptHasher()
+
+
+def hasher_for(record):
+    """Rebuild the hasher a user record was hashed with; UnsupportedHashError if it is unknown."""
+    kdf = record.get("kdf", Sha256Hasher.name)
+    cls = HASHERS.get(kdf)
+    if cls is None:
+        raise UnsupportedHashError(f"Unknown password hashing scheme {kdf!r} (supported: {', '.join(HASHERS)})")
+    try:
+        return cls(**record.get("kdf_params", {}))
+    except TypeError:
+        raise UnsupportedHashError(f"Invalid {kdf} parameters: {record.get('kdf_params')!r}") from None
+
+
+@timed("password_hash")
+def make_password_hash(password, salt, hasher=None):
+    """Hash a new password; returns the fields to store on the user record."""
+    hasher = hasher or DEFAULT_HASHER
+    return {"hash": hasher.hash(password, salt), "kdf": hasher.name, "kdf_params": dict(hasher.params)}
+
+
+@timed("password_verify")
+def verify_password(record, password):
+    """Constant-time check of a password against a user record (any supported scheme)."""
+    return hmac.compare_digest(hasher_for(record).hash(password, record["salt"]), record["hash"])
+
+
+def needs_rehash(record, hasher=None):
+    """True if the record was hashed with a different scheme or parameters than the default."""
+    hasher = hasher or DEFAULT_HASHER
+    return record.get("kdf", Sha256Hasher.name) != hasher.name or record.get("kdf_params", {}) != hasher.params
+
+
+# -----------------------
+# Calibration and benchmarks
+# -----------------------
+def time_hash(hasher, rounds=3):
+    """Median seconds per hash."""
+    timings = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        hasher.hash("correct horse battery staple", f"calibration-salt-{i}")
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate(kdf, target_seconds):
+    """
+    Return the cheapest hasher of the given kind whose hash takes at least target_seconds here.
+    scrypt doubles n (memory and time); PBKDF2 scales iterations from a measurement.
+    """
+    if kdf == ScryptHasher.name:
+        hasher = ScryptHasher(n=2 ** 10)
+        while time_hash(hasher) < target_seconds and hasher.params["n"] < 2 ** 22:
+            hasher = ScryptHasher(n=hasher.params["n"] * 2)
+        return hasher
+    if kdf == Pbkdf2Hasher.name:
+        probe = Pbkdf2Hasher(iterations=100_000)
+        iterations = int(100_000 * target_seconds / time_hash(probe))
+        return Pbkdf2Hasher(iterations=max(100_000, -(-iterations // 10_000) * 10_000))
+    raise ValueError(f"Cannot calibrate {kdf}")
+
+
+def _verify_once(args):
+    hasher, password, salt, expected = args
+    return hmac.compare_digest(hasher.hash(password, salt), expected)
+
+
+def logins_per_second(hasher, workers=1, pool="thread", count=None):
+    """
+    Verify `count` passwords on a thread or process pool and return verifications/sec.
+    hashlib's scrypt and PBKDF2 release the GIL, so threads scale across cores too.
+    """
+    count = count or max(8, workers * 4)
+    expected = hasher.hash("benchmark-password", "benchmark-salt")
+    jobs = [(hasher, "benchmark-password", "benchmark-salt", expected)] * count
+    executor = ThreadPoolExecutor if pool == "thread" else ProcessPoolExecutor
+    start = time.perf_counter()
+    with executor(max_workers=workers) as ex:
+        assert all(ex.map(_verify_once, jobs))
+    return count / (time.perf_counter() - start)
+
+
+# -----------------------
+# CLI: python -m password_manager.hashing calibrate|bench
+# -----------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Password hashing calibration and throughput")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cal = sub.add_parser("calibrate", help="Pick parameters that reach a target latency on this machine")
+    cal.add_argument("--kdf", choices=[ScryptHasher.name, Pbkdf2Hasher.name], default=ScryptHasher.name)
+    cal.add_argument("--target-ms", type=float, default=100.0)
+    bench = sub.add_parser("bench", help="Measure logins/sec across a worker pool")
+    bench.add_argument("--kdf", choices=sorted(HASHERS), default=DEFAULT_HASHER.name)
+    bench.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    bench.add_argument("--pool", choices=["thread", "process"], default="thread")
+    bench.add_argument("--count", type=int, default=None, help="Verifications per run")
+    args = parser.parse_args(argv)
+
+    if args.command == "calibrate":
+        hasher = calibrate(args.kdf, args.target_ms / 1000)
+        print(f"{hasher.name} {hasher.params}: {time_hash(hasher) * 1000:.1f} ms per hash")
+        print("Set DEFAULT_HASHER in password_manager/hashing.py to use it for new and upgraded passwords.")
+    else:
+        hasher = DEFAULT_HASHER if args.kdf == DEFAULT_HASHER.name else HASHERS[args.kdf]()
+        print(f"{hasher.name} {hasher.params}, {args.pool} pool")
+        for workers in args.workers:
+            rate = logins_per_second(hasher, workers, args.pool, args.count)
+            print(f"  {workers:3d} workers: {rate:10.1f} logins/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# password_manager/matcher.py
+
+from collections import deque
+
+
+# -----------------------
+# Multi-pattern substring matcher
+# -----------------------
+class SubstringMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of patterns.
+    Built once, then contains_any(text) answers "does any pattern occur in text?"
+    in O(len(text)) regardless of how many patterns there are.
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]       # node -> {char: child node}
+        self._fail = [0]        # node -> longest proper suffix that is also a trie node
+        self._hit = [False]     # node -> some pattern ends here (directly or via fail links)
+        self.matches_empty = False
+
+        for pattern in patterns:
+            if not pattern:
+                self.matches_empty = True  # "" is a substring of everything
+                continue
+            node = 0
+            for ch in pattern:
+                child = self._goto[node].get(ch)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][ch] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._hit.append(False)
+                node = child
+            self._hit[node] = True
+
+        self._build_fail_links()
+
+    def _build_fail_links(self):
+        goto, fail, hit = self._goto, self._fail, self._hit
+        queue = deque(goto[0].values())  # depth-1 nodes fail to the root
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                if hit[fail[child]]:
+                    hit[child] = True
+
+    def contains_any(self, text):
+        """Return True if any pattern is a substring of text."""
+        if self.matches_empty:
+            return True
+        goto, fail, hit = self._goto, self._fail, self._hit
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if hit[node]:
+                return True
+        return False
@@ -0,0 +1,166 @@
+# password_manager/metrics.py
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# -----------------------
+# Settings
+# -----------------------
+# "1" collects metrics and prints a summary at exit; any other value is also a file path
+# the metrics are dumped to at exit (".json" -> JSON, anything else -> Prometheus text)
+METRICS_ENV = "PASSWORD_MANAGER_METRICS"
+
+PROMETHEUS_PREFIX = "password_manager"
+
+
+# -----------------------
+# Counters and timers
+# -----------------------
+class Metrics:
+    """
+    Process-wide counters and per-stage timers (call count + total seconds).
+
+    Disabled by default: instrumented functions then only pay one attribute check
+    (see timed()), and incr()/observe() return immediately. Updates take a lock when
+    enabled because the audit writer and AuthService flush from background threads.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.counters = {}
+        self.timers = {}  # name -> [calls, seconds]
+        self._lock = threading.Lock()
+
+    def incr(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {"counters": dict(self.counters),
+                    "timers": {name: {"calls": calls, "seconds": round(seconds, 6)}
+                               for name, (calls, seconds) in self.timers.items()}}
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        """Prometheus text exposition format (counters as *_total, timers as *_seconds_total/*_calls_total)."""
+        snap = self.snapshot()
+        lines = []
+        for name, value in sorted(snap["counters"].items()):
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+        if snap["timers"]:
+            lines.append(f"# TYPE {prefix}_stage_calls_total counter")
+            lines += [f'{prefix}_stage_calls_total{{stage="{name}"}} {timer["calls"]}'
+                      for name, timer in sorted(snap["timers"].items())]
+            lines.append(f"# TYPE {prefix}_stage_seconds_total counter")
+            lines += [f'{prefix}_stage_seconds_total{{stage="{name}"}} {timer["seconds"]}'
+                      for name, timer in sorted(snap["timers"].items())]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Write the metrics to path: JSON for a .json suffix, Prometheus text otherwise."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".json":
+            path.write_text(json.dumps(self.snapshot(), indent=2))
+        else:
+            path.write_text(self.to_prometheus())
+
+    def summary(self):
+        """Human-readable table for --stats."""
+        snap = self.snapshot()
+        lines = ["Metrics:"]
+        for name, timer in sorted(snap["timers"].items()):
+            per_call = timer["seconds"] / timer["calls"] * 1000 if timer["calls"] else 0.0
+            lines.append(f"  {name:24} {timer['calls']:10,d} calls {timer['seconds']:10.3f}s"
+                         f"  ({per_call:.3f} ms/call)")
+        for name, value in sorted(snap["counters"].items()):
+            lines.append(f"  {name:24} {value:10,d}")
+        return "\n".join(lines)
+
+
+METRICS = Metrics()
+
+
+def timed(name):
+    """Decorator: record calls and wall time of fn under timer `name` while METRICS is enabled."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                METRICS.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def enable_metrics(stats=True, stats_file=None):
+    """
+    Start collecting. At exit, print the summary to stderr (stats=True) and/or dump it
+    to stats_file.
+    """
+    METRICS.enabled = True
+
+    def report():
+        if stats:
+            print(METRICS.summary(), file=sys.stderr)
+        if stats_file:
+            METRICS.dump(stats_file)
+
+    atexit.register(report)
+
+
+def enable_metrics_from_env():
+    """
+    Honour $PASSWORD_MANAGER_METRICS (see METRICS_ENV). Called by the entry points (main.py,
+    the bulk CLI); code embedding AuthService calls it itself. Returns True if metrics were enabled.
+    """
+    value = os.environ.get(METRICS_ENV)
+    if not value:
+        return False
+    enable_metrics(stats=True, stats_file=None if value == "1" else value)
+    return True
+
+
+# -----------------------
+# Profiling
+# -----------------------
+def run_profiled(fn, output, top=20):
+    """Run fn() under cProfile, save the stats to output (pstats format) and print the top entries."""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn)
+    finally:
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(output)
+        stats = pstats.Stats(profiler, stream=sys.stderr)
+        stats.sort_stats("cumulative").print_stats(top)
+        print(f"Profile saved to {output} (python -m pstats {output})", file=sys.stderr)
@@ -0,0 +1,232 @@
+# password_manager/password_index.py
+
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from .utils import COMMON_PASSWORDS_FILE, DATA_DIR
+
+# -----------------------
+# Index file layout
+# -----------------------
+# header | bloom filter bits | bucket offsets (bucket_count + 1, u64) | entries
+# Entries are grouped by bucket; each is a u16 byte length followed by UTF-8 bytes.
+COMMON_PASSWORDS_INDEX = DATA_DIR / "common_passwords.idx"
+
+MAGIC = b"PMCPIDX1"
+HEADER = struct.Struct("<8sQQQQIIIQq")  # magic, entries, buckets, bloom bits, source size,
+                                         # bloom hashes, max entry chars, flags, data offset, source mtime_ns
+FLAG_HAS_EMPTY = 1                       # the list contains "", which matches every password
+OFFSET = struct.Struct("<Q")
+LENGTH = struct.Struct("<H")
+BUCKET_LOAD = 4                          # average entries per bucket
+PARTITIONS = 64                          # temp files used to group entries by bucket while building
+
+
+def _hashes(entry_bytes):
+    """Two 64-bit hashes, stable across processes (unlike hash())."""
+    digest = hashlib.blake2b(entry_bytes, digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+# -----------------------
+# Build (offline step)
+# -----------------------
+def build_common_password_index(source=None, target=None, false_positive_rate=0.01):
+    """
+    Compile a common-password text file into a hashed-bucket index with a Bloom filter.
+    Entries are partitioned by bucket through temp files, so the build never holds the
+    whole list in memory. Returns the number of distinct entries written.
+    """
+    source = Path(source or COMMON_PASSWORDS_FILE)
+    target = Path(target or COMMON_PASSWORDS_INDEX)
+    st = source.stat()
+
+    # Pass 1: size the Bloom filter and bucket table
+    with source.open("r") as f:
+        line_count = sum(1 for _ in f)
+    n = max(line_count, 1)
+    bloom_bits = max(64, math.ceil(-n * math.log(false_positive_rate) / math.log(2) ** 2))
+    bloom_hashes = max(1, round(bloom_bits / n * math.log(2)))
+    bucket_count = max(1, n // BUCKET_LOAD)
+    bloom = bytearray((bloom_bits + 7) // 8)
+
+    # Pass 2: set Bloom bits and spill (bucket, entry) records into partitions
+    flags = 0
+    max_chars = 0
+    with tempfile.TemporaryDirectory(dir=target.parent) as tmp:
+        partition_paths = [Path(tmp) / f"part{i}" for i in range(PARTITIONS)]
+        partitions = [p.open("wb") for p in partition_paths]
+        try:
+            with source.open("r") as f:
+                for line in f:
+                    entry = line.strip()
+                    if not entry:
+                        flags |= FLAG_HAS_EMPTY
+                        continue
+                    data = entry.encode()
+                    if len(data) > 0xFFFF:
+                        continue  # cannot be stored; no realistic password is this long
+                    max_chars = max(max_chars, len(entry))
+                    h1, h2 = _hashes(data)
+                    for i in range(bloom_hashes):
+                        bit = (h1 + i * h2) % bloom_bits
+                        bloom[bit >> 3] |= 1 << (bit & 7)
+                    bucket = h1 % bucket_count
+                    partitions[bucket * PARTITIONS // bucket_count].write(
+                        OFFSET.pack(bucket) + LENGTH.pack(len(data)) + data)
+        finally:
+            for p in partitions:
+                p.close()
+
+        # Pass 3: sort each partition by bucket, dedupe, and write the final file
+        offsets = [0] * (bucket_count + 1)
+        entries = 0
+        tmp_target = target.with_name(target.name + ".tmp")
+        data_offset = HEADER.size + len(bloom) + OFFSET.size * (bucket_count + 1)
+        with tmp_target.open("wb") as out:
+            out.seek(data_offset)
+            position = 0
+            next_bucket = 0
+            for path in partition_paths:
+                records = set()
+                raw = path.read_bytes()
+                i = 0
+                while i < len(raw):
+                    (bucket,) = OFFSET.unpack_from(raw, i)
+                    (length,) = LENGTH.unpack_from(raw, i + OFFSET.size)
+                    start = i + OFFSET.size + LENGTH.size
+                    records.add((bucket, raw[start:start + length]))
+                    i = start + length
+                for bucket, data in sorted(records):
+                    while next_bucket <= bucket:
+                        offsets[next_bucket] = position
+                        next_bucket += 1
+                    out.write(LENGTH.pack(len(data)) + data)
+                    position += LENGTH.size + len(data)
+                    entries += 1
+            while next_bucket <= bucket_count:
+                offsets[next_bucket] = position
+                next_bucket += 1
+
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, entries, bucket_count, bloom_bits, st.st_size,
+                                  bloom_hashes, max_chars, flags, data_offset, st.st_mtime_ns))
+            out.write(bloom)
+            out.write(b"".join(OFFSET.pack(o) for o in offsets))
+        os.replace(tmp_target, target)
+    return entries
+
+
+# -----------------------
+# Query (memory-mapped)
+# -----------------------
+class CommonPasswordIndex:
+    """
+    Read-only view of a compiled index. The file is mmap'd, so opening is O(1) and
+    every process using the same index shares the OS page cache instead of a private list.
+    Quacks like the list from load_common_passwords for check_password_strength.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.entries, self.bucket_count, self.bloom_bits, self.source_size, self.bloom_hashes,
+         self.max_chars, flags, self._data_offset, self.source_mtime_ns) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a common-password index: {path}")
+        self.matches_empty = bool(flags & FLAG_HAS_EMPTY)
+        self._bloom_offset = HEADER.size
+        self._offsets_offset = self._bloom_offset + (self.bloom_bits + 7) // 8
+
+    @property
+    def matcher(self):
+        """check_password_strength looks for .matcher; the index is its own matcher."""
+        return self
+
+    def __len__(self):
+        return self.entries + self.matches_empty
+
+    def __contains__(self, entry):
+        if not entry:
+            return self.matches_empty
+        data = entry.encode()
+        h1, h2 = _hashes(data)
+        mm = self._mm
+        for i in range(self.bloom_hashes):
+            bit = (h1 + i * h2) % self.bloom_bits
+            if not mm[self._bloom_offset + (bit >> 3)] & (1 << (bit & 7)):
+                return False  # definitely absent
+        bucket = h1 % self.bucket_count
+        (start,) = OFFSET.unpack_from(mm, self._offsets_offset + bucket * OFFSET.size)
+        (end,) = OFFSET.unpack_from(mm, self._offsets_offset + (bucket + 1) * OFFSET.size)
+        pos, end = self._data_offset + start, self._data_offset + end
+        while pos < end:
+            (length,) = LENGTH.unpack_from(mm, pos)
+            pos += LENGTH.size
+            if length == len(data) and mm[pos:pos + length] == data:
+                return True
+            pos += length
+        return False
+
+    def contains_any(self, text):
+        """True if any indexed entry is a substring of text (same rule as the list scan)."""
+        if self.matches_empty:
+            return True
+        limit = self.max_chars
+        for i in range(len(text)):
+            for j in range(i + 1, min(len(text), i + limit) + 1):
+                if text[i:j] in self:
+                    return True
+        return False
+
+    def is_stale(self, source=None):
+        """True if the source list changed since the index was built."""
+        source = Path(source or COMMON_PASSWORDS_FILE)
+        try:
+            st = source.stat()
+        except FileNotFoundError:
+            return False
+        return st.st_size != self.source_size or st.st_mtime_ns != self.source_mtime_ns
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+def open_common_password_index(path=None, source=None):
+    """Open the compiled index, or return None if it is missing or older than the source list."""
+    path = Path(path or COMMON_PASSWORDS_INDEX)
+    if not path.exists():
+        return None
+    index = CommonPasswordIndex(path)
+    if index.is_stale(source):
+        index.close()
+        return None
+    return index
+
+
+# -----------------------
+# CLI: python -m password_manager.password_index build
+# -----------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the common-password list into an mmap index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Build the index from a text list (one password per line)")
+    build.add_argument("--source", type=Path, default=COMMON_PASSWORDS_FILE)
+    build.add_argument("--output", type=Path, default=COMMON_PASSWORDS_INDEX)
+    build.add_argument("--fp-rate", type=float, default=0.01, help="Bloom filter false-positive rate")
+    args = parser.parse_args(argv)
+
+    count = build_common_password_index(args.source, args.output, args.fp_rate)
+    print(f"Indexed {count} common passwords into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
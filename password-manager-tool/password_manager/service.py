@@ -0,0 +1,247 @@
+# password_manager/service.py
+
+import heapq
+import threading
+import time
+from datetime import datetime, timezone
+from . import storage
+from .audit import log_audit
+from .core import MAX_FAILED_ATTEMPTS, LOCKOUT_DURATION, is_locked_out
+from .hashing import UnsupportedHashError, make_password_hash, verify_password, needs_rehash
+
+
+def _epoch(iso_timestamp):
+    """Stored attempt time (ISO, naive means UTC) -> epoch seconds."""
+    dt = datetime.fromisoformat(iso_timestamp)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+# -----------------------
+# Authentication service
+# -----------------------
+class AuthService:
+    """
+    Long-running replacement for core.login's per-call file reads.
+
+    Users and login-attempt records are held in dicts keyed by username, so lookups are
+    plain dict hits. Attempt changes are written behind: each user's pending change (a
+    reset and/or N new failures) is applied to the stored record in one atomic batch
+    update once max_dirty users accumulate or flush_interval seconds pass (background
+    thread), and on flush()/close(). Failures are added to the stored count rather than
+    overwriting it, so several AuthService processes never lose each other's failures,
+    and the merged records (which may lock an account) replace the cached ones. Locked
+    accounts sit in a min-heap ordered by lockout expiry, so expired lockouts are released
+    by popping the heap rather than by re-parsing timestamps on every read.
+
+    The cache is reloaded when the storage backend reports a new version (file mtime/size
+    for JSON, PRAGMA data_version for SQLite), checked at most every recheck_interval
+    seconds. Pending changes are flushed before a reload.
+    """
+
+    def __init__(self, backend=None, flush_interval=1.0, max_dirty=100, recheck_interval=1.0):
+        self.backend = backend or storage.get_backend()
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        self.recheck_interval = recheck_interval
+
+        self._lock = threading.RLock()
+        self._dirty = {}  # username -> [reset first, failures to add, last failure ISO time]
+        self._next_recheck = 0.0
+        self._reload()
+
+        self._stop = threading.Event()
+        self._flusher = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_loop, name="auth-write-behind", daemon=True)
+            self._flusher.start()
+
+    # -----------------------
+    # Cache maintenance
+    # -----------------------
+    def _reload(self):
+        self._version = self.backend.version()
+        self._users = self.backend.load_users()
+        self._attempts = self.backend.load_login_attempts()
+        self._locked = {}     # username -> lockout expiry (epoch seconds)
+        self._expiry_heap = []
+        for username, record in self._attempts.items():
+            if record["failed"] >= MAX_FAILED_ATTEMPTS and record["last"]:
+                self._lock_out(username, _epoch(record["last"]))
+
+    def _lock_out(self, username, last_epoch):
+        expires = last_epoch + LOCKOUT_DURATION
+        if self._locked.get(username) == expires:
+            return
+        self._locked[username] = expires
+        heapq.heappush(self._expiry_heap, (expires, username))
+
+    def _expire_lockouts(self, now):
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires, username = heapq.heappop(heap)
+            if self._locked.get(username) == expires:  # skip entries superseded by a newer lockout
+                del self._locked[username]
+
+    def _refresh(self, now):
+        """Reload if storage changed underneath us (rate-limited to recheck_interval)."""
+        if now < self._next_recheck:
+            return
+        self._next_recheck = now + self.recheck_interval
+        if self.backend.version() != self._version:
+            self._flush_locked()
+            self._reload()
+
+    def _mark_dirty(self, username, reset=False, last=None):
+        """Queue a change for username: a reset, or one more failure at `last`."""
+        pending = self._dirty.get(username)
+        if reset or pending is None:
+            pending = self._dirty[username] = [reset, 0, None]
+        if last is not None:
+            pending[1] += 1
+            pending[2] = last
+        if len(self._dirty) >= self.max_dirty:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._dirty:
+            return
+        batch, self._dirty = self._dirty, {}
+
+        def merge(username, record):
+            reset, failures, last = batch[username]
+            if reset or record is None or (record["failed"] >= MAX_FAILED_ATTEMPTS and not is_locked_out(record)):
+                record = {"failed": 0, "last": None}  # reset, first failure, or the lockout has expired
+            if not failures:
+                return {"failed": record["failed"], "last": record["last"]}
+            return {"failed": record["failed"] + failures, "last": last}
+
+        unchanged = self.backend.version() == self._version
+        merged = self.backend.update_login_attempts(list(batch), merge)
+        if unchanged:
+            self._version = self.backend.version()  # our own write is not a reason to reload
+        for username, record in merged.items():
+            self._attempts[username] = record
+            if record["failed"] >= MAX_FAILED_ATTEMPTS and record["last"]:
+                self._lock_out(username, _epoch(record["last"]))
+            else:
+                self._locked.pop(username, None)  # e.g. unlocked by another process
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            with self._lock:
+                self._flush_locked()
+
+    def flush(self):
+        """Write all pending attempt records now."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        """Stop the write-behind thread and flush."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # -----------------------
+    # Lookups
+    # -----------------------
+    def get_user(self, username):
+        with self._lock:
+            self._refresh(time.time())
+            return self._users.get(username)
+
+    def is_locked(self, username, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._refresh(now)
+            self._expire_lockouts(now)
+            return username in self._locked
+
+    # -----------------------
+    # State changes
+    # -----------------------
+    def record_failure(self, username, now=None):
+        """Count a failed password; returns the new failure count."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire_lockouts(now)
+            record = self._attempts.get(username)
+            if record is None or (record["failed"] >= MAX_FAILED_ATTEMPTS and username not in self._locked):
+                record = {"failed": 0, "last": None}  # first failure, or the lockout has expired
+            record = {"failed": record["failed"] + 1,
+                      "last": datetime.fromtimestamp(now, timezone.utc).isoformat()}
+            self._attempts[username] = record
+            if record["failed"] >= MAX_FAILED_ATTEMPTS:
+                self._lock_out(username, now)
+            self._mark_dirty(username, last=record["last"])
+            return record["failed"]
+
+    def reset_attempts(self, username):
+        """Clear failures after a successful login or an admin unlock."""
+        with self._lock:
+            self._locked.pop(username, None)  # its heap entry is skipped when popped
+            self._attempts[username] = {"failed": 0, "last": None}
+            self._mark_dirty(username, reset=True)
+
+    def authenticate(self, username, password):
+        """
+        Same checks and audit events as core.login, without prompting.
+        Returns (username, role) on success, otherwise None.
+        """
+        now = time.time()
+        user = self.get_user(username)
+        if user is None:
+            log_audit("login_failed_unknown", username=username)
+            return None
+        if self.is_locked(username, now):
+            log_audit("login_blocked", username=username, role=user["role"])
+            return None
+        try:
+            verified = verify_password(user, password)
+        except UnsupportedHashError as e:
+            log_audit("login_error", username=username, role=user["role"], details=str(e))
+            return None
+        if verified:
+            self.reset_attempts(username)
+            log_audit("login_success", username=username, role=user["role"])
+            if needs_rehash(user):
+                self._upgrade_hash(username, user, password)
+            return username, user["role"]
+        count = self.record_failure(username, now)
+        log_audit("login_failed", username=username, role=user["role"], details=f"count={count}")
+        return None
+
+    def _upgrade_hash(self, username, user, password):
+        """Like core.upgrade_password_hash, but through this service's backend and cache."""
+        hashed = make_password_hash(password, user["salt"])
+        with self._lock:
+            unchanged = self.backend.version() == self._version
+            upgraded = self.backend.update_user(username, hashed)
+            if upgraded is None:
+                return
+            self._users[username] = upgraded
+            if unchanged:
+                self._version = self.backend.version()  # our own write is not a reason to reload
+        log_audit("password_rehashed", username=username, role=user["role"], details=f"kdf={upgraded['kdf']}")
+
+    def unlock(self, admin_username, target_username):
+        """Same rules and audit event as admin.unlock_account."""
+        admin = self.get_user(admin_username)
+        if admin is None or admin["role"] != "admin":
+            return False
+        with self._lock:
+            if target_username not in self._attempts:
+                return False
+            self.reset_attempts(target_username)
+        log_audit("account_unlocked", username=target_username, role="admin",
+                  details=f"unlocked_by={admin_username}")
+        return True
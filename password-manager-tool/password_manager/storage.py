@@ -1,9 +1,20 @@
 # password_manager/storage.py
 
 import json
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timezone
 from .audit import log_audit
+from .metrics import timed
+
+try:
+    import fcntl  # POSIX advisory locks; without it JSON writes are atomic but not serialized
+except ImportError:
+    fcntl = None
 
 # -----------------------
 # File paths
@@ -13,45 +24,471 @@ DATA_DIR.mkdir(exist_ok=True)
 
 USERS_FILE = DATA_DIR / "users.json"
 LOGIN_ATTEMPTS_FILE = DATA_DIR / "login_attempts.json"
+DB_FILE = DATA_DIR / "password_manager.db"
+
+# "json" (default) or "sqlite"; see get_backend()
+STORAGE_BACKEND_ENV = "PASSWORD_MANAGER_STORAGE"
+
+
+# -----------------------
+# JSON backend
+# -----------------------
+class JsonStorage:
+    """
+    Whole-file JSON storage (the original format).
+    Paths default to the module-level USERS_FILE / LOGIN_ATTEMPTS_FILE at call time,
+    so they can still be patched per test.
+    Every read-modify-write holds an exclusive lock on "<file>.lock" and replaces the file
+    via a temp file + rename, so concurrent processes never lose each other's updates and
+    readers never see a half-written file.
+    """
+
+    def __init__(self, users_file=None, attempts_file=None):
+        self._users_file = users_file
+        self._attempts_file = attempts_file
+
+    @property
+    def users_file(self):
+        return Path(self._users_file or USERS_FILE)
+
+    @property
+    def attempts_file(self):
+        return Path(self._attempts_file or LOGIN_ATTEMPTS_FILE)
+
+    @staticmethod
+    @timed("storage_read")
+    def _read(path):
+        if not path.exists():
+            return {}
+        with path.open("r") as f:
+            return json.load(f)
+
+    @staticmethod
+    @timed("storage_write")
+    def _write(path, data):
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @staticmethod
+    @contextmanager
+    def _locked(path):
+        """Exclusive lock serializing read-modify-write cycles on path (across processes)."""
+        if fcntl is None:
+            yield
+            return
+        with open(path.with_name(path.name + ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def load_users(self):
+        return self._read(self.users_file)
+
+    def get_user(self, username):
+        return self.load_users().get(username)
+
+    def put_user(self, username, record):
+        with self._locked(self.users_file):
+            users = self.load_users()
+            users[username] = record
+            self._write(self.users_file, users)
+
+    def add_users(self, records):
+        with self._locked(self.users_file):
+            users = self.load_users()
+            existing = [username for username in records if username in users]
+            users.update((username, record) for username, record in records.items() if username not in users)
+            if len(existing) < len(records):
+                self._write(self.users_file, users)
+            return existing
+
+    def update_user(self, username, changes):
+        with self._locked(self.users_file):
+            users = self.load_users()
+            if username not in users:
+                return None
+            users[username].update(changes)
+            self._write(self.users_file, users)
+            return users[username]
+
+    def load_login_attempts(self):
+        return self._read(self.attempts_file)
+
+    def get_login_attempt(self, username):
+        return self.load_login_attempts().get(username)
+
+    def put_login_attempt(self, username, record):
+        self.put_login_attempts({username: record})
+
+    def put_login_attempts(self, records):
+        with self._locked(self.attempts_file):
+            attempts = self.load_login_attempts()
+            attempts.update(records)
+            self._write(self.attempts_file, attempts)
+
+    def update_login_attempt(self, username, fn):
+        with self._locked(self.attempts_file):
+            attempts = self.load_login_attempts()
+            record = fn(attempts.get(username))
+            if record is not None:
+                attempts[username] = record
+                self._write(self.attempts_file, attempts)
+            return record
+
+    def update_login_attempts(self, usernames, fn):
+        with self._locked(self.attempts_file):
+            attempts = self.load_login_attempts()
+            updated = {}
+            for username in usernames:
+                record = fn(username, attempts.get(username))
+                if record is not None:
+                    attempts[username] = updated[username] = record
+            if updated:
+                self._write(self.attempts_file, attempts)
+            return updated
+
+    def save_login_attempts(self, attempts):
+        with self._locked(self.attempts_file):
+            self._write(self.attempts_file, attempts)
+
+    def version(self):
+        """Changes whenever either file is rewritten (used for cache invalidation)."""
+        stamps = []
+        for path in (self.users_file, self.attempts_file):
+            try:
+                st = path.stat()
+                stamps.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamps.append(None)
+        return tuple(stamps)
+
+
+# -----------------------
+# SQLite backend
+# -----------------------
+class SQLiteStorage:
+    """
+    SQLite storage in WAL mode: keyed point reads and single-row upserts, so an update
+    costs O(1) rows instead of rewriting every user, and concurrent writers don't lose
+    each other's changes. User records are stored as JSON so new fields need no migration.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            record   TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS login_attempts (
+            username TEXT PRIMARY KEY,
+            failed   INTEGER NOT NULL DEFAULT 0,
+            last     TEXT
+        );
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or DB_FILE)
+        self._local = threading.local()  # sqlite3 connections are per thread
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @timed("storage_read")
+    def load_users(self):
+        rows = self._connection().execute("SELECT username, record FROM users")
+        return {username: json.loads(record) for username, record in rows}
+
+    @timed("storage_read")
+    def get_user(self, username):
+        row = self._connection().execute(
+            "SELECT record FROM users WHERE username = ?", (username,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @timed("storage_write")
+    def put_user(self, username, record):
+        self._connection().execute(
+            "INSERT INTO users (username, record) VALUES (?, ?) "
+            "ON CONFLICT(username) DO UPDATE SET record = excluded.record",
+            (username, json.dumps(record)))
+
+    @staticmethod
+    def _select_in(conn, query, usernames, chunk=500):
+        """Rows of `query ... WHERE username IN (...)` for usernames, in chunks under SQLite's variable limit."""
+        for i in range(0, len(usernames), chunk):
+            part = usernames[i:i + chunk]
+            yield from conn.execute(f"{query} WHERE username IN ({','.join('?' * len(part))})", part)
+
+    @timed("storage_write")
+    def add_users(self, records):
+        with self._transaction() as conn:
+            existing = {username for username, in self._select_in(conn, "SELECT username FROM users", list(records))}
+            conn.executemany(
+                "INSERT INTO users (username, record) VALUES (?, ?)",
+                [(username, json.dumps(record)) for username, record in records.items() if username not in existing])
+            return [username for username in records if username in existing]
+
+    @timed("storage_write")
+    def update_user(self, username, changes):
+        with self._transaction() as conn:
+            row = conn.execute("SELECT record FROM users WHERE username = ?", (username,)).fetchone()
+            if row is None:
+                return None
+            record = {**json.loads(row[0]), **changes}
+            conn.execute("UPDATE users SET record = ? WHERE username = ?", (json.dumps(record), username))
+            return record
+
+    @timed("storage_read")
+    def load_login_attempts(self):
+        rows = self._connection().execute("SELECT username, failed, last FROM login_attempts")
+        return {username: {"failed": failed, "last": last} for username, failed, last in rows}
+
+    @timed("storage_read")
+    def get_login_attempt(self, username):
+        row = self._connection().execute(
+            "SELECT failed, last FROM login_attempts WHERE username = ?", (username,)).fetchone()
+        return {"failed": row[0], "last": row[1]} if row else None
+
+    @timed("storage_write")
+    def put_login_attempt(self, username, record):
+        self._connection().execute(
+            "INSERT INTO login_attempts (username, failed, last) VALUES (?, ?, ?) "
+            "ON CONFLICT(username) DO UPDATE SET failed = excluded.failed, last = excluded.last",
+            (username, record["failed"], record["last"]))
+
+    @timed("storage_write")
+    def update_login_attempt(self, username, fn):
+        # BEGIN IMMEDIATE takes the write lock before the read, so the cycle is atomic
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT failed, last FROM login_attempts WHERE username = ?", (username,)).fetchone()
+            record = fn({"failed": row[0], "last": row[1]} if row else None)
+            if record is not None:
+                conn.execute(
+                    "INSERT INTO login_attempts (username, failed, last) VALUES (?, ?, ?) "
+                    "ON CONFLICT(username) DO UPDATE SET failed = excluded.failed, last = excluded.last",
+                    (username, record["failed"], record["last"]))
+            return record
+
+    @timed("storage_write")
+    def update_login_attempts(self, usernames, fn):
+        with self._transaction() as conn:
+            usernames = list(dict.fromkeys(usernames))
+            rows = self._select_in(conn, "SELECT username, failed, last FROM login_attempts", usernames)
+            current = {username: {"failed": failed, "last": last} for username, failed, last in rows}
+            updated = {}
+            for username in usernames:
+                record = fn(username, current.get(username))
+                if record is not None:
+                    updated[username] = record
+            conn.executemany(
+                "INSERT INTO login_attempts (username, failed, last) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET failed = excluded.failed, last = excluded.last",
+                [(username, r["failed"], r["last"]) for username, r in updated.items()])
+            return updated
+
+    @timed("storage_write")
+    def put_login_attempts(self, records):
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO login_attempts (username, failed, last) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET failed = excluded.failed, last = excluded.last",
+                [(username, r["failed"], r["last"]) for username, r in records.items()])
+
+    def version(self):
+        """Changes when another connection commits (PRAGMA data_version)."""
+        return self._connection().execute("PRAGMA data_version").fetchone()[0]
+
+    @timed("storage_write")
+    def save_login_attempts(self, attempts):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM login_attempts")
+            conn.executemany(
+                "INSERT INTO login_attempts (username, failed, last) VALUES (?, ?, ?)",
+                [(username, r["failed"], r["last"]) for username, r in attempts.items()])
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK around an autocommit connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+# -----------------------
+# Backend selection
+# -----------------------
+_backend = None
+
+
+def get_backend():
+    """Active backend; chosen from $PASSWORD_MANAGER_STORAGE ("json" or "sqlite") on first use."""
+    global _backend
+    if _backend is None:
+        kind = os.environ.get(STORAGE_BACKEND_ENV, "json").lower()
+        _backend = SQLiteStorage() if kind == "sqlite" else JsonStorage()
+    return _backend
+
+
+def set_backend(backend):
+    """Install a storage backend (JsonStorage, SQLiteStorage or compatible); None resets."""
+    global _backend
+    _backend = backend
 
 
 # -----------------------
 # Users
 # -----------------------
 def load_users():
-    """Load all users from JSON file. Returns dict of username -> user info."""
-    if not USERS_FILE.exists():
-        return {}
-    with USERS_FILE.open("r") as f:
-        return json.load(f)
+    """Load all users. Returns dict of username -> user info."""
+    return get_backend().load_users()
 
 
-def save_user(username, role, salt, hashed):
-    """Add or update a user in JSON storage."""
-    users = load_users()
-    users[username] = {
+def get_user(username):
+    """Return one user's info, or None if the user doesn't exist."""
+    return get_backend().get_user(username)
+
+
+def make_user_record(role, salt, hashed, kdf=None, kdf_params=None):
+    """The stored form of a user. kdf/kdf_params name the hashing scheme (see hashing.py)."""
+    record = {
         "role": role,
         "salt": salt,
         "hash": hashed,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
-    with USERS_FILE.open("w") as f:
-        json.dump(users, f, indent=4)
+    if kdf is not None:
+        record["kdf"] = kdf
+        record["kdf_params"] = kdf_params or {}
+    return record
+
+
+def save_user(username, role, salt, hashed, kdf=None, kdf_params=None):
+    """Add or update a user in storage. kdf/kdf_params name the hashing scheme (see hashing.py)."""
+    get_backend().put_user(username, make_user_record(role, salt, hashed, kdf, kdf_params))
     log_audit("user_created", username=username, role=role)
 
 
+def add_users(records):
+    """
+    Insert several new users (username -> make_user_record(...)) in one write or transaction.
+    Usernames that already exist are left untouched and returned. Callers log the audit events.
+    """
+    return get_backend().add_users(records)
+
+
+def update_user(username, changes):
+    """Atomically merge fields into an existing user's record; returns it, or None if missing."""
+    return get_backend().update_user(username, changes)
+
+
 # -----------------------
 # Login attempts
 # -----------------------
 def load_login_attempts():
-    """Load login attempts from JSON file."""
-    if not LOGIN_ATTEMPTS_FILE.exists():
-        return {}
-    with LOGIN_ATTEMPTS_FILE.open("r") as f:
-        return json.load(f)
+    """Load all login attempt records."""
+    return get_backend().load_login_attempts()
+
+
+def get_login_attempt(username):
+    """Return one user's login attempt record, or None."""
+    return get_backend().get_login_attempt(username)
+
+
+def save_login_attempt(username, record):
+    """Upsert one user's login attempt record."""
+    get_backend().put_login_attempt(username, record)
+
+
+def update_login_attempt(username, fn):
+    """
+    Atomically replace one user's record with fn(current record or None).
+    If fn returns None nothing is written. Returns fn's result.
+    """
+    return get_backend().update_login_attempt(username, fn)
+
+
+def update_login_attempt_batch(usernames, fn):
+    """
+    update_login_attempt for several users in one locked write or transaction; fn is called
+    as fn(username, current record or None) so each user can get a different change.
+    Returns {username: new record} for the users fn returned a record for.
+    """
+    return get_backend().update_login_attempts(usernames, fn)
+
+
+def save_login_attempt_batch(records):
+    """Upsert several users' login attempt records in one write."""
+    get_backend().put_login_attempts(records)
 
 
 def save_login_attempts(attempts):
-    """Save login attempts to JSON file."""
-    with LOGIN_ATTEMPTS_FILE.open("w") as f:
-        json.dump(attempts, f, indent=4)
+    """Replace all login attempt records."""
+    get_backend().save_login_attempts(attempts)
+
+
+# -----------------------
+# JSON -> SQLite migration
+# -----------------------
+def migrate_json_to_sqlite(db_path=None, users_file=None, attempts_file=None):
+    """
+    Copy users.json and login_attempts.json into an SQLite database in one transaction.
+    Existing rows with the same username are overwritten. Returns (users, attempts) copied.
+    """
+    source = JsonStorage(users_file, attempts_file)
+    target = SQLiteStorage(db_path)
+    users = source.load_users()
+    attempts = source.load_login_attempts()
+    with target._transaction():
+        for username, record in users.items():
+            target.put_user(username, record)
+        for username, record in attempts.items():
+            target.put_login_attempt(username, record)
+    target.close()
+    return len(users), len(attempts)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Password manager storage tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="Copy the JSON files into the SQLite database")
+    migrate.add_argument("--db", type=Path, default=DB_FILE)
+    migrate.add_argument("--users", type=Path, default=USERS_FILE)
+    migrate.add_argument("--attempts", type=Path, default=LOGIN_ATTEMPTS_FILE)
+    args = parser.parse_args()
+
+    user_count, attempt_count = migrate_json_to_sqlite(args.db, args.users, args.attempts)
+    print(f"Migrated {user_count} users and {attempt_count} login attempt records into {args.db}")
+    print(f"Set {STORAGE_BACKEND_ENV}=sqlite to use it.")
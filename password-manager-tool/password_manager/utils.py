@@ -2,6 +2,7 @@
 
 import secrets
 from pathlib import Path
+from .matcher import SubstringMatcher
 
 DATA_DIR = Path("./data")
 COMMON_PASSWORDS_FILE = DATA_DIR / "common_passwords.txt"
@@ -10,9 +11,64 @@ def generate_salt(length=16):
     """Generate a cryptographically secure random salt."""
     return secrets.token_hex(length)
 
+def _invalidates_matcher(method):
+    """Wrap a list mutator so the next .matcher access rebuilds the matcher."""
+    def mutate(self, *args):
+        result = method(self, *args)
+        self._matcher = None
+        return result
+    mutate.__name__ = method.__name__
+    return mutate
+
+
+class CommonPasswords(list):
+    """
+    List of common passwords that also carries a prebuilt substring matcher.
+    Changing the list (append, extend, item assignment, ...) drops the matcher and the
+    next check rebuilds it, so it never misses a password added after loading.
+    """
+
+    def __init__(self, passwords):
+        super().__init__(passwords)
+        self._matcher = SubstringMatcher(self)
+
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            self._matcher = SubstringMatcher(self)
+        return self._matcher
+
+    append = _invalidates_matcher(list.append)
+    extend = _invalidates_matcher(list.extend)
+    insert = _invalidates_matcher(list.insert)
+    remove = _invalidates_matcher(list.remove)
+    pop = _invalidates_matcher(list.pop)
+    clear = _invalidates_matcher(list.clear)
+    __setitem__ = _invalidates_matcher(list.__setitem__)
+    __delitem__ = _invalidates_matcher(list.__delitem__)
+    __iadd__ = _invalidates_matcher(list.__iadd__)
+    __imul__ = _invalidates_matcher(list.__imul__)
+
+
 def load_common_passwords():
-    """Load common passwords from file and return as a list of strings."""
+    """
+    Load common passwords from file and return them as a list of strings.
+    The returned list carries a `matcher` built once here, which check_password_strength
+    reuses for every check instead of scanning the list.
+    """
     if not COMMON_PASSWORDS_FILE.exists():
-        return []
+        return CommonPasswords([])
     with COMMON_PASSWORDS_FILE.open("r") as f:
-        return [line.strip() for line in f]
\ No newline at end of file
+        return CommonPasswords(line.strip() for line in f)
+
+
+def load_common_password_checker():
+    """
+    Prefer the compiled, memory-mapped index (python -m password_manager.password_index build)
+    when it exists and is up to date; otherwise load the text list.
+    """
+    from .password_index import open_common_password_index
+    index = open_common_password_index()
+    if index is not None:
+        return index
+    return load_common_passwords()
@@ -0,0 +1,101 @@
+import json
+import random
+from password_manager import audit_query
+from password_manager.audit import rotate_audit_log, log_audit
+from password_manager.audit_query import AuditIndex, query_audit, index_path
+
+EVENTS = ["login_failed", "login_success", "login_blocked", "user_created"]
+
+def _records(count, seed=3, day=1):
+    rng = random.Random(seed)
+    return [{
+        "timestamp": f"2026-01-{day:02d}T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}+00:00Z",
+        "event": rng.choice(EVENTS),
+        "username": f"user{rng.randrange(20)}",
+        "role": rng.choice(["user", "admin"]),
+        "details": None,
+    } for i in range(count)]
+
+def _append(path, records):
+    with path.open("a") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+
+def _scan(records, start=None, end=None, **filters):
+    return [r for r in records
+            if all(v is None or r[k] == v for k, v in filters.items())
+            and (start is None or r["timestamp"] >= start) and (end is None or r["timestamp"] <= end)]
+
+def test_indexed_query_matches_full_scan(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_query, "BLOCK_RECORDS", 50)
+    log = tmp_path / "audit.log.jsonl"
+    records = _records(1000)
+    _append(log, records)
+
+    cases = [
+        {"event": "login_failed", "username": "user3"},
+        {"role": "admin", "start": "2026-01-01T00:05:00+00:00Z", "end": "2026-01-01T00:09:59+00:00Z"},
+        {"username": "nobody"},
+        {},
+    ]
+    for case in cases:
+        assert list(query_audit(log_file=log, **case)) == _scan(records, **case)
+    assert index_path(log).exists()
+
+def test_index_is_incremental(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_query, "BLOCK_RECORDS", 50)
+    log = tmp_path / "audit.log.jsonl"
+    records = _records(120)
+    _append(log, records)
+    index = AuditIndex.load(log)
+    assert index.update() == 120
+    index.save()
+
+    more = _records(80, seed=4, day=2)
+    _append(log, more)
+    index = AuditIndex.load(log)
+    assert index.update() == 100  # the 20-line partial block is re-read, full blocks are not
+    assert [b[4] for b in index.blocks] == [50, 50, 50, 50]
+    index.save()
+
+    assert list(query_audit(log_file=log, username="user7")) == _scan(records + more, username="user7")
+    _append(log, _records(5, seed=5, day=3))  # appended after the last update
+    assert len(list(query_audit(log_file=log, update_index=False))) == 205
+
+def test_malformed_line_at_block_boundary_closes_the_block(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_query, "BLOCK_RECORDS", 5)
+    log = tmp_path / "audit.log.jsonl"
+    records = _records(11)
+    _append(log, records[:4])
+    with log.open("a") as f:
+        f.write("{not json\n")  # the 5th, last line of the first block
+    _append(log, records[4:])
+
+    index = AuditIndex.load(log)
+    assert index.update() == 12
+    assert [b[4] for b in index.blocks] == [5, 5, 2]
+    assert index.blocks[1][2] == records[4]["timestamp"]
+    assert list(query_audit(log_file=log)) == records
+    user = records[-1]["username"]
+    assert list(query_audit(log_file=log, username=user)) == _scan(records, username=user)
+
+def test_query_spans_rotated_segments(tmp_path, monkeypatch):
+    log = tmp_path / "audit.log.jsonl"
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", log)
+    old = _records(200, day=1)
+    _append(log, old)
+    list(query_audit(event="login_failed"))  # builds an index for the file about to rotate
+    rotate_audit_log(log, compression="gzip")
+    log_audit("login_failed", username="user1", role="user")
+
+    results = list(query_audit(event="login_failed", username="user1"))
+    assert results[:-1] == _scan(old, event="login_failed", username="user1")
+    assert results[-1]["username"] == "user1"
+    assert list(query_audit(username="not-in-segment")) == []
+
+def test_cli_count(tmp_path, capsys):
+    log = tmp_path / "audit.log.jsonl"
+    records = _records(300)
+    _append(log, records)
+    audit_query.main(["--log", str(log), "--event", "login_blocked", "--count"])
+    assert capsys.readouterr().out.strip() == str(len(_scan(records, event="login_blocked")))
@@ -0,0 +1,167 @@
+import gzip
+import json
+import multiprocessing
+import pytest
+from datetime import datetime, timezone
+from password_manager import audit
+from password_manager.audit import (
+    log_audit, rotate_audit_log, list_segments, load_segment_index, iter_audit_records, AuditWriter,
+)
+
+def _write(path, records):
+    with path.open("a") as f:
+        for ts, event in records:
+            f.write(json.dumps({"timestamp": ts, "event": event, "username": "u", "role": "user", "details": None}) + "\n")
+
+def test_rotate_writes_segment_and_sidecar(tmp_path):
+    log = tmp_path / "audit.log.jsonl"
+    _write(log, [("2026-01-01T10:00:00+00:00Z", "login_failed"),
+                 ("2026-01-01T11:00:00+00:00Z", "login_failed"),
+                 ("2026-01-01T12:00:00+00:00Z", "login_success")])
+
+    segment = rotate_audit_log(log, compression="gzip")
+    assert segment.name == "audit.log.000001.jsonl.gz"
+    assert not log.exists()
+    with gzip.open(segment, "rt") as f:
+        assert len(f.readlines()) == 3
+
+    index = load_segment_index(segment)
+    assert index["first_timestamp"] == "2026-01-01T10:00:00+00:00Z"
+    assert index["last_timestamp"] == "2026-01-01T12:00:00+00:00Z"
+    assert index["event_counts"] == {"login_failed": 2, "login_success": 1}
+
+    _write(log, [("2026-01-02T10:00:00+00:00Z", "login_blocked")])
+    assert rotate_audit_log(log, compression="gzip").name == "audit.log.000002.jsonl.gz"
+    assert rotate_audit_log(log) is None  # nothing left to rotate
+    assert [p.name for p in list_segments(log)] == ["audit.log.000001.jsonl.gz", "audit.log.000002.jsonl.gz"]
+
+def test_time_range_reader_skips_segments(tmp_path, monkeypatch):
+    log = tmp_path / "audit.log.jsonl"
+    _write(log, [("2026-01-01T10:00:00+00:00Z", "a")])
+    old = rotate_audit_log(log, compression="gzip")
+    _write(log, [("2026-01-05T10:00:00+00:00Z", "b"), ("2026-01-06T10:00:00+00:00Z", "c")])
+    rotate_audit_log(log, compression="gzip")
+    _write(log, [("2026-01-09T10:00:00+00:00Z", "d")])
+
+    opened = []
+    real_open = audit.open_segment
+    monkeypatch.setattr(audit, "open_segment", lambda p: opened.append(p.name) or real_open(p))
+
+    records = list(iter_audit_records("2026-01-05T12:00:00", datetime(2026, 1, 10, tzinfo=timezone.utc), log))
+    assert [r["event"] for r in records] == ["c", "d"]
+    assert old.name not in opened
+    assert [r["event"] for r in iter_audit_records(log_file=log)] == ["a", "b", "c", "d"]
+
+def test_sidecar_range_covers_out_of_order_records(tmp_path):
+    log = tmp_path / "audit.log.jsonl"
+    _write(log, [("2026-01-01T10:00:05+00:00Z", "a"),
+                 ("2026-01-01T10:00:01+00:00Z", "b"),   # appended late by another process
+                 ("2026-01-01T10:00:09+00:00Z", "c"),
+                 ("2026-01-01T10:00:07+00:00Z", "d")])
+    segment = rotate_audit_log(log, compression="gzip")
+    index = load_segment_index(segment)
+    assert (index["first_timestamp"], index["last_timestamp"]) == ("2026-01-01T10:00:01+00:00Z",
+                                                                   "2026-01-01T10:00:09+00:00Z")
+    assert [r["event"] for r in iter_audit_records(end="2026-01-01T10:00:02+00:00", log_file=log)] == ["b"]
+    assert [r["event"] for r in iter_audit_records(start="2026-01-01T10:00:08+00:00", log_file=log)] == ["c"]
+
+def test_interrupted_rotation_is_completed(tmp_path):
+    log = tmp_path / "audit.log.jsonl"
+    _write(log, [("2026-01-01T10:00:00+00:00Z", "a")])
+    log.rename(audit.rotating_path(log))  # crashed after the rename
+    _write(log, [("2026-01-02T10:00:00+00:00Z", "b")])
+    assert [r["event"] for r in iter_audit_records(log_file=log)] == ["a", "b"]
+
+    segment = rotate_audit_log(log, compression="gzip")
+    assert load_segment_index(segment)["event_counts"] == {"a": 1}
+    assert [r["event"] for r in iter_audit_records(log_file=log)] == ["a", "b"]
+
+def test_size_based_rotation(tmp_path, monkeypatch):
+    log = tmp_path / "audit.log.jsonl"
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", log)
+    monkeypatch.setattr("password_manager.audit.ROTATE_MAX_BYTES", 1000)
+    for i in range(30):
+        log_audit("login_failed", username=f"user{i}", role="user")
+    assert len(list_segments(log)) >= 2
+
+    writer = AuditWriter(log, batch_size=4)
+    for i in range(30):
+        writer.submit({"timestamp": "2026-01-01T10:00:00+00:00Z", "event": "w", "details": i})
+    writer.close()
+    assert writer.last_error is None
+
+    records = list(iter_audit_records(log_file=log))
+    assert [r["username"] for r in records[:30]] == [f"user{i}" for i in range(30)]
+    assert [r["details"] for r in records[30:]] == list(range(30))
+
+def test_age_based_rotation(tmp_path, monkeypatch):
+    log = tmp_path / "audit.log.jsonl"
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", log)
+    monkeypatch.setattr("password_manager.audit.ROTATE_MAX_AGE_SECONDS", 3600)
+    _write(log, [("2020-01-01T10:00:00+00:00Z", "old")])
+    log_audit("login_success", username="alice")
+    assert len(list_segments(log)) == 1
+    assert not log.exists()
+
+def test_writer_reopens_log_rotated_by_another_process(tmp_path):
+    log = tmp_path / "audit.log.jsonl"
+    writer = AuditWriter(log, batch_size=1, flush_interval=0.01)
+    writer.submit({"timestamp": "2026-01-01T10:00:00+00:00Z", "event": "before"})
+    assert writer.flush(timeout=5)
+    rotate_audit_log(log, compression="gzip")  # as another process would, with our handle still open
+    writer.submit({"timestamp": "2026-01-01T11:00:00+00:00Z", "event": "after"})
+    writer.close()
+    assert writer.last_error is None
+    assert log.exists()
+    assert [r["event"] for r in iter_audit_records(log_file=log)] == ["before", "after"]
+
+def test_append_lock_file_stays_open_and_is_released(tmp_path, monkeypatch):
+    fcntl = pytest.importorskip("fcntl")
+    log = tmp_path / "audit.log.jsonl"
+    lock_path = tmp_path / "audit.log.jsonl.lock"
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", log)
+    log_audit("first")
+    lock = audit._shared_locks[lock_path][1]
+    log_audit("second")
+    assert audit._shared_locks[lock_path][1] is lock  # not reopened per event
+    with open(lock_path, "a") as other:
+        fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)  # nothing holds it between events
+        fcntl.flock(other, fcntl.LOCK_UN)
+
+    child = multiprocessing.get_context("fork").Process(target=log_audit, args=("child",))
+    child.start()
+    child.join(10)
+    assert child.exitcode == 0
+    log_audit("third")
+    assert [r["event"] for r in iter_audit_records(log_file=log)] == ["first", "second", "child", "third"]
+
+def test_concurrent_rotations_lose_nothing(tmp_path, monkeypatch):
+    import threading
+
+    log = tmp_path / "audit.log.jsonl"
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", log)
+    monkeypatch.setattr("password_manager.audit.ROTATE_MAX_BYTES", 2000)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(60):
+                log_audit("login_failed", username=f"{n}:{i}", role="user")
+                if i % 10 == 0:
+                    rotate_audit_log(log, compression="gzip")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert not audit.rotating_path(log).exists()
+    assert not list(tmp_path.glob("*.tmp"))
+    usernames = [r["username"] for r in iter_audit_records(log_file=log)]
+    assert sorted(usernames) == sorted(f"{n}:{i}" for n in range(4) for i in range(60))
+    for n in range(4):
+        assert [u for u in usernames if u.startswith(f"{n}:")] == [f"{n}:{i}" for i in range(60)]
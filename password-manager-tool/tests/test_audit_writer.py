@@ -0,0 +1,128 @@
+import json
+import queue
+import threading
+import pytest
+from password_manager import audit
+from password_manager.audit import AuditWriter, log_audit, start_async_audit, stop_async_audit, flush_audit
+
+def _read(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+def test_writer_preserves_order_across_batches(tmp_path):
+    path = tmp_path / "audit.log.jsonl"
+    writer = AuditWriter(path, batch_size=7, flush_interval=0.01)
+    for i in range(100):
+        writer.submit({"event": "e", "details": i})
+    assert writer.flush(timeout=5)
+    assert [r["details"] for r in _read(path)] == list(range(100))
+    writer.close()
+
+def test_concurrent_submitters_lose_nothing(tmp_path):
+    path = tmp_path / "audit.log.jsonl"
+    writer = AuditWriter(path, max_queue=16, batch_size=8)
+
+    def worker(n):
+        for i in range(200):
+            writer.submit({"event": "e", "details": f"{n}:{i}"})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close()
+
+    records = [r["details"] for r in _read(path)]
+    assert len(records) == 800
+    for n in range(4):
+        # each thread's own events stay in call order
+        assert [r for r in records if r.startswith(f"{n}:")] == [f"{n}:{i}" for i in range(200)]
+
+def test_drop_policy_counts_discarded_records(tmp_path, monkeypatch):
+    release = threading.Event()
+    original = AuditWriter._write_batch
+
+    def stalled(self, f, batch):
+        release.wait(5)
+        original(self, f, batch)
+
+    monkeypatch.setattr(AuditWriter, "_write_batch", stalled)
+    path = tmp_path / "audit.log.jsonl"
+    writer = AuditWriter(path, max_queue=2, batch_size=1, policy="drop")
+    results = [writer.submit({"event": "e", "details": i}) for i in range(10)]
+    release.set()
+    writer.close()
+
+    assert results.count(False) == writer.dropped > 0
+    assert len(_read(path)) == results.count(True)
+
+def test_flush_during_a_drop_does_not_wait_for_it(tmp_path, monkeypatch):
+    path = tmp_path / "audit.log.jsonl"
+    writer = AuditWriter(path, flush_interval=0.01, policy="drop")
+    writer.submit({"event": "kept"})
+    flushed = []
+    real_put = writer._queue.put
+
+    def full(item, block=True, timeout=None):
+        if not isinstance(item, dict):
+            return real_put(item, block, timeout)  # flush/stop markers
+        flushed.append(writer.flush(timeout=1))  # a flush racing the dropped submit
+        raise queue.Full
+
+    monkeypatch.setattr(writer._queue, "put", full)
+    assert writer.submit({"event": "dropped"}) is False
+    assert flushed == [True] and writer.dropped == 1
+    writer.close()
+    assert [r["event"] for r in _read(path)] == ["kept"]
+
+def test_log_audit_async_mode(tmp_path, monkeypatch):
+    path = tmp_path / "audit.log.jsonl"
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", path)
+    start_async_audit(flush_interval=10)
+    try:
+        log_audit("login_success", username="alice", role="user")
+        log_audit("login_failed", username="bob", role="user", details="count=1")
+        assert flush_audit(timeout=5)
+        assert [r["event"] for r in _read(path)] == ["login_success", "login_failed"]
+    finally:
+        stop_async_audit()
+    assert audit._writer is None
+
+    log_audit("account_unlocked", username="bob")  # synchronous again
+    assert _read(path)[-1]["event"] == "account_unlocked"
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        AuditWriter(policy="spill")
+
+def test_bad_record_does_not_wedge_the_writer(tmp_path):
+    path = tmp_path / "audit.log.jsonl"
+    writer = AuditWriter(path, batch_size=8, flush_interval=0.01)
+    writer.submit({"event": "before"})
+    writer.submit({"event": "bad", "details": object()})  # json.dumps raises TypeError
+    writer.submit({"event": "after"})
+    assert writer.flush(timeout=5)
+    assert [r["event"] for r in _read(path)] == ["before", "after"]
+    assert writer.dropped == 1 and isinstance(writer.last_error, TypeError)
+
+    writer.submit({"event": "later"})  # the thread is still alive
+    writer.close(timeout=5)
+    assert _read(path)[-1]["event"] == "later"
+
+def test_failed_batch_is_counted_as_dropped(tmp_path, monkeypatch):
+    def broken(self, f, batch):
+        raise ValueError("disk on fire")
+
+    path = tmp_path / "audit.log.jsonl"
+    writer = AuditWriter(path, batch_size=4, flush_interval=0.01)
+    with monkeypatch.context() as m:
+        m.setattr(AuditWriter, "_write_batch", broken)
+        for i in range(3):
+            writer.submit({"event": "e", "details": i})
+        assert writer.flush(timeout=5)
+    assert writer.dropped == 3 and isinstance(writer.last_error, ValueError)
+    writer.submit({"event": "recovered"})
+    assert writer.flush(timeout=5)
+    writer.close()
+    assert [r["event"] for r in _read(path)] == ["recovered"]
@@ -0,0 +1,118 @@
+import json
+import time
+import pytest
+from password_manager.core import hash_password, MAX_FAILED_ATTEMPTS, LOCKOUT_DURATION
+from password_manager.hashing import make_password_hash
+from password_manager.service import AuthService
+from password_manager.storage import JsonStorage, SQLiteStorage
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", tmp_path / "audit.log.jsonl")
+    users_file = tmp_path / "users.json"
+    attempts_file = tmp_path / "login_attempts.json"
+    users_file.write_text(json.dumps({
+        "alice": {"role": "user", "salt": "s1", "hash": hash_password("Correct#1", "s1"), "created_at": None},
+        "root": {"role": "admin", "salt": "s2", "hash": hash_password("Admin#123", "s2"), "created_at": None},
+    }))
+    return users_file, attempts_file
+
+def test_lockout_and_expiry(files):
+    backend = JsonStorage(*files)
+    with AuthService(backend, flush_interval=0) as service:
+        now = time.time()
+        for i in range(MAX_FAILED_ATTEMPTS):
+            assert service.record_failure("alice", now + i) == i + 1
+        assert service.is_locked("alice", now + MAX_FAILED_ATTEMPTS)
+        assert service.authenticate("alice", "Correct#1") is None  # blocked even with the right password
+
+        later = now + MAX_FAILED_ATTEMPTS + LOCKOUT_DURATION
+        assert not service.is_locked("alice", later)
+        assert service.record_failure("alice", later) == 1  # count restarts after expiry
+
+def test_write_behind_batches_until_flush(files):
+    backend = JsonStorage(*files)
+    service = AuthService(backend, flush_interval=0, max_dirty=3)
+    assert service.authenticate("alice", "wrong") is None
+    assert backend.load_login_attempts() == {}  # not written yet
+
+    service.authenticate("root", "wrong")
+    service.authenticate("bob", "x")  # unknown users are never recorded
+    assert backend.load_login_attempts() == {}
+    service.record_failure("carol")  # third dirty user triggers the batch
+    assert set(backend.load_login_attempts()) == {"alice", "root", "carol"}
+
+    assert service.authenticate("alice", "Correct#1") == ("alice", "user")
+    service.close()
+    assert backend.get_login_attempt("alice") == {"failed": 0, "last": None}
+
+@pytest.mark.parametrize("kind", ["json", "sqlite"])
+def test_services_in_several_processes_add_up_failures(files, tmp_path, kind):
+    def backend():
+        return JsonStorage(*files) if kind == "json" else SQLiteStorage(tmp_path / "pm.db")
+
+    if kind == "sqlite":
+        SQLiteStorage(tmp_path / "pm.db").add_users(json.loads(files[0].read_text()))
+    # Both caches start from the same (empty) attempt records and never reload on their own
+    first = AuthService(backend(), flush_interval=0, recheck_interval=3600)
+    second = AuthService(backend(), flush_interval=0, recheck_interval=3600)
+    assert first.record_failure("alice") == 1
+    assert second.record_failure("alice") == 1
+    assert second.record_failure("alice") == 2
+    first.flush()
+    second.flush()
+
+    assert backend().get_login_attempt("alice")["failed"] == 3  # nothing lost to a blind overwrite
+    assert second.is_locked("alice")  # the merged record locks the account here too
+    assert second.authenticate("alice", "Correct#1") is None
+    first.reset_attempts("alice")
+    first.flush()
+    assert backend().get_login_attempt("alice") == {"failed": 0, "last": None}
+    first.close()
+    second.close()
+
+def test_reloads_when_storage_changes(files):
+    users_file, attempts_file = files
+    backend = JsonStorage(users_file, attempts_file)
+    service = AuthService(backend, flush_interval=0, recheck_interval=0)
+    assert service.get_user("dave") is None
+
+    users = json.loads(users_file.read_text())
+    users["dave"] = {"role": "user", "salt": "s3", "hash": hash_password("Dave#1234", "s3"), "created_at": None}
+    users_file.write_text(json.dumps(users, indent=4))
+    backend.put_login_attempt("dave", {"failed": MAX_FAILED_ATTEMPTS,
+                                       "last": "2999-01-01T00:00:00+00:00"})  # locked by another process
+    assert service.get_user("dave")["salt"] == "s3"
+    assert service.authenticate("dave", "Dave#1234") is None
+    service.close()
+
+def test_rehash_does_not_hide_a_concurrent_change(files, monkeypatch):
+    users_file, attempts_file = files
+    service = AuthService(JsonStorage(users_file, attempts_file), flush_interval=0, recheck_interval=0)
+    other = JsonStorage(users_file, attempts_file)
+    real_hash = make_password_hash
+
+    def hash_while_another_process_writes(password, salt, hasher=None):
+        other.add_users({"dave": {"role": "user", "salt": "s3", "hash": "h", "created_at": None}})
+        return real_hash(password, salt, hasher)
+
+    monkeypatch.setattr("password_manager.service.make_password_hash", hash_while_another_process_writes)
+    assert service.authenticate("alice", "Correct#1") == ("alice", "user")  # legacy hash: upgraded
+    assert service.get_user("alice")["kdf"] != "sha256"
+    assert service.get_user("dave")["salt"] == "s3"  # the other write still triggers a reload
+    service.close()
+
+def test_admin_unlock_and_sqlite_backend(files, tmp_path):
+    backend = SQLiteStorage(tmp_path / "pm.db")
+    for username, record in json.loads(files[0].read_text()).items():
+        backend.put_user(username, record)
+    with AuthService(backend, flush_interval=0.01) as service:
+        for _ in range(MAX_FAILED_ATTEMPTS):
+            service.authenticate("alice", "wrong")
+        assert service.is_locked("alice")
+        assert service.unlock("alice", "alice") is False
+        assert service.unlock("root", "alice") is True
+        assert service.authenticate("alice", "Correct#1") == ("alice", "user")
+        time.sleep(0.1)  # background flush
+        assert backend.get_login_attempt("alice") == {"failed": 0, "last": None}
+    backend.close()
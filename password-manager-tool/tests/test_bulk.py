@@ -0,0 +1,113 @@
+import json
+import pytest
+from password_manager.bulk import bulk_create_users, bulk_unlock, main, validate_new_users
+from password_manager.hashing import Pbkdf2Hasher, verify_password
+from password_manager.storage import (
+    JsonStorage, SQLiteStorage, set_backend, save_user, get_user, load_users,
+    save_login_attempt_batch, get_login_attempt,
+)
+from password_manager.utils import CommonPasswords
+
+FAST_HASHER = Pbkdf2Hasher(iterations=1000)
+COMMON = CommonPasswords(["password", "qwerty"])
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request, tmp_path, monkeypatch):
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", tmp_path / "audit.log.jsonl")
+    if request.param == "json":
+        backend = JsonStorage(tmp_path / "users.json", tmp_path / "login_attempts.json")
+    else:
+        backend = SQLiteStorage(tmp_path / "pm.db")
+    set_backend(backend)
+    yield backend
+    set_backend(None)
+    if request.param == "sqlite":
+        backend.close()
+
+def _audit(tmp_path):
+    with open(tmp_path / "audit.log.jsonl") as f:
+        return [json.loads(line) for line in f]
+
+def test_bulk_create_validates_hashes_and_audits(backend, tmp_path):
+    save_user("taken", "user", "salt", "hash")
+    users = [
+        {"username": "alice", "role": "user", "password": "Str0ng!One"},
+        ("root", "admin", "Str0ng!Two"),
+        ("alice", "user", "Str0ng!Three"),
+        ("weak", "user", "Password1!"),
+        ("bad", "owner", "Str0ng!Four"),
+        (" padded", "user", "Str0ng!Five"),
+        ("taken", "user", "Str0ng!Six"),
+    ]
+    created, rejected = bulk_create_users(users, COMMON, hasher=FAST_HASHER, workers=1)
+
+    assert created == ["alice", "root"]
+    assert rejected == {
+        "alice": "duplicate username in batch",
+        "weak": "weak password: uncommon",
+        "bad": "invalid role 'owner'",
+        " padded": "invalid username",
+        "taken": "already exists",
+    }
+    assert verify_password(get_user("alice"), "Str0ng!One")
+    assert get_user("root")["role"] == "admin"
+    assert get_user("taken")["hash"] == "hash"  # untouched
+    events = [(r["event"], r["username"], r["role"]) for r in _audit(tmp_path)]
+    assert events[-2:] == [("user_created", "alice", "user"), ("user_created", "root", "admin")]
+
+def test_validate_keeps_every_rejection():
+    users = [
+        (None, "user", "Str0ng!One"),
+        ("", "user", "Str0ng!Two"),
+        ("alice", "user", "short"),
+        ("alice", "user", "Str0ng!Three"),
+        ("alice", "user", "Str0ng!Four"),
+        ("alice", "owner", "Str0ng!Five"),
+        ("bob", "user"),
+        42,
+    ]
+    accepted, rejected = validate_new_users(users, COMMON)
+
+    assert accepted == [("alice", "user", "Str0ng!Three")]
+    assert rejected == {
+        "#1": "invalid username",
+        "#2": "invalid username",
+        "alice": "weak password: length, uppercase, digit, symbol",
+        "#5": "duplicate username in batch",
+        "#6": "duplicate username in batch",
+        "#7": "malformed entry",
+        "#8": "malformed entry",
+    }
+
+def test_bulk_create_hashes_in_process_pool(backend):
+    users = [(f"user{i}", "user", f"Str0ng!pw{i}") for i in range(12)]
+    created, rejected = bulk_create_users(users, COMMON, hasher=FAST_HASHER, workers=2)
+    assert len(created) == 12 and not rejected
+    stored = load_users()
+    assert len({record["salt"] for record in stored.values()}) == 12
+    assert all(verify_password(stored[f"user{i}"], f"Str0ng!pw{i}") for i in range(12))
+
+def test_bulk_unlock_resets_in_one_batch(backend, tmp_path):
+    save_user("admin", "admin", "salt", "hash")
+    save_user("user1", "user", "salt", "hash")
+    locked = {"failed": 3, "last": "2026-01-05T10:00:00+00:00"}
+    save_login_attempt_batch({"bob": locked, "carol": locked, "dave": locked})
+
+    assert bulk_unlock("user1", ["bob"]) == []
+    assert get_login_attempt("bob") == locked
+
+    assert bulk_unlock("admin", ["bob", "carol", "bob", "nobody"]) == ["bob", "carol"]
+    assert get_login_attempt("bob") == {"failed": 0, "last": None}
+    assert get_login_attempt("dave") == locked
+    unlocks = [r for r in _audit(tmp_path) if r["event"] == "account_unlocked"]
+    assert [(r["username"], r["details"]) for r in unlocks] == [("bob", "unlocked_by=admin"),
+                                                               ("carol", "unlocked_by=admin")]
+
+def test_cli_create_users_from_csv(backend, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr("password_manager.bulk.DEFAULT_HASHER", FAST_HASHER)
+    csv_file = tmp_path / "users.csv"
+    csv_file.write_text("username,role,password\nalice,user,Str0ng!One\nbob,user,short\n")
+    main(["create-users", str(csv_file), "--workers", "1"])
+    out = capsys.readouterr().out
+    assert "Created 1 users" in out and "bob: weak password" in out
+    assert get_user("alice")["kdf"] == FAST_HASHER.name
@@ -4,3 +4,50 @@ def test_load_common_passwords():
     common = load_common_passwords()
     assert isinstance(common, list)
     assert "123456" in common  
+
+def test_load_common_passwords_builds_matcher():
+    common = load_common_passwords()
+    assert common.matcher.contains_any("my123456pw")
+    assert not common.matcher.contains_any("zq!x9")
+
+def test_matcher_agrees_with_substring_scan():
+    import random
+    from password_manager.matcher import SubstringMatcher
+
+    rng = random.Random(7)
+    patterns = ["".join(rng.choice("abc1") for _ in range(rng.randint(1, 5))) for _ in range(50)]
+    matcher = SubstringMatcher(patterns)
+    for _ in range(500):
+        text = "".join(rng.choice("abc1xy") for _ in range(rng.randint(0, 12)))
+        assert matcher.contains_any(text) == any(p in text for p in patterns)
+
+def test_matcher_empty_pattern_matches_everything():
+    from password_manager.matcher import SubstringMatcher
+
+    assert SubstringMatcher(["", "abc"]).contains_any("zzz")
+    assert not SubstringMatcher([]).contains_any("zzz")
+
+def test_password_strength_uses_prebuilt_matcher():
+    from password_manager.core import check_password_strength
+    from password_manager.utils import CommonPasswords
+
+    common = CommonPasswords(["password", "123456"])
+    assert not check_password_strength("MyPassword1!", common)[1]["uncommon"]
+    assert check_password_strength("Strong1!", common)[0]
+
+def test_matcher_follows_list_changes():
+    from password_manager.core import check_password_strength
+    from password_manager.utils import CommonPasswords
+
+    common = CommonPasswords(["password"])
+    assert check_password_strength("Tr0ub4dor!", common)[0]
+    common.append("tr0ub4dor")
+    assert not check_password_strength("Tr0ub4dor!", common)[0]
+    common[-1] = "zzz"
+    assert check_password_strength("Tr0ub4dor!", common)[0]
+    common += ["4dor!"]
+    assert not check_password_strength("Tr0ub4dor!", common)[0]
+    del common[-1]
+    assert check_password_strength("Tr0ub4dor!", common)[0]
+    common.extend(["ub4"])
+    assert not check_password_strength("Tr0ub4dor!", common)[0]
@@ -0,0 +1,74 @@
+import multiprocessing
+import pytest
+from password_manager import storage
+from password_manager.core import register_failed_attempt, MAX_FAILED_ATTEMPTS
+from password_manager.storage import JsonStorage, SQLiteStorage, set_backend, get_login_attempt
+
+PROCESSES = 8
+INCREMENTS = 200
+
+def _increment(record):
+    record = record or {"failed": 0, "last": None}
+    return {"failed": record["failed"] + 1, "last": "2026-01-05T10:00:00+00:00"}
+
+def _worker(kind, path_a, path_b, start):
+    backend = JsonStorage(path_a, path_b) if kind == "json" else SQLiteStorage(path_a)
+    start.wait()
+    for i in range(INCREMENTS):
+        backend.update_login_attempt(f"user{i % 4}", _increment)
+
+@pytest.mark.parametrize("kind", ["json", "sqlite"])
+def test_no_lost_increments_across_processes(tmp_path, kind):
+    ctx = multiprocessing.get_context()
+    path_a = tmp_path / ("users.json" if kind == "json" else "pm.db")
+    path_b = tmp_path / "login_attempts.json"
+    if kind == "sqlite":
+        SQLiteStorage(path_a).close()  # create the schema once, before the workers race
+    start = ctx.Barrier(PROCESSES + 1)
+    workers = [ctx.Process(target=_worker, args=(kind, path_a, path_b, start)) for _ in range(PROCESSES)]
+    for w in workers:
+        w.start()
+    start.wait()
+    for w in workers:
+        w.join(60)
+        assert w.exitcode == 0
+
+    backend = JsonStorage(path_a, path_b) if kind == "json" else SQLiteStorage(path_a)
+    attempts = backend.load_login_attempts()
+    assert sum(r["failed"] for r in attempts.values()) == PROCESSES * INCREMENTS
+    assert all(r["failed"] == PROCESSES * INCREMENTS // 4 for r in attempts.values())
+
+def test_register_failed_attempt_locks_out(tmp_path, monkeypatch):
+    monkeypatch.setattr("password_manager.storage.LOGIN_ATTEMPTS_FILE", tmp_path / "login_attempts.json")
+    set_backend(None)
+    for i in range(MAX_FAILED_ATTEMPTS):
+        assert register_failed_attempt("bob")["failed"] == i + 1
+
+    # an expired lockout restarts the count
+    storage.save_login_attempt("bob", {"failed": MAX_FAILED_ATTEMPTS, "last": "2000-01-01T00:00:00+00:00"})
+    assert register_failed_attempt("bob")["failed"] == 1
+    assert get_login_attempt("bob")["failed"] == 1
+
+def test_login_rechecks_lockout_atomically(tmp_path, monkeypatch):
+    from password_manager import core
+    from password_manager.hashing import make_password_hash
+
+    monkeypatch.setattr("password_manager.storage.USERS_FILE", tmp_path / "users.json")
+    monkeypatch.setattr("password_manager.storage.LOGIN_ATTEMPTS_FILE", tmp_path / "login_attempts.json")
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", tmp_path / "audit.log.jsonl")
+    set_backend(None)
+    fields = make_password_hash("Correct#1", "salt")
+    storage.save_user("alice", "user", "salt", fields["hash"], fields["kdf"], fields["kdf_params"])
+    storage.save_login_attempt("alice", {"failed": MAX_FAILED_ATTEMPTS - 1, "last": "2000-01-01T00:00:00+00:00"})
+
+    def password_prompt(**kwargs):
+        register_failed_attempt("alice")  # another login reaches the limit while this one waits
+        return "Correct#1"
+
+    monkeypatch.setattr("builtins.input", lambda prompt="": "alice")
+    monkeypatch.setattr(core.pwinput, "pwinput", password_prompt)
+    assert core.login() is None  # the right password no longer gets in
+    assert get_login_attempt("alice")["failed"] == MAX_FAILED_ATTEMPTS  # and the block is not counted
+
+    blocked, record = core.record_login_attempt("alice", success=False)
+    assert blocked and record is None
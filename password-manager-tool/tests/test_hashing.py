@@ -0,0 +1,80 @@
+import json
+import pytest
+from password_manager import hashing
+from password_manager.core import hash_password, upgrade_password_hash
+from password_manager.hashing import (
+    Pbkdf2Hasher, ScryptHasher, UnsupportedHashError, make_password_hash, verify_password, needs_rehash, calibrate,
+    logins_per_second,
+)
+from password_manager.service import AuthService
+from password_manager.storage import JsonStorage, save_user, get_user, set_backend
+
+@pytest.fixture(autouse=True)
+def cheap_default(monkeypatch, tmp_path):
+    monkeypatch.setattr(hashing, "DEFAULT_HASHER", ScryptHasher(n=2 ** 10))
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", tmp_path / "audit.log.jsonl")
+
+@pytest.mark.parametrize("hasher", [Pbkdf2Hasher(iterations=1000), ScryptHasher(n=2 ** 10)])
+def test_schemes_round_trip(hasher):
+    record = {"salt": "abc123", **make_password_hash("S3cret!pw", "abc123", hasher)}
+    assert record["kdf"] == hasher.name
+    assert verify_password(json.loads(json.dumps(record)), "S3cret!pw")
+    assert not verify_password(record, "S3cret!pwx")
+
+def test_legacy_records_verify_and_need_rehash():
+    legacy = {"salt": "s", "hash": hash_password("pw", "s")}
+    assert verify_password(legacy, "pw")
+    assert needs_rehash(legacy)
+    assert not needs_rehash({"salt": "s", **make_password_hash("pw", "s")})
+    assert needs_rehash({"salt": "s", **make_password_hash("pw", "s", ScryptHasher(n=2 ** 11))})
+
+def test_upgrade_on_login(tmp_path, monkeypatch):
+    monkeypatch.setattr("password_manager.storage.USERS_FILE", tmp_path / "users.json")
+    set_backend(None)
+    save_user("alice", "user", "salt1", hash_password("Pw#12345", "salt1"))
+    upgraded = upgrade_password_hash("alice", get_user("alice"), "Pw#12345")
+    assert upgraded["kdf"] == "scrypt" and upgraded["kdf_params"] == {"n": 1024, "r": 8, "p": 1}
+    stored = get_user("alice")
+    assert stored == upgraded and "created_at" in stored
+    assert verify_password(stored, "Pw#12345")
+
+def test_auth_service_upgrades_transparently(tmp_path):
+    users_file = tmp_path / "users.json"
+    users_file.write_text(json.dumps({"bob": {"role": "user", "salt": "s", "hash": hash_password("Bob#pass1", "s")}}))
+    backend = JsonStorage(users_file, tmp_path / "login_attempts.json")
+    with AuthService(backend, flush_interval=0) as service:
+        assert service.authenticate("bob", "Bob#pass1") == ("bob", "user")
+        assert service.get_user("bob")["kdf"] == "scrypt"
+        assert service.authenticate("bob", "Bob#pass1") == ("bob", "user")
+    assert backend.get_user("bob")["kdf"] == "scrypt"
+
+def test_unknown_kdf_fails_login_with_audit_event(tmp_path, monkeypatch):
+    from password_manager import core
+
+    with pytest.raises(UnsupportedHashError, match="argon2id"):
+        verify_password({"salt": "s", "hash": "h", "kdf": "argon2id"}, "pw")
+    with pytest.raises(UnsupportedHashError):
+        verify_password({"salt": "s", "hash": "h", "kdf": "scrypt", "kdf_params": {"rounds": 3}}, "pw")
+
+    users_file = tmp_path / "users.json"
+    users_file.write_text(json.dumps({"eve": {"role": "user", "salt": "s", "hash": "h", "kdf": "argon2id"}}))
+    attempts_file = tmp_path / "login_attempts.json"
+    monkeypatch.setattr("password_manager.storage.USERS_FILE", users_file)
+    monkeypatch.setattr("password_manager.storage.LOGIN_ATTEMPTS_FILE", attempts_file)
+    set_backend(None)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "eve")
+    monkeypatch.setattr(core.pwinput, "pwinput", lambda **kwargs: "pw")
+    assert core.login() is None
+    with AuthService(JsonStorage(users_file, attempts_file), flush_interval=0) as service:
+        assert service.authenticate("eve", "pw") is None
+
+    events = [json.loads(line) for line in (tmp_path / "audit.log.jsonl").read_text().splitlines()]
+    assert [e["event"] for e in events] == ["login_error", "login_error"]
+    assert "argon2id" in events[0]["details"]
+    assert not attempts_file.exists()  # not counted as a failed password
+
+def test_calibrate_and_bench():
+    hasher = calibrate("pbkdf2_sha256", 0.001)
+    assert hasher.params["iterations"] >= 100_000
+    assert calibrate("scrypt", 0.0).params["n"] == 2 ** 10
+    assert logins_per_second(ScryptHasher(n=2 ** 10), workers=2, count=4) > 0
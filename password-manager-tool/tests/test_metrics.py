@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from password_manager.metrics import METRICS, METRICS_ENV, Metrics, enable_metrics_from_env, run_profiled
+from password_manager.audit import log_audit
+from password_manager.hashing import Pbkdf2Hasher, make_password_hash, verify_password
+from password_manager.storage import JsonStorage, set_backend, save_user, get_user
+
+@pytest.fixture
+def metrics(monkeypatch, tmp_path):
+    monkeypatch.setattr("password_manager.storage.USERS_FILE", tmp_path / "users.json")
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", tmp_path / "audit.log.jsonl")
+    set_backend(JsonStorage())
+    METRICS.reset()
+    monkeypatch.setattr(METRICS, "enabled", True)
+    yield METRICS
+    METRICS.reset()
+    set_backend(None)
+
+def test_disabled_records_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", tmp_path / "audit.log.jsonl")
+    METRICS.reset()
+    log_audit("login_success", username="alice")
+    assert METRICS.snapshot() == {"counters": {}, "timers": {}}
+
+def test_storage_hashing_and_audit_are_timed(metrics):
+    hashed = make_password_hash("pw", "salt", Pbkdf2Hasher(iterations=1000))
+    save_user("alice", "user", "salt", hashed["hash"], hashed["kdf"], hashed["kdf_params"])
+    assert verify_password(get_user("alice"), "pw")
+    timers = metrics.snapshot()["timers"]
+    assert timers["password_hash"]["calls"] == 1
+    assert timers["password_verify"]["calls"] == 1
+    assert timers["storage_write"]["calls"] == 1
+    assert timers["storage_read"]["calls"] >= 2
+    assert timers["audit_write"]["calls"] == 1  # user_created
+    assert all(t["seconds"] >= 0 for t in timers.values())
+
+def test_dump_formats(tmp_path):
+    m = Metrics(enabled=True)
+    m.incr("lines", 3)
+    m.observe("parse", 0.25)
+    m.observe("parse", 0.25)
+    m.dump(tmp_path / "m.json")
+    assert json.loads((tmp_path / "m.json").read_text()) == {
+        "counters": {"lines": 3}, "timers": {"parse": {"calls": 2, "seconds": 0.5}}}
+    m.dump(tmp_path / "m.prom")
+    text = (tmp_path / "m.prom").read_text()
+    assert "password_manager_lines_total 3" in text
+    assert 'password_manager_stage_seconds_total{stage="parse"} 0.5' in text
+    assert "parse" in m.summary()
+
+def test_run_profiled_saves_stats(tmp_path, capsys):
+    assert run_profiled(lambda: sum(range(1000)), tmp_path / "p.pstats") == 499500
+    assert (tmp_path / "p.pstats").stat().st_size > 0
+    assert "cumulative" in capsys.readouterr().err
+
+def test_env_is_read_by_entry_points_not_on_import(monkeypatch, tmp_path):
+    code = "import sys, password_manager.metrics as m; print(m.METRICS.enabled, 'cProfile' in sys.modules)"
+    env = {**os.environ, METRICS_ENV: "1"}
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["False", "False"]
+
+    registered = []
+    monkeypatch.setattr("atexit.register", registered.append)
+    monkeypatch.setattr(METRICS, "enabled", False)
+    monkeypatch.delenv(METRICS_ENV, raising=False)
+    assert not enable_metrics_from_env() and not METRICS.enabled
+    monkeypatch.setenv(METRICS_ENV, str(tmp_path / "m.json"))
+    assert enable_metrics_from_env() and METRICS.enabled and len(registered) == 1
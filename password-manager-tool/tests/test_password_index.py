@@ -0,0 +1,45 @@
+import random
+from password_manager.core import check_password_strength
+from password_manager.password_index import build_common_password_index, open_common_password_index, CommonPasswordIndex
+
+def _write_list(path, entries):
+    path.write_text("\n".join(entries) + "\n")
+
+def test_index_membership(tmp_path):
+    source = tmp_path / "common.txt"
+    index_file = tmp_path / "common.idx"
+    entries = ["password", "123456", "qwerty", "letmein", "123456"]
+    _write_list(source, entries)
+
+    assert build_common_password_index(source, index_file) == 4  # duplicates collapsed
+
+    index = CommonPasswordIndex(index_file)
+    for entry in entries:
+        assert entry in index
+    assert "notinthelist" not in index
+    assert not index.matches_empty
+    index.close()
+
+def test_index_substring_check_matches_list_scan(tmp_path):
+    rng = random.Random(11)
+    entries = ["".join(rng.choice("abcd12") for _ in range(rng.randint(2, 6))) for _ in range(300)]
+    source = tmp_path / "common.txt"
+    index_file = tmp_path / "common.idx"
+    _write_list(source, entries)
+    build_common_password_index(source, index_file)
+
+    index = open_common_password_index(index_file, source)
+    for _ in range(300):
+        pwd = "".join(rng.choice("abcd12XY!") for _ in range(rng.randint(4, 12)))
+        assert check_password_strength(pwd, index) == check_password_strength(pwd, entries)
+    index.close()
+
+def test_stale_index_is_ignored(tmp_path):
+    source = tmp_path / "common.txt"
+    index_file = tmp_path / "common.idx"
+    _write_list(source, ["password"])
+    build_common_password_index(source, index_file)
+
+    _write_list(source, ["password", "dragon", "monkey"])
+    assert open_common_password_index(index_file, source) is None
+    assert open_common_password_index(tmp_path / "missing.idx", source) is None
@@ -0,0 +1,72 @@
+import json
+import pytest
+from password_manager import storage
+from password_manager.admin import unlock_account
+from password_manager.storage import (
+    SQLiteStorage, migrate_json_to_sqlite, set_backend,
+    save_user, get_user, load_users, save_login_attempts, save_login_attempt,
+    get_login_attempt, load_login_attempts,
+)
+
+@pytest.fixture
+def sqlite_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", tmp_path / "audit.log.jsonl")
+    backend = SQLiteStorage(tmp_path / "pm.db")
+    set_backend(backend)
+    yield backend
+    set_backend(None)
+    backend.close()
+
+def test_sqlite_point_reads_and_upserts(sqlite_backend):
+    save_user("alice", "user", "salt1", "hash1")
+    save_user("root", "admin", "salt2", "hash2")
+    assert get_user("alice")["hash"] == "hash1"
+    assert get_user("nobody") is None
+
+    save_user("alice", "user", "salt3", "hash3")  # upsert replaces the row
+    assert get_user("alice")["salt"] == "salt3"
+    assert set(load_users()) == {"alice", "root"}
+
+    assert get_login_attempt("alice") is None
+    save_login_attempt("alice", {"failed": 2, "last": "2026-01-05T10:00:00+00:00"})
+    save_login_attempt("alice", {"failed": 3, "last": "2026-01-05T10:01:00+00:00"})
+    assert get_login_attempt("alice") == {"failed": 3, "last": "2026-01-05T10:01:00+00:00"}
+
+    save_login_attempts({"root": {"failed": 1, "last": None}})  # full replace
+    assert load_login_attempts() == {"root": {"failed": 1, "last": None}}
+
+def test_unlock_with_sqlite_backend(sqlite_backend):
+    save_user("admin", "admin", "salt", "hash")
+    save_login_attempts({"bob": {"failed": 3, "last": "2026-01-05T10:00:00"}})
+
+    assert unlock_account("admin", "bob") is True
+    assert get_login_attempt("bob") == {"failed": 0, "last": None}
+    assert unlock_account("admin", "carol") is False
+
+def test_migrate_json_to_sqlite(tmp_path):
+    users_file = tmp_path / "users.json"
+    attempts_file = tmp_path / "login_attempts.json"
+    users = {
+        "alice": {"role": "user", "salt": "s", "hash": "h", "created_at": "2026-01-01T00:00:00+00:00"},
+        "root": {"role": "admin", "salt": "t", "hash": "i", "created_at": "2026-01-02T00:00:00+00:00"},
+    }
+    attempts = {"alice": {"failed": 2, "last": "2026-01-05T10:00:00+00:00"}}
+    users_file.write_text(json.dumps(users))
+    attempts_file.write_text(json.dumps(attempts))
+
+    db = tmp_path / "pm.db"
+    assert migrate_json_to_sqlite(db, users_file, attempts_file) == (2, 1)
+
+    backend = SQLiteStorage(db)
+    assert backend.load_users() == users
+    assert backend.load_login_attempts() == attempts
+    backend.close()
+
+def test_json_backend_follows_patched_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr("password_manager.storage.USERS_FILE", tmp_path / "users.json")
+    monkeypatch.setattr("password_manager.audit.AUDIT_LOG_FILE", tmp_path / "audit.log.jsonl")
+    set_backend(None)
+    assert isinstance(storage.get_backend(), storage.JsonStorage)
+
+    save_user("dave", "user", "salt", "hash")
+    assert json.loads((tmp_path / "users.json").read_text())["dave"]["hash"] == "hash"